@@ -9,6 +9,7 @@ import argparse
 import subprocess
 import json
 import base64
+import time
 
 sys.path.append(os.path.abspath('.'))
 src_dir = os.path.join(os.path.abspath('.'), 'src')
@@ -19,9 +20,15 @@ if comparison_src_dir not in sys.path:
     sys.path.append(comparison_src_dir)
 
 from src.comparison.src.policy_loader import load_policies
-from src.comparison.src.policy_comparator import PolicyComparator
-from src.qa.qa import load_policy_link, load_document, chunk_text, build_index, retrieve_relevant_chunks, generate_answer
-from src.summary.summary import summarize_policy_for_platform, format_summary_for_html, format_reference_quotes
+from src.qa.qa import stream_answer
+from src.qa.answer_cache import get_answer_cache
+from src.summary.summary import format_summary_for_html, format_reference_quotes, verification_badge
+from src.common.embeddings import get_embedding_service
+from src.common.jobs import JOB_POLL_SECONDS, get_job_queue
+from src.common.llm_cache import get_llm_cache
+from src.common.llm_client import get_llm_client
+from src.common.metrics import metrics
+from src.common.singleflight import single_flight_stats
 
 load_dotenv()
 
@@ -178,6 +185,7 @@ BASE_DIR = os.path.dirname(__file__)
 bkc_logo_path = os.path.join(BASE_DIR, "screenshots", "bkc_logo.png")
 asml_logo_path = os.path.join(BASE_DIR, "screenshots", "asml_logo.jpeg")
 
+@st.cache_data
 def img_to_base64(path):
     with open(path, "rb") as f:
         return base64.b64encode(f.read()).decode()
@@ -219,9 +227,11 @@ except Exception as e:
 try:
     privacy_db = load_privacy_db()
     all_platforms = sorted(privacy_db["Platform"].unique())
+    policy_urls = dict(zip(privacy_db["Platform"], privacy_db["Privacy Policy URL"]))
 except Exception as e:
     st.error(f"Error loading privacy_db.csv: {str(e)}")
     all_platforms = []
+    policy_urls = {}
 
 if not platforms and all_platforms:
     platforms = all_platforms
@@ -233,6 +243,30 @@ if not platforms:
     st.error("No platform data available. Please check your data files.")
     st.stop()
 
+STAGE_LABELS = {
+    "fetch": "Downloading the privacy policy",
+    "chunk": "Splitting the policy into sections",
+    "embed": "Embedding and retrieving relevant sections",
+    "summarize": "Summarizing",
+    "references": "Collecting source references",
+    "sections": "Retrieving the sections for each aspect",
+    "compare": "Comparing the policies",
+}
+
+def show_job_progress(job, cancel_key):
+    """
+    Progress bar, current stage and a cancel button for a queued or running background job.
+    """
+    label = "Waiting for a worker..." if job["status"] == "queued" else STAGE_LABELS.get(job["stage"], "Starting...")
+    st.progress(job["progress"], text=f"🔄 {label}")
+    if job["cancel_requested"]:
+        st.caption("Cancelling...")
+    elif st.button("✖️ Cancel", key=cancel_key):
+        get_job_queue().cancel(job["id"])
+
+# Set by a tab with a job still in progress; the script then reruns after JOB_POLL_SECONDS to refresh it.
+poll_jobs = False
+
 tab1, tab2, tab3 = st.tabs(["❓ Policy Q&A", "📝 Policy Summary", "📊 Policy Comparison"])
 
 with tab1:
@@ -249,15 +283,20 @@ with tab1:
                 with st.spinner('🔄 Analyzing the privacy policy...'):
                     platform_id = qa_platform.lower().replace(" ", "_")
                     st.info(f"Searching for policy information for: {qa_platform}")
-                    txt_href = load_policy_link(platform_id)
-                    document = load_document(txt_href)
-                    chunks = chunk_text(document)
-                    index, chunk_embeddings = build_index(chunks)
-                    relevant_chunks = retrieve_relevant_chunks(user_question, chunks, index, chunk_embeddings)
-                    answer = generate_answer(user_question, relevant_chunks)
                     st.subheader("Answer:")
-                    st.markdown(f"<div style=\"background-color: #F0F9FF; padding: 20px; border-radius: 10px; border-left: 5px solid #2563EB; margin-bottom: 20px;\">{answer}</div>", unsafe_allow_html=True)
-                    st.markdown(f"**Source:** [Link to Privacy Policy]({txt_href})")
+                    answer_placeholder = st.empty()
+                    answer, result = "", None
+                    for kind, payload in stream_answer(platform_id, user_question):
+                        if kind == "result":
+                            result = payload
+                            continue
+                        answer += payload
+                        answer_placeholder.markdown(f"<div style=\"background-color: #F0F9FF; padding: 20px; border-radius: 10px; border-left: 5px solid #2563EB; margin-bottom: 20px;\">{answer}</div>", unsafe_allow_html=True)
+                    if not answer:
+                        raise Exception("No answer found in the Gemini API response.")
+                    if result["cached"]:
+                        st.caption("⚡ Answered from the cache of similar questions about this policy version.")
+                    st.markdown(f"**Source:** [Link to Privacy Policy]({result['txt_href']})")
             except Exception as e:
                 st.error(f"Error processing your question: {str(e)}")
                 st.error("Make sure the selected platform has a valid privacy policy link in the database.")
@@ -272,22 +311,32 @@ with tab2:
     with col1:
         summary_button = st.button("📋 Generate Summary", key="summary_btn")
     if summary_button:
-        try:
-            with st.spinner('🔄 Generating privacy policy summary...'):
-                summary, refs, link = summarize_policy_for_platform(summary_platform)
-                formatted_summary_html = format_summary_for_html(summary)
-                formatted_refs_html = format_reference_quotes(refs)
-                if summary:
-                    st.subheader(f"Privacy Summary for {summary_platform}")
-                    st.markdown(f"<div style=\"background-color: #F0F9FF; padding: 20px; border-radius: 10px; border-left: 5px solid #2563EB; margin-bottom: 20px;\">{formatted_summary_html}</div>", unsafe_allow_html=True)
-                    st.subheader("Original Privacy Policy")
-                    st.markdown(f"[View original privacy policy]({link})")
-                    with st.expander("View Source References"):
-                        st.markdown(f"<div style=\"background-color: #F0F9FF; padding: 20px; border-radius: 10px; border-left: 5px solid #2563EB; margin-bottom: 20px;\">{formatted_refs_html}</div>", unsafe_allow_html=True)
-                else:
-                    st.error("Could not generate a summary. The platform might not be available.")
-        except Exception as e:
-            st.error(f"Error generating summary: {str(e)}")
+        st.session_state["summary_job"] = get_job_queue().submit("summary", platform=summary_platform)
+    summary_job = get_job_queue().get(st.session_state["summary_job"]) if "summary_job" in st.session_state else None
+    if summary_job:
+        st.subheader(f"Privacy Summary for {summary_job['params']['platform']}")
+        if summary_job["status"] in ("queued", "running"):
+            poll_jobs = True
+            show_job_progress(summary_job, "summary_cancel")
+            if summary_job["partial"]:
+                st.markdown(f"<div style=\"background-color: #F0F9FF; padding: 20px; border-radius: 10px; border-left: 5px solid #2563EB; margin-bottom: 20px;\">{format_summary_for_html(summary_job['partial'])}</div>", unsafe_allow_html=True)
+        elif summary_job["status"] == "done":
+            result = summary_job["result"]
+            formatted_summary_html = format_summary_for_html(result["summary"])
+            formatted_refs_html = format_reference_quotes(result["references"], result.get("quotes"), result["source"])
+            st.markdown(f"<div style=\"background-color: #F0F9FF; padding: 20px; border-radius: 10px; border-left: 5px solid #2563EB; margin-bottom: 20px;\">{formatted_summary_html}</div>", unsafe_allow_html=True)
+            st.subheader("Original Privacy Policy")
+            st.markdown(f"[View original privacy policy]({result['source']})")
+            with st.expander("View Source References"):
+                if result.get("quotes"):
+                    statuses = [quote["status"] for quote in result["quotes"]]
+                    st.caption(f"{statuses.count('exact')} of {len(statuses)} quotes found verbatim in the policy, "
+                               f"{statuses.count('fuzzy')} approximately, {len(statuses) - statuses.count('exact') - statuses.count('fuzzy')} not found.")
+                st.markdown(f"<div style=\"background-color: #F0F9FF; padding: 20px; border-radius: 10px; border-left: 5px solid #2563EB; margin-bottom: 20px;\">{formatted_refs_html}</div>", unsafe_allow_html=True)
+        elif summary_job["status"] == "cancelled":
+            st.warning("Summary cancelled.")
+        else:
+            st.error(f"Error generating summary: {summary_job['error']}")
 
 with tab3:
     st.markdown("""
@@ -310,31 +359,41 @@ with tab3:
         with col2:
             default_b_index = 1 if len(platforms) > 1 else 0
             platform_b = st.selectbox("Select the second platform", platforms, index=default_b_index, key="platform_b")
-        comparator = PolicyComparator(api_key=os.getenv('GEMINI_API_KEY'))
         if st.button("Compare Policies 🚀", key="compare_btn"):
             if platform_a != platform_b:
-                try:
-                    with st.spinner('Comparing privacy policies...'):
-                        result = comparator.compare_policies_gemini(platform_a, platform_b, policy_df)
-                        st.subheader(f"🔍 Comparing {platform_a} and {platform_b} Privacy Policies")
-                        comparison_md = result['comparison']
-                        for citation_id in result['citations_a']:
-                            comparison_md = comparison_md.replace(f"[{citation_id}]", f"[{citation_id}](#{citation_id.lower()})")
-                        for citation_id in result['citations_b']:
-                            comparison_md = comparison_md.replace(f"[{citation_id}]", f"[{citation_id}](#{citation_id.lower()})")
-                        st.markdown(comparison_md, unsafe_allow_html=True)
-                        with st.expander(f"📝 Citations for {platform_a}"):
-                            for citation_id, text in result['citations_a'].items():
-                                st.markdown(f"<a id='{citation_id.lower()}'></a>**[{citation_id}]**: {text}", unsafe_allow_html=True)
-                        with st.expander(f"📝 Citations for {platform_b}"):
-                            for citation_id, text in result['citations_b'].items():
-                                st.markdown(f"<a id='{citation_id.lower()}'></a>**[{citation_id}]**: {text}", unsafe_allow_html=True)
-                        st.info("**Important Note:** This comparison is based on the latest version of the complete privacy policies for each platform. Citations are provided for verification.")
-                except Exception as e:
-                    st.error(f"Error during comparison: {str(e)}")
-                    st.error("Please make sure you have set the GEMINI_API_KEY in your .env file and that privacy_db.csv is correctly loaded.")
+                st.session_state["comparison_job"] = get_job_queue().submit("comparison", platform_a=platform_a, platform_b=platform_b)
             else:
                 st.error("⚠️ Please select two different platforms for comparison.")
+        comparison_job = get_job_queue().get(st.session_state["comparison_job"]) if "comparison_job" in st.session_state else None
+        if comparison_job:
+            job_a, job_b = comparison_job["params"]["platform_a"], comparison_job["params"]["platform_b"]
+            st.subheader(f"🔍 Comparing {job_a} and {job_b} Privacy Policies")
+            if comparison_job["status"] in ("queued", "running"):
+                poll_jobs = True
+                show_job_progress(comparison_job, "comparison_cancel")
+                if comparison_job["partial"]:
+                    st.markdown(comparison_job["partial"], unsafe_allow_html=True)
+            elif comparison_job["status"] == "done":
+                result = comparison_job["result"]
+                comparison_md = result['comparison']
+                for citation_id in result['citations_a']:
+                    comparison_md = comparison_md.replace(f"[{citation_id}]", f"[{citation_id}](#{citation_id.lower()})")
+                for citation_id in result['citations_b']:
+                    comparison_md = comparison_md.replace(f"[{citation_id}]", f"[{citation_id}](#{citation_id.lower()})")
+                st.markdown(comparison_md, unsafe_allow_html=True)
+                for job_platform, citations, spans in ((job_a, result['citations_a'], result.get('citation_spans_a', {})),
+                                                       (job_b, result['citations_b'], result.get('citation_spans_b', {}))):
+                    source_url = policy_urls.get(job_platform)
+                    with st.expander(f"📝 Citations for {job_platform}"):
+                        for citation_id, text in citations.items():
+                            badges = " ".join(verification_badge(match, source_url) for match in spans.get(citation_id, []))
+                            st.markdown(f"<a id='{citation_id.lower()}'></a>**[{citation_id}]**: {text} {badges}", unsafe_allow_html=True)
+                st.info("**Important Note:** This comparison is based on the latest version of the complete privacy policies for each platform. Citations are provided for verification.")
+            elif comparison_job["status"] == "cancelled":
+                st.warning("Comparison cancelled.")
+            else:
+                st.error(f"Error during comparison: {comparison_job['error']}")
+                st.error("Please make sure you have set the GEMINI_API_KEY in your .env file and that privacy_db.csv is correctly loaded.")
 
 st.markdown("""
     <style>
@@ -349,6 +408,17 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+with st.sidebar.expander("⚙️ Cache statistics"):
+    st.json({
+        "embeddings": get_embedding_service().cache_stats(),
+        "llm_responses": get_llm_cache().stats(),
+        "llm_client": get_llm_client().stats(),
+        "qa_answers": get_answer_cache().stats(),
+        "single_flight": single_flight_stats(),
+    })
+with st.sidebar.expander("⏱️ Latency metrics"):
+    st.json(metrics.snapshot())
+
 st.markdown("---")
 st.markdown("""
 <footer>
@@ -385,4 +455,8 @@ st.markdown("""
       gap: 2rem !important;   /* increase this for more spacing */
     }
   </style>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+if poll_jobs:
+    time.sleep(JOB_POLL_SECONDS)
+    st.rerun()
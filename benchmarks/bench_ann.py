@@ -0,0 +1,126 @@
+"""
+Recall@k, QPS, build time and index size of the corpus index backends (flat, ivf, hnsw, ivfpq).
+
+    python benchmarks/bench_ann.py --real                # the corpus index over every policy in privacy_db.csv
+    python benchmarks/bench_ann.py --vectors 100000      # clustered synthetic vectors of the model's dimension
+
+Recall is measured against the exact flat index, for searches over the whole corpus and for searches
+restricted to one platform-sized id range with a FAISS selector. The corpus index uses its backend
+only for the former and scans a platform's rows exactly, which the "filt" columns justify. Queries
+are perturbed corpus vectors, so each has close neighbours the way real questions about a policy do.
+"""
+import os
+import sys
+import time
+import argparse
+from typing import List, Optional, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import faiss
+import numpy as np
+
+from src.common.hybrid_retriever import top_k_rows
+from src.common.quantization import QuantizedEmbeddings
+from src.common.vector_index import BACKENDS, index_factory_string, make_index
+from benchmarks.bench_quantization import make_queries, synthetic_embeddings
+
+
+def corpus_embeddings():
+    from src.common.corpus_index import get_corpus_index
+
+    corpus = get_corpus_index()
+    print(f"corpus: {len(corpus.platforms)} policies, {len(corpus.metadata)} chunks")
+    return corpus.embeddings.to_float32(), max(end - start for start, end in corpus.platform_ranges.values())
+
+
+def search_ranges(index, queries: np.ndarray, top_k: int, ranges: Optional[List[Tuple[int, int]]] = None):
+    """
+    index.search restricted to the ids in `ranges` ([start, end) pairs; every id if None).
+    Returns (scores, ids) like index.search; ids are -1 where fewer than top_k were found.
+    """
+    queries = np.ascontiguousarray(queries, dtype="float32")
+    if ranges is None:
+        return index.search(queries, top_k)
+    if len(ranges) == 1:
+        selector = faiss.IDSelectorRange(*ranges[0])
+    else:
+        ids = np.concatenate([np.arange(start, end, dtype="int64") for start, end in ranges])
+        selector = faiss.IDSelectorBatch(ids)
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+    elif hasattr(index, "hnsw"):
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    else:
+        params = faiss.SearchParameters(sel=selector)
+    return index.search(queries, top_k, params=params)
+
+
+def timed_search(index, queries, k, ranges=None):
+    start = time.perf_counter()
+    _, ids = search_ranges(index, queries, k, ranges)
+    return ids, len(queries) / (time.perf_counter() - start)
+
+
+def recall(ids, exact, k):
+    return np.mean([len(set(a[a >= 0]) & set(b[b >= 0])) / k for a, b in zip(ids, exact)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark exact vs approximate corpus index backends.")
+    parser.add_argument("--real", action="store_true", help="Use the privacy_db.csv corpus instead of synthetic vectors")
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=1, help="FAISS threads during search")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    args = parser.parse_args()
+
+    if args.real:
+        embeddings, platform_rows = corpus_embeddings()
+    else:
+        embeddings = synthetic_embeddings(args.vectors, args.dimension)
+        platform_rows = max(args.vectors // 55, args.k)  # privacy_db.csv has 55 platforms
+    embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+    queries = np.ascontiguousarray(make_queries(embeddings, args.queries), dtype="float32")
+    num_vectors, dimension = embeddings.shape
+    platform = [(num_vectors // 2, num_vectors // 2 + platform_rows)]
+
+    faiss.omp_set_num_threads(args.threads)
+    results = {}
+    for backend in ["flat"] + [b for b in args.backends if b != "flat"]:  # flat is the exact reference
+        start = time.perf_counter()
+        index = make_index(embeddings, backend, "float32")
+        build_seconds = time.perf_counter() - start
+        ids, qps = timed_search(index, queries, args.k)
+        filtered_ids, filtered_qps = timed_search(index, queries, args.k, platform)
+        results[backend] = {
+            "factory": index_factory_string(backend, num_vectors, dimension, "float32"),
+            "build": build_seconds,
+            "qps": qps,
+            "filtered_qps": filtered_qps,
+            "bytes": faiss.serialize_index(index).nbytes,
+            "ids": ids,
+            "filtered_ids": filtered_ids,
+        }
+
+    # What the corpus index does for a platform filter: score the platform's rows (a view) exactly.
+    rows = QuantizedEmbeddings(embeddings).rows(*platform[0])
+    start = time.perf_counter()
+    slice_ids = top_k_rows(rows.scores(queries), args.k) + platform[0][0]
+    slice_qps = len(queries) / (time.perf_counter() - start)
+
+    exact, filtered_exact = results["flat"]["ids"], results["flat"]["filtered_ids"]
+    print(f"vectors: {num_vectors}, dimension: {dimension}, queries: {len(queries)}, k: {args.k}, threads: {args.threads}, "
+          f"platform filter: {platform_rows} rows")
+    print(f"{'backend':8s} {'factory':18s} {'recall@k':>8s} {'QPS':>9s} {'filt rec':>8s} {'filt QPS':>9s} {'build s':>8s} {'size MB':>8s}")
+    for backend, r in results.items():
+        print(f"{backend:8s} {r['factory']:18s} {recall(r['ids'], exact, args.k):8.3f} {r['qps']:9.0f} "
+              f"{recall(r['filtered_ids'], filtered_exact, args.k):8.3f} {r['filtered_qps']:9.0f} {r['build']:8.2f} {r['bytes'] / 1e6:8.1f}")
+    print(f"{'slice':8s} {'rows view':18s} {'':8s} {'':9s} {recall(slice_ids, filtered_exact, args.k):8.3f} {slice_qps:9.0f}")
+
+
+if __name__ == "__main__":
+    main()
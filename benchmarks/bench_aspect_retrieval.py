@@ -0,0 +1,70 @@
+"""
+Micro-benchmark: seven per-aspect find_relevant_chunks calls vs. one find_relevant_chunks_batch call.
+
+    python benchmarks/bench_aspect_retrieval.py               # real embedding model, embedding cache off
+    python benchmarks/bench_aspect_retrieval.py --synthetic   # random vectors, isolates the scoring cost
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from src.common.embeddings import EmbeddingService
+from src.comparison.src.text_processor import TextProcessor
+from src.comparison.src.policy_comparator import PolicyComparator
+from benchmarks.local_policy_server import synthetic_policy
+
+
+class RandomEncoder:
+    model_name = "random"
+
+    def __init__(self, dimension):
+        self.rng = np.random.default_rng(0)
+        self.dimension = dimension
+
+    def encode(self, texts):
+        vectors = self.rng.standard_normal((len(texts), self.dimension)).astype("float32")
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-aspect vs. batched aspect retrieval.")
+    parser.add_argument("--synthetic", action="store_true", help="Use random embeddings instead of the real model")
+    parser.add_argument("--chunks", type=int, default=2000, help="Number of chunks in the synthetic policy matrix")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    processor = TextProcessor()
+    if args.synthetic:
+        processor.embedder = RandomEncoder(384)
+        chunks = [f"chunk {i}" for i in range(args.chunks)]
+    else:
+        processor.embedder = EmbeddingService(cache=None)
+        chunks = processor.create_chunks(synthetic_policy("benchmark", paragraphs=args.chunks // 4))
+    embeddings = processor.create_embeddings(chunks)
+    queries = [PolicyComparator.aspect_query(aspect) for aspect in PolicyComparator.ASPECTS]
+
+    looped = best_of(lambda: [processor.find_relevant_chunks(q, chunks, embeddings) for q in queries], args.repeat)
+    batched = best_of(lambda: processor.find_relevant_chunks_batch(queries, chunks, embeddings), args.repeat)
+
+    print(f"chunks:   {len(chunks)}, aspects: {len(queries)}")
+    print(f"looped:   {looped * 1000:.2f} ms")
+    print(f"batched:  {batched * 1000:.2f} ms")
+    print(f"speedup:  {looped / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Compares the original sequential policy download loop with the pooled concurrent fetcher.
+
+    python benchmarks/bench_fetch.py                # against a local stand-in server
+    python benchmarks/bench_fetch.py --real         # against the URLs in privacy_db.csv
+"""
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pandas as pd
+
+from src.common.paths import PRIVACY_DB_CSV
+from src.common.policy_fetcher import fetch_policies, fetch_policies_sequential
+from benchmarks.local_policy_server import start_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sequential vs concurrent policy fetching.")
+    parser.add_argument("--real", action="store_true", help="Fetch the real privacy_db.csv URLs instead of a local server")
+    parser.add_argument("--documents", type=int, default=55, help="Number of documents for the local server")
+    parser.add_argument("--latency", type=float, default=0.1, help="Per-request latency of the local server (seconds)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--per-host", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.real:
+        urls = pd.read_csv(PRIVACY_DB_CSV)["Privacy Policy Txt"].tolist()
+    else:
+        server, base_url = start_server(latency=args.latency)
+        urls = [f"{base_url}/platform_{i}.txt" for i in range(args.documents)]
+        urls.append(f"{base_url}/fail-404/missing.txt")
+
+    # The store is bypassed so both runs measure network work only.
+    sequential = fetch_policies_sequential(urls)
+    concurrent = fetch_policies(urls, max_workers=args.workers, per_host=args.per_host, use_store=False)
+
+    print(f"documents:  {len(urls)}")
+    print(f"sequential: {sequential['elapsed']:.2f}s ({len(sequential['failures'])} failures)")
+    print(f"concurrent: {concurrent['elapsed']:.2f}s ({len(concurrent['failures'])} failures)")
+    print(f"speedup:    {sequential['elapsed'] / concurrent['elapsed']:.1f}x")
+    for url, error in concurrent["failures"].items():
+        print(f"  failed {url}: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compares per-call requests.post (a new connection per Gemini call, as the app used to do) with the
+pooled GeminiClient under concurrency, against the local fake Gemini server.
+
+    python benchmarks/bench_llm_client.py --requests 64 --concurrency 8
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# Every prompt must reach the server, so the response cache is switched off for this process.
+os.environ["LLM_CACHE"] = "0"
+
+import requests
+
+from src.common.llm_client import GeminiClient
+from src.common.fake_gemini_server import start_fake_gemini_server
+
+
+def run(call, prompts, concurrency):
+    latencies = []
+
+    def timed(prompt):
+        start = time.perf_counter()
+        call(prompt)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, prompts))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "elapsed": elapsed,
+        "throughput": len(prompts) / elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-call requests vs the pooled LLM client.")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake server time-to-first-token (seconds)")
+    args = parser.parse_args()
+
+    server, api_base = start_fake_gemini_server(first_token_delay=args.latency, chunk_delay=0.0)
+    model = "gemini-2.0-flash"
+    prompts = [f"question {i}: what data is collected?" for i in range(args.requests)]
+
+    def per_call(prompt):
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        response = requests.post(f"{api_base}/models/{model}:generateContent", params={"key": "bench"}, json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    client = GeminiClient(model, api_key="bench", api_base=api_base, max_concurrency=args.concurrency)
+
+    results = {
+        "per-call requests": run(per_call, prompts, args.concurrency),
+        "pooled client": run(client.generate, prompts, args.concurrency),
+    }
+    print(f"requests: {args.requests}, concurrency: {args.concurrency}, server latency: {args.latency}s")
+    for name, r in results.items():
+        print(f"{name:18s} {r['elapsed']:.2f}s  {r['throughput']:.1f} req/s  p50 {r['p50'] * 1000:.0f}ms  p95 {r['p95'] * 1000:.0f}ms")
+    print(f"client stats: {client.stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
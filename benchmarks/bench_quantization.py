@@ -0,0 +1,83 @@
+"""
+Memory, scoring latency and top-k agreement of float16 / int8 embedding storage against float32.
+
+    python benchmarks/bench_quantization.py                     # 200k clustered synthetic 384-d vectors
+    python benchmarks/bench_quantization.py --vectors 1000000 --queries 32
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from src.common.hybrid_retriever import top_k_rows
+from src.common.quantization import QuantizedEmbeddings
+
+
+def normalize(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def synthetic_embeddings(num_vectors, dimension, clusters=200, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimension)).astype("float32")
+    vectors = centers[rng.integers(0, clusters, num_vectors)] + 0.5 * rng.standard_normal((num_vectors, dimension)).astype("float32")
+    return normalize(vectors)
+
+
+def make_queries(embeddings, num_queries, noise=0.05, seed=1):
+    """
+    Perturbed corpus vectors, so each query has close neighbours the way real questions about a policy do.
+    """
+    rng = np.random.default_rng(seed)
+    queries = embeddings[rng.integers(0, len(embeddings), num_queries)].copy()
+    queries += noise * rng.standard_normal(queries.shape).astype("float32")
+    return normalize(queries)
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reduced-precision embedding storage.")
+    parser.add_argument("--vectors", type=int, default=200000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=8, help="Queries scored per call (e.g. the summary questions)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    embeddings = synthetic_embeddings(args.vectors, args.dimension)
+    queries = make_queries(embeddings, args.queries)
+
+    configs = {
+        "float32": (QuantizedEmbeddings.from_float32(embeddings, "float32"), False),
+        "float16": (QuantizedEmbeddings.from_float32(embeddings, "float16"), False),
+        "int8 (dequantized)": (QuantizedEmbeddings.from_float32(embeddings, "int8"), False),
+        "int8 (integer dot)": (QuantizedEmbeddings.from_float32(embeddings, "int8"), True),
+    }
+
+    reference = None
+    print(f"vectors: {args.vectors}, dimension: {args.dimension}, queries per call: {args.queries}, k: {args.k}")
+    print(f"{'storage':20s} {'MB':>8s} {'ms/call':>8s} {'top-k agreement':>16s} {'max |score err|':>16s}")
+    for name, (store, quantize_queries) in configs.items():
+        seconds, scores = best_of(lambda: store.scores(queries, quantize_queries), args.repeat)
+        top = top_k_rows(scores, args.k)
+        if reference is None:
+            reference = (scores, top)
+        agreement = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(top, reference[1])])
+        error = np.abs(scores - reference[0]).max()
+        print(f"{name:20s} {store.nbytes / 1e6:8.1f} {seconds * 1000:8.1f} {agreement:16.3f} {error:16.4f}")
+
+
+if __name__ == "__main__":
+    main()
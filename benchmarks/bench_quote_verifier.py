@@ -0,0 +1,95 @@
+"""
+Speed and accuracy of the quote verifier (src/common/quote_verifier.py) on one policy.
+
+    python benchmarks/bench_quote_verifier.py
+    python benchmarks/bench_quote_verifier.py --policy path/to/policy.txt --quotes 1000
+
+Quotes are sampled from the policy: verbatim spans, perturbed copies (a word dropped or replaced,
+punctuation and case changed, as LLM quotes often are), negated copies ("not" inserted) and
+fabricated sentences built from the policy's own vocabulary. Reported: index build time,
+verification time, how many verbatim quotes are exact matches (spans that start right after a
+negation are rejected by design), how many perturbed quotes are located on their true span, and
+how many negated and fabricated quotes are wrongly accepted.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.common.quote_verifier import QuoteIndex, WORD
+from benchmarks.bench_summary_references import load_policy
+
+
+def sample_quotes(text, count, rng):
+    words = list(WORD.finditer(text))
+    vocabulary = [m.group() for m in words]
+    verbatim, perturbed, negated, fabricated = [], [], [], []
+    for _ in range(count):
+        length = rng.randint(8, 30)
+        first = rng.randrange(0, len(words) - length)
+        start, end = words[first].start(), words[first + length - 1].end()
+        verbatim.append((text[start:end], start, end))
+
+        quote_words = text[start:end].replace(",", "").replace(";", ".").split()
+        position = rng.randrange(len(quote_words))
+        if rng.random() < 0.5:
+            del quote_words[position]
+        else:
+            quote_words[position] = rng.choice(vocabulary)
+        perturbed.append((" ".join(quote_words).capitalize(), start, end))
+
+        quote_words = text[start:end].split()
+        quote_words.insert(rng.randrange(1, len(quote_words)), "not")
+        negated.append(" ".join(quote_words))
+
+        fabricated.append(" ".join(rng.choice(vocabulary) for _ in range(length)))
+    return verbatim, perturbed, negated, fabricated
+
+
+def overlaps(match, start, end):
+    if match["start"] is None:
+        return False
+    shared = min(end, match["end"]) - max(start, match["start"])
+    return shared >= 0.5 * (end - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quote verification.")
+    parser.add_argument("--policy", help="Policy text file (default: the passages of the retrieval eval set)")
+    parser.add_argument("--quotes", type=int, default=300, help="Quotes of each kind")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    text = load_policy(args.policy)
+    rng = random.Random(args.seed)
+    verbatim, perturbed, negated, fabricated = sample_quotes(text, args.quotes, rng)
+
+    start = time.perf_counter()
+    index = QuoteIndex(text)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    verbatim_matches = index.locate_all([q for q, _, _ in verbatim])
+    perturbed_matches = index.locate_all([q for q, _, _ in perturbed])
+    negated_matches = index.locate_all(negated)
+    fabricated_matches = index.locate_all(fabricated)
+    verify_ms = (time.perf_counter() - start) * 1000
+
+    exact = sum(m["status"] == "exact" for m in verbatim_matches)
+    located = sum(m["status"] != "unverified" and overlaps(m, s, e) for m, (_, s, e) in zip(perturbed_matches, perturbed))
+    accepted_negated = sum(m["status"] in ("exact", "fuzzy") for m in negated_matches)
+    accepted = sum(m["status"] in ("exact", "fuzzy") for m in fabricated_matches)
+    total = 4 * args.quotes
+    print(f"policy: {len(text.split())} words, quotes: {total}")
+    print(f"index build: {build_ms:.1f} ms, verification: {verify_ms:.1f} ms ({verify_ms / total * 1000:.0f} µs per quote)")
+    print(f"verbatim quotes matched exactly:     {exact}/{args.quotes}")
+    print(f"perturbed quotes located on span:    {located}/{args.quotes}")
+    print(f"negated quotes wrongly accepted:     {accepted_negated}/{args.quotes}")
+    print(f"fabricated quotes wrongly accepted:  {accepted}/{args.quotes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Quality and latency of cross-encoder reranking on the labelled set in benchmarks/data/retrieval_eval.json.
+
+    python benchmarks/bench_rerank.py
+    python benchmarks/bench_rerank.py --budgets 50 100 300 --candidates 20
+
+For every latency budget, the hybrid first stage retrieves `--candidates` passages per query and the
+reranker reorders as many as fit in the budget; recall@k, MRR and per-query latency are reported
+next to the first stage alone.
+"""
+import os
+import sys
+import json
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from src.common.embeddings import get_embedding_service
+from src.common.hybrid_retriever import HybridRetriever
+from src.common.reranker import RERANKER_MODEL, CrossEncoderReranker
+from benchmarks.bench_retrieval import EVAL_PATH
+
+
+def quality(rankings, queries, ks):
+    recall = {k: 0.0 for k in ks}
+    reciprocal_rank = 0.0
+    for query, ranked in zip(queries, rankings):
+        relevant = set(query["relevant"])
+        for k in ks:
+            recall[k] += len(relevant & set(ranked[:k])) / len(relevant)
+        reciprocal_rank += next((1.0 / (rank + 1) for rank, pid in enumerate(ranked) if pid in relevant), 0.0)
+    return {k: r / len(queries) for k, r in recall.items()}, reciprocal_rank / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cross-encoder reranking under latency budgets.")
+    parser.add_argument("--model", default=RERANKER_MODEL)
+    parser.add_argument("--candidates", type=int, default=50)
+    parser.add_argument("--budgets", type=float, nargs="+", default=[25, 50, 100, 300, 1000], help="Per-query budgets (ms)")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    args = parser.parse_args()
+
+    with open(EVAL_PATH, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    ids = [p["id"] for p in data["passages"]]
+    texts = [p["text"] for p in data["passages"]]
+    queries = data["queries"]
+
+    service = get_embedding_service()
+    retriever = HybridRetriever(texts, service.encode(texts, normalize=True))
+    query_texts = [q["query"] for q in queries]
+    first_stage = retriever.search(query_texts, args.candidates, service.encode(query_texts, normalize=True))
+    candidates = [[hit["index"] for hit in row] for row in first_stage]
+
+    reranker = CrossEncoderReranker(args.model)
+    # Warm up the model so loading time is not charged to the first budget.
+    reranker.rerank(query_texts[0], [texts[i] for i in candidates[0][:reranker.batch_size]])
+
+    header = "  ".join(f"R@{k:<3d}" for k in args.k)
+    print(f"passages: {len(texts)}, queries: {len(queries)}, candidates: {min(args.candidates, len(texts))}, model: {args.model}")
+    print(f"{'stage':22s} {header}  MRR    scored  p50 ms  p95 ms")
+    recall, mrr = quality([[ids[i] for i in row] for row in candidates], queries, args.k)
+    print(f"{'first stage (hybrid)':22s} " + "  ".join(f"{recall[k]:.3f}" for k in args.k) + f"  {mrr:.3f}")
+
+    for budget in args.budgets:
+        reranker.budget_seconds = budget / 1000.0
+        rankings, latencies, scored = [], [], []
+        for query, row in zip(query_texts, candidates):
+            result = reranker.rerank(query, [texts[i] for i in row])
+            rankings.append([ids[row[i]] for i in result["order"]])
+            latencies.append(result["seconds"] * 1000)
+            scored.append(result["scored"])
+        recall, mrr = quality(rankings, queries, args.k)
+        row = "  ".join(f"{recall[k]:.3f}" for k in args.k)
+        print(f"{f'rerank @ {budget:.0f} ms':22s} {row}  {mrr:.3f}  {np.mean(scored):6.1f}  "
+              f"{np.percentile(latencies, 50):6.1f}  {np.percentile(latencies, 95):6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Recall@k and latency of dense, BM25 and hybrid retrieval on the labelled set in benchmarks/data/retrieval_eval.json.
+
+    python benchmarks/bench_retrieval.py
+    python benchmarks/bench_retrieval.py --dense_weight 0.5 --k 1 3 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from src.common.bm25 import BM25Index
+from src.common.embeddings import get_embedding_service
+from src.common.hybrid_retriever import HybridRetriever
+
+EVAL_PATH = os.path.join(os.path.dirname(__file__), "data", "retrieval_eval.json")
+
+
+def evaluate(retriever, queries, query_embeddings, ids, ks, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hits = retriever.search([q["query"] for q in queries], max(ks), query_embeddings)
+        timings.append(time.perf_counter() - start)
+
+    recall = {k: 0.0 for k in ks}
+    reciprocal_rank = 0.0
+    for query, row in zip(queries, hits):
+        relevant = set(query["relevant"])
+        ranked = [ids[hit["index"]] for hit in row]
+        for k in ks:
+            recall[k] += len(relevant & set(ranked[:k])) / len(relevant)
+        reciprocal_rank += next((1.0 / (rank + 1) for rank, pid in enumerate(ranked) if pid in relevant), 0.0)
+    n = len(queries)
+    return {k: r / n for k, r in recall.items()}, reciprocal_rank / n, min(timings) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dense vs BM25 vs hybrid retrieval.")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--dense_weight", type=float, default=0.6)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(EVAL_PATH, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    ids = [p["id"] for p in data["passages"]]
+    texts = [p["text"] for p in data["passages"]]
+    queries = data["queries"]
+
+    service = get_embedding_service()
+    embeddings = service.encode(texts, normalize=True)
+    query_embeddings = service.encode([q["query"] for q in queries], normalize=True)
+    bm25 = BM25Index.build(texts)
+
+    configs = {
+        "dense": HybridRetriever(texts, embeddings, bm25, mode="dense"),
+        "bm25": HybridRetriever(texts, embeddings, bm25, mode="bm25"),
+        "hybrid (linear)": HybridRetriever(texts, embeddings, bm25, dense_weight=args.dense_weight, fusion="linear"),
+        "hybrid (rrf)": HybridRetriever(texts, embeddings, bm25, dense_weight=args.dense_weight, fusion="rrf"),
+    }
+    print(f"passages: {len(texts)}, queries: {len(queries)}, model: {service.model_name}")
+    header = "  ".join(f"R@{k:<3d}" for k in args.k)
+    print(f"{'mode':16s} {header}  MRR    ms/query")
+    for name, retriever in configs.items():
+        recall, mrr, latency = evaluate(retriever, queries, query_embeddings, ids, args.k, args.repeat)
+        row = "  ".join(f"{recall[k]:.3f}" for k in args.k)
+        print(f"{name:16s} {row}  {mrr:.3f}  {latency * 1000:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+End-to-end latency and Gemini input tokens of whole-document summarization for each references mode:
+"full" (a second whole-document call after the summary), "pipelined" (one small call per section,
+started as soon as the section is streamed) and "local" (quotes found by retrieval, no extra call).
+Runs against the local fake Gemini server, whose summaries quote sentences from the policy.
+
+    python benchmarks/bench_summary_references.py
+    python benchmarks/bench_summary_references.py --policy path/to/policy.txt --prefill-ms 40
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# Every prompt must reach the server, so the response cache is switched off for this process.
+os.environ["LLM_CACHE"] = "0"
+
+from src.common.fake_gemini_server import start_fake_gemini_server
+from benchmarks.bench_retrieval import EVAL_PATH
+
+
+def load_policy(path):
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    with open(EVAL_PATH, "r", encoding="utf-8") as f:
+        return "\n\n".join(p["text"] for p in json.load(f)["passages"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark summary references modes.")
+    parser.add_argument("--policy", help="Policy text file (default: the passages of the retrieval eval set)")
+    parser.add_argument("--modes", nargs="+", default=["full", "pipelined", "local"])
+    parser.add_argument("--first-token-ms", type=float, default=400)
+    parser.add_argument("--prefill-ms", type=float, default=20, help="Extra time to first token per 1k prompt tokens")
+    parser.add_argument("--chunk-ms", type=float, default=30, help="Delay between streamed chunks of 5 words")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    server, api_base = start_fake_gemini_server(args.first_token_ms / 1000, args.chunk_ms / 1000, prefill_delay=args.prefill_ms / 1000)
+    os.environ["GEMINI_API_BASE"] = api_base
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    os.environ["LLM_BACKEND"] = "gemini"
+
+    from src.common.llm_client import get_llm_client
+    from src.common.metrics import metrics
+    from src.summary.summary import MODEL_NAME, iter_summary_with_references
+
+    policy_text = load_policy(args.policy)
+    client = get_llm_client(MODEL_NAME)
+    # Warm up the embedding model and chunk cache so they are not charged to the first mode.
+    list(iter_summary_with_references(policy_text, "Benchmark", "local"))
+
+    print(f"policy: {len(policy_text.split())} words, repeats: {args.repeat}")
+    print(f"{'mode':10s} {'summary s':>10s} {'refs wait s':>12s} {'total s':>8s} {'calls':>6s} {'input tokens':>13s}")
+    for mode in args.modes:
+        totals, summary_times, waits, calls, tokens = [], [], [], [], []
+        for _ in range(args.repeat):
+            before = client.stats()
+            start = time.perf_counter()
+            for kind, _ in iter_summary_with_references(policy_text, "Benchmark", mode):
+                if kind == "stage":
+                    summary_times.append(time.perf_counter() - start)
+            totals.append(time.perf_counter() - start)
+            waits.append(metrics.snapshot()["summary.references_wait"]["last"])
+            after = client.stats()
+            calls.append(after["requests"] - before["requests"])
+            tokens.append(after["prompt_tokens"] - before["prompt_tokens"])
+        n = args.repeat
+        print(f"{mode:10s} {sum(summary_times) / n:10.2f} {sum(waits) / n:12.2f} {sum(totals) / n:8.2f} "
+              f"{sum(calls) / n:6.1f} {sum(tokens) / n:13.0f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Local stand-in for the GCS policy bucket, used by the fetch benchmark.
+
+Serves /<name>.txt with synthetic policy text, an artificial per-request latency,
+ETag / 304 support and optional injected failures: /fail-<status>/<name>.txt always fails,
+/flaky-<status>-<n>/<name>.txt fails the first n requests and then succeeds. The server counts
+requests per path (server.requests) and the peak number of concurrent requests (server.max_in_flight).
+"""
+import time
+import hashlib
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def synthetic_policy(name, paragraphs=200):
+    return "\n\n".join(
+        f"Section {i} of the {name} privacy policy. We collect, use and share information as described here."
+        for i in range(paragraphs)
+    )
+
+
+def make_handler(latency):
+    class PolicyHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            server = self.server
+            with server.lock:
+                server.requests[self.path] += 1
+                count = server.requests[self.path]
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            try:
+                time.sleep(latency)
+                self.respond(count)
+            finally:
+                with server.lock:
+                    server.in_flight -= 1
+
+        def respond(self, count):
+            parts = self.path.strip("/").split("/")
+            if parts[0].startswith("flaky-"):
+                _, status, failures = parts[0].split("-")
+                if count <= int(failures):
+                    parts[0] = f"fail-{status}"
+            if parts[0].startswith("fail-"):
+                self.send_response(int(parts[0].split("-")[1]))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = synthetic_policy(parts[-1]).encode("utf-8")
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return PolicyHandler
+
+
+def start_server(latency=0.05, port=0):
+    """
+    Starts the server on a background thread and returns (server, base_url).
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency))
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = Counter()
+    server.in_flight = server.max_in_flight = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
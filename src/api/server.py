@@ -0,0 +1,225 @@
+"""
+Headless HTTP/JSON service for Q&A, summaries and comparisons.
+
+    uvicorn src.api.server:app --host 0.0.0.0 --port 8000 --workers 4
+    python -m src.api.server --port 8000 --workers 4
+
+Each worker process loads the embedding model, LLM client and comparator once at startup and keeps
+Q&A indexes warm in memory between requests. Endpoints are async; the blocking pipeline work runs on
+a bounded thread pool so one worker serves several requests at once. Workers share the on-disk caches
+in PRIVACY_CACHE_DIR (indexes, embeddings, LLM responses, stored summaries and comparisons), so more
+workers or hosts pointed at the same cache directory scale out without recomputing anything.
+"""
+import os
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import requests
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from src.comparison.src.policy_comparator import PolicyComparator
+from src.comparison.src.policy_loader import canonical_platform, load_policy_text
+from src.common.embeddings import get_embedding_service
+from src.common.jobs import get_job_queue
+from src.common.llm_cache import get_llm_cache
+from src.common.llm_client import LLMError, get_llm_client
+from src.common.metrics import metrics
+from src.common.policy_store import PolicyFetchError
+from src.common.singleflight import single_flight_stats
+from src.qa.answer_cache import get_answer_cache
+from src.qa.qa import stream_answer, stream_corpus_answer
+from src.summary.summary import summarize_policy_for_platform, verify_summary_references
+
+load_dotenv()
+
+SERVICE_THREADS = int(os.getenv("SERVICE_THREADS", 8))
+
+_executor = ThreadPoolExecutor(max_workers=SERVICE_THREADS, thread_name_prefix="privacy-api")
+_comparator = None
+
+
+class QARequest(BaseModel):
+    platform: str
+    question: str
+    use_cache: bool = True
+
+
+class CorpusQARequest(BaseModel):
+    question: str
+    platforms: Optional[List[str]] = None
+
+
+class SummaryRequest(BaseModel):
+    platform: str
+    use_store: bool = True
+
+
+class CompareRequest(BaseModel):
+    platform_a: str
+    platform_b: str
+    use_store: bool = True
+
+
+def warm_up():
+    global _comparator
+    get_embedding_service().model
+    get_llm_client()
+    _comparator = PolicyComparator(api_key=os.getenv("GEMINI_API_KEY"))
+    get_job_queue()
+    print(f"✅ Service warm ({SERVICE_THREADS} threads)")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await asyncio.get_running_loop().run_in_executor(_executor, warm_up)
+    yield
+    _executor.shutdown(wait=False)
+
+
+app = FastAPI(title="Privacy Policy Analysis API", lifespan=lifespan)
+
+
+async def run_blocking(fn, *args):
+    """
+    Runs a blocking pipeline call on the service thread pool, mapping pipeline errors to HTTP errors:
+    unknown platform 404, Gemini rate limit 429, policy host or Gemini failure 502, policy host
+    unavailable or unreachable (and no stored copy) 503, policy host timeout 504.
+    """
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except LLMError as e:
+        raise HTTPException(status_code=429 if e.status_code == 429 else 502, detail=str(e))
+    except PolicyFetchError as e:
+        raise HTTPException(status_code=503 if e.status_code == 429 or e.status_code >= 500 else 502, detail=str(e))
+    except requests.Timeout as e:
+        raise HTTPException(status_code=504, detail=f"Timed out fetching the policy: {str(e)}")
+    except requests.RequestException as e:
+        raise HTTPException(status_code=503, detail=f"Could not fetch the policy: {str(e)}")
+    except Exception as e:
+        print(f"⚠️ {fn.__name__} failed: {type(e).__name__}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {str(e)}")
+
+
+def answer_question(platform, question, use_cache):
+    for kind, payload in stream_answer(platform, question, use_cache):
+        if kind == "result":
+            return payload
+
+
+def answer_corpus_question(question, platforms):
+    for kind, payload in stream_corpus_answer(question, platforms):
+        if kind == "result":
+            return payload
+
+
+def summarize_platform(platform, use_store):
+    summary_text, references, original_url = summarize_policy_for_platform(platform, None, use_store)
+    quotes = verify_summary_references(platform, references) if summary_text else []
+    return summary_text, references, original_url, quotes
+
+
+def compare_platforms(platform_a, platform_b, use_store):
+    """
+    Resolves both platforms to their privacy_db.csv names and loads their texts the way the UI, the batch
+    CLI and comparison jobs do, so all of them share stored comparisons and in-flight runs.
+    """
+    platform_a, platform_b = canonical_platform(platform_a), canonical_platform(platform_b)
+    policy_a_text, policy_b_text = load_policy_text(platform_a), load_policy_text(platform_b)
+    return platform_a, platform_b, _comparator.compare_texts(platform_a, platform_b, policy_a_text, policy_b_text, use_store)
+
+
+@app.post("/qa")
+async def qa(request: QARequest):
+    result = await run_blocking(answer_question, request.platform, request.question, request.use_cache)
+    return {
+        "platform": request.platform,
+        "answer": result["answer"],
+        "source": result["txt_href"],
+        "sources": result["sources"],
+        "cached": result["cached"],
+    }
+
+
+@app.post("/qa/corpus")
+async def qa_corpus(request: CorpusQARequest):
+    result = await run_blocking(answer_corpus_question, request.question, request.platforms)
+    return {"question": request.question, "answer": result["answer"], "sources": result["sources"]}
+
+
+@app.post("/summary")
+async def summary(request: SummaryRequest):
+    summary_text, references, original_url, quotes = await run_blocking(summarize_platform, request.platform, request.use_store)
+    if summary_text is None:
+        raise HTTPException(status_code=404, detail=f"Unknown platform: {request.platform}")
+    return {"platform": request.platform, "summary": summary_text, "references": references, "source": original_url, "quotes": quotes}
+
+
+@app.post("/compare")
+async def compare(request: CompareRequest):
+    platform_a, platform_b, result = await run_blocking(compare_platforms, request.platform_a, request.platform_b, request.use_store)
+    return {"platform_a": platform_a, "platform_b": platform_b, **result}
+
+
+@app.post("/jobs/summary")
+async def submit_summary_job(request: SummaryRequest):
+    return {"job_id": get_job_queue().submit("summary", platform=request.platform, use_store=request.use_store)}
+
+
+@app.post("/jobs/compare")
+async def submit_comparison_job(request: CompareRequest):
+    job_id = get_job_queue().submit("comparison", platform_a=request.platform_a, platform_b=request.platform_b, use_store=request.use_store)
+    return {"job_id": job_id}
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    if not get_job_queue().cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} does not exist or has already finished")
+    return get_job_queue().get(job_id)
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "warm": _comparator is not None}
+
+
+@app.get("/stats")
+async def stats():
+    return {
+        "embeddings": get_embedding_service().cache_stats(),
+        "llm_responses": get_llm_cache().stats(),
+        "llm_client": get_llm_client().stats(),
+        "qa_answers": get_answer_cache().stats(),
+        "single_flight": single_flight_stats(),
+        "latency": metrics.snapshot(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the headless privacy policy API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes, each with its own warm state")
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run("src.api.server:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
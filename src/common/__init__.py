@@ -0,0 +1 @@
+# This file makes the common directory a Python package 
@@ -0,0 +1,168 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+
+from src.common.paths import CACHE_DIR
+
+BM25_CACHE_DIR = os.path.join(CACHE_DIR, "bm25")
+MEMORY_ITEMS = 64
+DISK_ITEMS = int(os.getenv("BM25_CACHE_MAX_ITEMS", 1000))  # indexes kept under BM25_CACHE_DIR, least recently used evicted
+K1 = 1.5
+B = 0.75
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how in is it of on or our that the this to we what when "
+    "where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed list of texts, precomputed as a sparse (documents x terms) weight matrix.
+
+    Each stored weight is idf * saturated term frequency, so scoring any number of queries is one
+    sparse matrix product with their term-count vectors.
+    """
+
+    def __init__(self, weights: sparse.csr_matrix, vocabulary: Dict[str, int]):
+        self.weights = weights
+        self.vocabulary = vocabulary
+
+    @property
+    def num_documents(self) -> int:
+        return self.weights.shape[0]
+
+    @classmethod
+    def build(cls, texts: Sequence[str], k1: float = K1, b: float = B):
+        vocabulary, rows, cols, counts = {}, [], [], []
+        lengths = np.zeros(len(texts), dtype="float32")
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths[row] = len(tokens)
+            for token, count in Counter(tokens).items():
+                rows.append(row)
+                cols.append(vocabulary.setdefault(token, len(vocabulary)))
+                counts.append(count)
+
+        tf = np.asarray(counts, dtype="float32")
+        rows = np.asarray(rows, dtype="int32")
+        cols = np.asarray(cols, dtype="int32")
+        df = np.bincount(cols, minlength=len(vocabulary)).astype("float32")
+        idf = np.log1p((len(texts) - df + 0.5) / (df + 0.5))
+        average_length = lengths.mean() if len(texts) and lengths.mean() > 0 else 1.0
+        norm = k1 * (1 - b + b * lengths[rows] / average_length)
+        data = idf[cols] * tf * (k1 + 1) / (tf + norm)
+        weights = sparse.csr_matrix((data, (rows, cols)), shape=(len(texts), len(vocabulary)), dtype="float32")
+        return cls(weights, vocabulary)
+
+    def query_matrix(self, queries: Sequence[str]) -> sparse.csr_matrix:
+        rows, cols = [], []
+        for row, query in enumerate(queries):
+            for token in set(tokenize(query)):
+                col = self.vocabulary.get(token)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        data = np.ones(len(rows), dtype="float32")
+        return sparse.csr_matrix((data, (rows, cols)), shape=(len(queries), len(self.vocabulary)), dtype="float32")
+
+    def scores(self, queries: Sequence[str]) -> np.ndarray:
+        """
+        Returns a dense (queries x documents) BM25 score matrix.
+        """
+        return np.asarray((self.query_matrix(queries) @ self.weights.T).todense(), dtype="float32")
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        sparse.save_npz(os.path.join(path, "bm25.npz"), self.weights)
+        with open(os.path.join(path, "bm25_vocabulary.json"), "w", encoding="utf-8") as f:
+            json.dump(self.vocabulary, f)
+
+    @classmethod
+    def load(cls, path: str):
+        weights = sparse.load_npz(os.path.join(path, "bm25.npz")).tocsr()
+        with open(os.path.join(path, "bm25_vocabulary.json"), "r", encoding="utf-8") as f:
+            vocabulary = json.load(f)
+        return cls(weights, vocabulary)
+
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        return os.path.exists(os.path.join(path, "bm25.npz"))
+
+
+def texts_key(texts: Sequence[str]) -> str:
+    digest = hashlib.sha256(json.dumps({"k1": K1, "b": B}).encode("utf-8"))
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:32]
+
+
+def prune_disk_cache(path: Optional[str] = None, max_items: Optional[int] = None):
+    """
+    Deletes the least recently used persisted indexes beyond `max_items` (DISK_ITEMS) under `path`
+    (BM25_CACHE_DIR), by modification time, which get_bm25_index refreshes on every load from disk.
+    """
+    path = path or BM25_CACHE_DIR
+    max_items = DISK_ITEMS if max_items is None else max_items
+    try:
+        entries = [entry for entry in os.scandir(path) if entry.is_dir() and not entry.name.endswith(".tmp")]
+    except FileNotFoundError:
+        return
+    if len(entries) <= max_items:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:len(entries) - max_items]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def get_bm25_index(texts: Sequence[str]) -> BM25Index:
+    """
+    Returns the BM25 index for this exact list of chunk texts, building and persisting it
+    under BM25_CACHE_DIR on first use. At most DISK_ITEMS indexes are kept on disk.
+    """
+    key = texts_key(texts)
+    with _memory_lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+
+    path = os.path.join(BM25_CACHE_DIR, key)
+    if BM25Index.exists(path):
+        index = BM25Index.load(path)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    else:
+        index = BM25Index.build(texts)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        index.save(tmp_path)
+        if os.path.exists(path):
+            shutil.rmtree(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        prune_disk_cache()
+
+    with _memory_lock:
+        _memory[key] = index
+        while len(_memory) > MEMORY_ITEMS:
+            _memory.popitem(last=False)
+    return index
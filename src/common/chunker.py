@@ -0,0 +1,140 @@
+import os
+import re
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List
+
+from src.common.paths import CACHE_DIR
+from src.common.policy_store import content_hash
+
+# Bump when chunk boundaries change, so every index built on top of chunks is rebuilt.
+CHUNKER_VERSION = 1
+CHUNK_CACHE_DIR = os.path.join(CACHE_DIR, "chunks")
+MEMORY_ITEMS = 64
+
+LINE_RE = re.compile(r"[^\n]*\S[^\n]*")
+WORD_RE = re.compile(r"\S+")
+BULLET_RE = re.compile(r"^\s*(?:[-*•·▪●]|\(?[a-z]\))\s")
+
+
+def is_heading(line: str) -> bool:
+    """
+    A heading is a short line without sentence punctuation, e.g. "3. HOW WE SHARE YOUR INFORMATION" or "Cookies:".
+    """
+    stripped = line.strip()
+    return (
+        2 <= len(stripped) <= 80
+        and len(stripped.split()) <= 12
+        and stripped[-1] not in ".,;!?\"'”)"
+        and any(c.isalpha() for c in stripped)
+        and not BULLET_RE.match(stripped)
+    )
+
+
+def iter_chunks(text: str, max_words: int = 200, overlap: int = 0, min_words: int = 4) -> Iterator[Dict]:
+    """
+    Yields structure-aware chunks of `text` in one linear pass:
+    {"id", "start", "end", "section", "text"}, where text is text[start:end].
+
+    A heading (preceded by a blank line) starts a new chunk and becomes its section, unless the
+    current chunk is still under a quarter full, so runs of short lines are not split up; otherwise
+    chunks fill up to `max_words`, breaking at the last paragraph boundary in the second half of
+    the window when there is one, and repeating the last `overlap` words of a window that had to be split.
+    """
+    overlap = min(max(overlap, 0), max_words // 2)
+    doc_id = content_hash(text)[:12]
+    section, window_section = "", ""
+    section_min_words = max(min_words, max_words // 4)
+    window = []  # (start, end) of each word in the current chunk
+    paragraph_ends = []  # number of words in the window at each paragraph boundary
+    fresh = 0  # words in the window that no emitted chunk contains yet
+
+    def emit(words):
+        start, end = words[0][0], words[-1][1]
+        return {"id": f"{doc_id}-{start}", "start": start, "end": end, "section": window_section, "text": text[start:end]}
+
+    previous_end = 0
+    for line in LINE_RE.finditer(text):
+        new_paragraph = previous_end == 0 or text.count("\n", previous_end, line.start()) >= 2
+        previous_end = line.end()
+        if new_paragraph and window:
+            paragraph_ends.append(len(window))
+
+        if new_paragraph and is_heading(line.group()):
+            if len(window) >= section_min_words:
+                yield emit(window)
+                window, paragraph_ends, fresh = [], [], 0
+            section = line.group().strip().rstrip(":")
+
+        for word in WORD_RE.finditer(text, line.start(), line.end()):
+            if not window:
+                window_section = section
+            window.append(word.span())
+            fresh += 1
+            if len(window) < max_words:
+                continue
+            breaks = [b for b in paragraph_ends if b >= max_words // 2]
+            if breaks:
+                cut, keep = breaks[-1], breaks[-1]
+            else:
+                cut, keep = len(window), len(window) - overlap
+            yield emit(window[:cut])
+            window = window[keep:]
+            fresh = len(window) if breaks else 0
+            window_section = section
+            paragraph_ends = [b - keep for b in paragraph_ends if b > keep]
+
+    if fresh and len(window) >= min_words:
+        yield emit(window)
+
+
+def chunker_key(policy_hash: str, max_words: int, overlap: int, min_words: int) -> str:
+    config = {"policy": policy_hash, "version": CHUNKER_VERSION, "max_words": max_words, "overlap": overlap, "min_words": min_words}
+    return content_hash(json.dumps(config, sort_keys=True))[:32]
+
+
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def chunk_policy(text: str, max_words: int = 200, overlap: int = 0, min_words: int = 4, use_cache: bool = True) -> List[Dict]:
+    """
+    iter_chunks as a list, cached per policy version and chunker config.
+
+    Only ids, offsets and sections are persisted (under CHUNK_CACHE_DIR); chunk texts are sliced
+    back out of `text`, so the Q&A index, the summary and the comparison sections all reuse one pass.
+    """
+    if not use_cache:
+        return list(iter_chunks(text, max_words, overlap, min_words))
+
+    key = chunker_key(content_hash(text), max_words, overlap, min_words)
+    with _memory_lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            layout = _memory[key]
+        else:
+            layout = None
+
+    path = os.path.join(CHUNK_CACHE_DIR, f"{key}.json")
+    if layout is None and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            layout = json.load(f)
+    if layout is None:
+        layout = [{k: chunk[k] for k in ("id", "start", "end", "section")} for chunk in iter_chunks(text, max_words, overlap, min_words)]
+        os.makedirs(CHUNK_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(layout, f)
+        os.replace(tmp_path, path)
+
+    with _memory_lock:
+        _memory[key] = layout
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_ITEMS:
+            _memory.popitem(last=False)
+    return [dict(chunk, text=text[chunk["start"]:chunk["end"]]) for chunk in layout]
+
+
+def chunk_texts(text: str, max_words: int = 200, overlap: int = 0, min_words: int = 4) -> List[str]:
+    return [chunk["text"] for chunk in chunk_policy(text, max_words, overlap, min_words)]
@@ -0,0 +1,140 @@
+import os
+import re
+import math
+import threading
+from typing import Dict, Optional, Sequence
+
+# Raw pieces are words and punctuation marks; long words count extra, as subword tokenizers split them.
+PIECE_RE = re.compile(r"\w+|[^\w\s]")
+LONG_WORD_CHARS = 8
+# Gemini tokens per raw piece on English policy text; refined online from API usage metadata.
+DEFAULT_TOKENS_PER_PIECE = float(os.getenv("TOKENS_PER_PIECE", 1.1))
+SHINGLE_WORDS = 8
+
+
+def raw_piece_count(text: str) -> int:
+    return sum(1 + len(piece) // LONG_WORD_CHARS for piece in PIECE_RE.findall(text))
+
+
+class TokenEstimator:
+    """
+    Calibrated token estimator: counts words, punctuation and long-word splits, scaled by a
+    tokens-per-piece ratio that is updated from the prompt token counts Gemini reports.
+    """
+
+    def __init__(self, tokens_per_piece: float = DEFAULT_TOKENS_PER_PIECE, smoothing: float = 0.1):
+        self.tokens_per_piece = tokens_per_piece
+        self.smoothing = smoothing
+        self.observations = 0
+        self._lock = threading.Lock()
+
+    def estimate(self, text: str) -> int:
+        if not text:
+            return 0
+        return int(math.ceil(raw_piece_count(text) * self.tokens_per_piece))
+
+    def observe(self, text: str, actual_tokens: int):
+        """
+        Moves the ratio towards the one measured on a real request (exponential moving average).
+        """
+        pieces = raw_piece_count(text)
+        if not pieces or not actual_tokens:
+            return
+        with self._lock:
+            measured = actual_tokens / pieces
+            if self.observations == 0:
+                self.tokens_per_piece = measured
+            else:
+                self.tokens_per_piece += self.smoothing * (measured - self.tokens_per_piece)
+            self.observations += 1
+
+
+_estimator = None
+_estimator_lock = threading.Lock()
+
+
+def get_token_estimator() -> TokenEstimator:
+    global _estimator
+    with _estimator_lock:
+        if _estimator is None:
+            _estimator = TokenEstimator()
+        return _estimator
+
+
+def estimate_tokens(text: str) -> int:
+    return get_token_estimator().estimate(text)
+
+
+def _shingles(text: str) -> set:
+    words = text.lower().split()
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def _trim_to_budget(text: str, budget: int, estimator: TokenEstimator) -> str:
+    words = text.split()
+    low, high = 0, len(words)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimator.estimate(" ".join(words[:mid])) <= budget:
+            low = mid
+        else:
+            high = mid - 1
+    return " ".join(words[:low])
+
+
+def pack_context(chunks: Sequence[str], budget: int, scores: Optional[Sequence[float]] = None,
+                 estimator: Optional[TokenEstimator] = None, separator: str = "\n\n",
+                 max_overlap: float = 0.6, keep_order: bool = True) -> Dict:
+    """
+    Greedily fills `budget` tokens with the highest-scoring chunks (given order when `scores` is None).
+
+    Chunks whose word 8-grams are already covered by selected text beyond `max_overlap` are skipped,
+    chunks that do not fit are skipped in favour of smaller ones, and a top chunk larger than the
+    whole budget is trimmed. Returns {"chunks", "indices", "tokens", "duplicates", "dropped"}; the
+    selected chunks are in document order unless `keep_order` is False.
+    """
+    estimator = estimator or get_token_estimator()
+    order = range(len(chunks)) if scores is None else sorted(range(len(chunks)), key=lambda i: -scores[i])
+    separator_tokens = estimator.estimate(separator)
+
+    selected, covered = {}, set()
+    used, duplicates, dropped = 0, 0, 0
+    for i in order:
+        text = chunks[i]
+        if not text or not text.strip():
+            continue
+        shingles = _shingles(text)
+        if shingles and len(shingles & covered) / len(shingles) > max_overlap:
+            duplicates += 1
+            continue
+        cost = estimator.estimate(text) + (separator_tokens if selected else 0)
+        if used + cost > budget:
+            if selected:
+                dropped += 1
+                continue
+            text = _trim_to_budget(text, budget, estimator)
+            if not text:
+                dropped += 1
+                continue
+            cost = estimator.estimate(text)
+        selected[i] = text
+        covered |= shingles
+        used += cost
+
+    indices = sorted(selected) if keep_order else list(selected)
+    return {
+        "chunks": [selected[i] for i in indices],
+        "indices": indices,
+        "tokens": used,
+        "duplicates": duplicates,
+        "dropped": dropped,
+    }
+
+
+def pack_text(chunks: Sequence[str], budget: int, scores: Optional[Sequence[float]] = None, separator: str = "\n\n") -> str:
+    """
+    pack_context joined into one context string.
+    """
+    return separator.join(pack_context(chunks, budget, scores, separator=separator)["chunks"])
@@ -0,0 +1,274 @@
+"""
+One index over every platform's chunks, for questions answered across many platforms at once.
+
+    python -m src.common.corpus_index --build
+    python -m src.common.corpus_index --build --backend ivf   # approximate search (CORPUS_INDEX_BACKEND)
+    python -m src.common.corpus_index --query "Do they sell data to brokers?" --platform TikTok --platform Reddit
+
+The index is stored under .cache/corpus_index together with the policy URLs it was built from; it is
+rebuilt when privacy_db.csv points at different policy versions or the embedding model / storage changes.
+"""
+import os
+import json
+import shutil
+import argparse
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+import pandas as pd
+
+from src.common.bm25 import B as BM25_B, K1 as BM25_K1, BM25Index
+from src.common.chunker import CHUNKER_VERSION, chunk_policy
+from src.common.embeddings import get_embedding_service
+from src.common.hybrid_retriever import RETRIEVAL_MODE, fuse_scores, top_k_rows
+from src.common.quantization import EMBEDDING_STORAGE, QuantizedEmbeddings, as_scorable
+from src.common.paths import CACHE_DIR, PRIVACY_DB_CSV
+from src.common.policy_fetcher import fetch_policies
+from src.common.vector_index import BACKENDS, configure_search, make_index
+
+CORPUS_INDEX_DIR = os.path.join(CACHE_DIR, "corpus_index")
+CHUNK_WORDS = 200
+CHUNK_OVERLAP = 50
+CORPUS_INDEX_BACKEND = os.getenv("CORPUS_INDEX_BACKEND", "flat")  # "flat", "ivf", "hnsw" or "ivfpq"
+
+
+def _default_encode(texts: List[str]) -> np.ndarray:
+    return get_embedding_service().encode(texts, normalize=True)
+
+
+class CorpusIndex:
+    """
+    One dense index over every platform's chunks, with platform, offset and section metadata per chunk.
+
+    Rows are grouped by platform, so restricting a search to some platforms scores only their
+    contiguous row ranges (views of the embedding matrix, never a gathered copy), and any number of
+    queries are scored with one matrix product per range. A BM25 index over the whole corpus is kept
+    alongside; when the query texts are passed too, its scores are fused with the dense ones
+    (RETRIEVAL_MODE), with term statistics taken across every platform.
+
+    With an approximate backend (ivf, hnsw, ivfpq) a FAISS index over the same rows serves dense
+    searches of the whole corpus. Platform-filtered, hybrid and BM25 searches still score the selected
+    rows exactly: a platform's few hundred rows are faster to scan than to search through a FAISS id
+    selector, which also loses recall (benchmarks/bench_ann.py).
+    """
+
+    def __init__(self, embeddings, metadata: List[Dict], model_name: Optional[str] = None, urls: Optional[List[str]] = None,
+                 bm25: Optional[BM25Index] = None, backend: str = "flat", ann=None):
+        self.embeddings = as_scorable(embeddings)
+        self.bm25 = bm25
+        self.backend = backend
+        self.ann = ann
+        self.metadata = metadata
+        self.model_name = model_name or get_embedding_service().model_name
+        self.urls = urls or []
+        self.platform_ranges: Dict[str, Tuple[int, int]] = {}
+        for row, meta in enumerate(metadata):
+            start, _ = self.platform_ranges.get(meta["platform"], (row, row))
+            self.platform_ranges[meta["platform"]] = (start, row + 1)
+        self._names = {platform.lower(): platform for platform in self.platform_ranges}
+
+    @property
+    def platforms(self) -> List[str]:
+        return list(self.platform_ranges)
+
+    @classmethod
+    def build(cls, policies: Dict[str, str], encode=_default_encode, storage: str = EMBEDDING_STORAGE,
+              urls: Optional[List[str]] = None, backend: str = CORPUS_INDEX_BACKEND):
+        """
+        Builds the index from {platform: policy text}, keeping embeddings in `storage` precision and
+        training a FAISS index of type `backend` unless it is "flat".
+        """
+        metadata = []
+        for platform, text in policies.items():
+            for chunk in chunk_policy(text, max_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+                metadata.append(dict(chunk, platform=platform))
+        embeddings = np.asarray(encode([m["text"] for m in metadata]), dtype="float32")
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12
+        bm25 = BM25Index.build([m["text"] for m in metadata])
+        ann = make_index(embeddings, backend, storage) if backend != "flat" else None
+        return cls(QuantizedEmbeddings.from_float32(embeddings, storage), metadata, urls=urls, bm25=bm25, backend=backend, ann=ann)
+
+    def config(self) -> Dict:
+        return {"model": self.model_name, "storage": self.embeddings.storage, "chunker": [CHUNK_WORDS, CHUNK_OVERLAP, CHUNKER_VERSION],
+                "bm25": [BM25_K1, BM25_B] if self.bm25 is not None else None, "backend": self.backend}
+
+    def save(self, path: str = CORPUS_INDEX_DIR):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        self.embeddings.save(tmp_path)
+        if self.bm25 is not None:
+            self.bm25.save(tmp_path)
+        if self.ann is not None:
+            faiss.write_index(self.ann, os.path.join(tmp_path, "index.faiss"))
+        with open(os.path.join(tmp_path, "metadata.json"), "w", encoding="utf-8") as f:
+            json.dump({"config": self.config(), "urls": self.urls, "chunks": self.metadata}, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = CORPUS_INDEX_DIR, mmap: bool = True):
+        with open(os.path.join(path, "metadata.json"), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        embeddings = QuantizedEmbeddings.load(path, mmap=mmap)
+        bm25 = BM25Index.load(path) if BM25Index.exists(path) else None
+        ann = None
+        if os.path.exists(os.path.join(path, "index.faiss")):
+            flags = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_READ_ONLY", 0) if mmap else 0
+            ann = configure_search(faiss.read_index(os.path.join(path, "index.faiss"), flags))
+        return cls(embeddings, data["chunks"], data["config"]["model"], data["urls"], bm25, data["config"]["backend"], ann)
+
+    def resolve(self, platforms: Optional[List[str]]) -> List[str]:
+        """
+        Canonical platform names for `platforms` (matched case-insensitively); every platform if None.
+        """
+        if platforms is None:
+            return self.platforms
+        missing = [p for p in platforms if p.lower() not in self._names]
+        if missing:
+            raise KeyError(f"Platforms not in corpus index: {missing}")
+        return [self._names[p.lower()] for p in platforms]
+
+    def _ranges(self, platforms: Optional[List[str]]) -> List[Tuple[int, int]]:
+        if platforms is None:
+            return [(0, len(self.metadata))]
+        return [self.platform_ranges[p] for p in self.resolve(platforms)]
+
+    def _range_scores(self, query_embeddings: np.ndarray, start: int, end: int) -> np.ndarray:
+        return self.embeddings.rows(start, end).scores(query_embeddings)
+
+    def _lexical(self, queries: Optional[List[str]]) -> Optional[np.ndarray]:
+        if queries is None or self.bm25 is None or RETRIEVAL_MODE == "dense":
+            return None
+        return self.bm25.scores(queries)
+
+    @staticmethod
+    def _fuse(dense: np.ndarray, lexical: Optional[np.ndarray]) -> np.ndarray:
+        if lexical is None:
+            return dense
+        return lexical if RETRIEVAL_MODE == "bm25" else fuse_scores(dense, lexical)
+
+    def _hits(self, scores: np.ndarray, rows: np.ndarray, top_k: int) -> List[List[Dict]]:
+        return [
+            [dict(self.metadata[rows[i]], score=float(query_scores[i]), row=int(rows[i])) for i in top]
+            for query_scores, top in zip(scores, top_k_rows(scores, top_k))
+        ]
+
+    def _ann_hits(self, query_embeddings: np.ndarray, top_k: int) -> List[List[Dict]]:
+        scores, ids = self.ann.search(query_embeddings, top_k)
+        return [
+            [dict(self.metadata[i], score=float(score), row=int(i)) for score, i in zip(row_scores, row_ids) if i >= 0]
+            for row_scores, row_ids in zip(scores, ids)
+        ]
+
+    def search(self, query_embeddings: np.ndarray, platforms: Optional[List[str]] = None, top_k: int = 5,
+               queries: Optional[List[str]] = None) -> List[List[Dict]]:
+        """
+        Returns the top_k chunks for each query, restricted to `platforms` (all platforms if None).
+        Passing the query texts as `queries` as well enables hybrid dense + BM25 scoring.
+        """
+        query_embeddings = np.atleast_2d(np.asarray(query_embeddings, dtype="float32"))
+        ranges = self._ranges(platforms)
+        lexical = self._lexical(queries)
+        if platforms is None and lexical is None and self.ann is not None:
+            return self._ann_hits(query_embeddings, top_k)
+        dense = np.concatenate([self._range_scores(query_embeddings, start, end) for start, end in ranges], axis=1)
+        if lexical is not None:
+            lexical = np.concatenate([lexical[:, start:end] for start, end in ranges], axis=1)
+        rows = np.concatenate([np.arange(start, end) for start, end in ranges])
+        return self._hits(self._fuse(dense, lexical), rows, top_k)
+
+    def search_per_platform(self, query_embeddings: np.ndarray, platforms: Optional[List[str]] = None,
+                            top_k: int = 3, queries: Optional[List[str]] = None) -> List[Dict[str, List[Dict]]]:
+        """
+        Returns, for each query, the top_k chunks of every requested platform.
+        """
+        query_embeddings = np.atleast_2d(np.asarray(query_embeddings, dtype="float32"))
+        lexical = self._lexical(queries)
+        results = [{} for _ in range(len(query_embeddings))]
+        for platform in self.resolve(platforms):
+            start, end = self.platform_ranges[platform]
+            scores = self._fuse(self._range_scores(query_embeddings, start, end), lexical[:, start:end] if lexical is not None else None)
+            hits = self._hits(scores, np.arange(start, end), top_k)
+            for per_platform, platform_hits in zip(results, hits):
+                per_platform[platform] = platform_hits
+        return results
+
+    def search_text(self, queries: List[str], platforms: Optional[List[str]] = None, top_k: int = 5, encode=_default_encode):
+        return self.search(np.asarray(encode(queries), dtype="float32"), platforms, top_k, queries)
+
+
+def corpus_policies(csv_path: str = PRIVACY_DB_CSV) -> Dict[str, str]:
+    """
+    {platform: policy text URL} for every platform in privacy_db.csv.
+    """
+    df = pd.read_csv(csv_path)
+    return dict(zip(df["Platform"], df["Privacy Policy Txt"]))
+
+
+def build_corpus_index(csv_path: str = PRIVACY_DB_CSV, path: str = CORPUS_INDEX_DIR, backend: str = CORPUS_INDEX_BACKEND) -> CorpusIndex:
+    """
+    Fetches every policy in privacy_db.csv and writes the corpus-wide index (with a trained FAISS
+    index of type `backend`) to `path`.
+    """
+    links = corpus_policies(csv_path)
+    report = fetch_policies(list(links.values()))
+    policies = {platform: report["results"][url] for platform, url in links.items() if url in report["results"]}
+    for url, error in report["failures"].items():
+        print(f"⚠️ Skipping {url}: {error}")
+    index = CorpusIndex.build(policies, urls=sorted(links.values()), backend=backend)
+    index.save(path)
+    print(f"✅ Corpus index built: {len(index.metadata)} chunks from {len(policies)} platforms ({backend})")
+    return index
+
+
+def expected_config() -> Dict:
+    return {"model": get_embedding_service().model_name, "storage": EMBEDDING_STORAGE,
+            "chunker": [CHUNK_WORDS, CHUNK_OVERLAP, CHUNKER_VERSION], "bm25": [BM25_K1, BM25_B],
+            "backend": CORPUS_INDEX_BACKEND}
+
+
+def _matches(index: Optional[CorpusIndex], urls: List[str]) -> bool:
+    return index is not None and index.urls == urls and index.config() == expected_config()
+
+
+_corpus = None
+_corpus_lock = threading.Lock()
+
+
+def get_corpus_index(path: str = CORPUS_INDEX_DIR, csv_path: str = PRIVACY_DB_CSV) -> CorpusIndex:
+    """
+    The shared corpus index, memory-mapped from `path`. It is rebuilt (fetching every policy) when it is
+    missing or was built from other policy URLs than privacy_db.csv now lists, or with another embedding
+    model, storage or chunker. Normally it is prebuilt with `python -m src.common.corpus_index --build`.
+    """
+    global _corpus
+    urls = sorted(corpus_policies(csv_path).values())
+    with _corpus_lock:
+        if _matches(_corpus, urls):
+            return _corpus
+        if os.path.exists(os.path.join(path, "metadata.json")):
+            loaded = CorpusIndex.load(path)
+            if _matches(loaded, urls):
+                _corpus = loaded
+                return _corpus
+        print("⚠️ Corpus index missing or out of date, rebuilding")
+        _corpus = build_corpus_index(csv_path, path)
+        return _corpus
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the corpus-wide policy index.")
+    parser.add_argument("--build", action="store_true", help="(Re)build the index from privacy_db.csv")
+    parser.add_argument("--query", type=str, help="Question to search for")
+    parser.add_argument("--platform", action="append", help="Restrict the search to this platform (repeatable)")
+    parser.add_argument("--top_k", type=int, default=5)
+    parser.add_argument("--backend", choices=BACKENDS, default=CORPUS_INDEX_BACKEND,
+                        help="FAISS index type to build; the app reads the one named by CORPUS_INDEX_BACKEND")
+    args = parser.parse_args()
+
+    corpus = build_corpus_index(backend=args.backend) if args.build else get_corpus_index()
+    if args.query:
+        for hit in corpus.search_text([args.query], args.platform, args.top_k)[0]:
+            print(f"[{hit['score']:.3f}] {hit['platform']} / {hit['section'] or '-'} @{hit['start']}: {hit['text'][:160]}")
@@ -0,0 +1,115 @@
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.common.paths import CACHE_DIR
+
+MEMORY_ITEMS = int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", 50000))
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def text_key(model_name: str, text: str) -> str:
+    """
+    Cache key for one text: model name plus a hash of the whitespace-normalized text.
+    """
+    normalized = _WHITESPACE_RE.sub(" ", text).strip()
+    return hashlib.sha1(f"{model_name}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache: an in-memory LRU in front of an sqlite table of float32 blobs.
+    Counters for memory hits, disk hits and misses are kept so the effect can be observed via stats().
+    """
+
+    def __init__(self, path: Optional[str] = None, memory_items: int = MEMORY_ITEMS, persist: bool = True):
+        self.path = path or os.path.join(CACHE_DIR, "embeddings.sqlite")
+        self.memory_items = memory_items
+        self.persist = persist
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.persist:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with self._db() as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    @contextmanager
+    def _db(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Returns {key: vector} for the keys that are cached in either tier.
+        """
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            self.memory_hits += len(found)
+
+        pending = [key for key in dict.fromkeys(keys) if key not in found]
+        if pending and self.persist:
+            with self._db() as conn:
+                for i in range(0, len(pending), 500):
+                    batch = pending[i:i + 500]
+                    rows = conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype="float32")
+            with self._lock:
+                for key in pending:
+                    if key in found:
+                        self.disk_hits += 1
+                        self._remember(key, found[key])
+
+        with self._lock:
+            self.misses += sum(1 for key in pending if key not in found)
+        return found
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        vectors = np.asarray(vectors, dtype="float32")
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._remember(key, vector)
+        if self.persist:
+            with self._db() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings VALUES (?, ?)",
+                    [(key, vector.tobytes()) for key, vector in zip(keys, vectors)],
+                )
+
+    def stats(self) -> Dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_items": len(self._memory),
+        }
@@ -0,0 +1,96 @@
+import os
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from src.common.embedding_cache import EmbeddingCache, text_key
+
+MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+NUM_THREADS = int(os.getenv("EMBEDDING_THREADS", 0))  # 0 keeps torch's default
+USE_CACHE = os.getenv("EMBEDDING_CACHE", "1") != "0"
+
+
+class EmbeddingService:
+    """
+    Process-wide sentence embedding model shared by Q&A, summary and comparison.
+    The model is loaded on the first encode call, not at import time, and previously
+    seen texts are served from an EmbeddingCache instead of being re-encoded.
+    """
+
+    def __init__(self, model_name: str = MODEL_NAME, batch_size: int = BATCH_SIZE, num_threads: int = NUM_THREADS,
+                 cache: Optional[EmbeddingCache] = None):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self.cache = cache
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    if self.num_threads:
+                        import torch
+                        torch.set_num_threads(self.num_threads)
+                    self._model = SentenceTransformer(self.model_name)
+                    print(f"✅ Loaded embedding model {self.model_name}")
+        return self._model
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str], batch_size: Optional[int] = None, normalize: bool = False) -> np.ndarray:
+        """
+        Encodes `texts` in batches and returns a float32 array of shape (len(texts), dimension).
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        texts = list(texts)
+        if self.cache is None:
+            embeddings = self._encode_uncached(texts, batch_size)
+        else:
+            keys = [text_key(self.model_name, text) for text in texts]
+            found = self.cache.get_many(keys)
+            missing = {key: text for key, text in zip(keys, texts) if key not in found}
+            if missing:
+                vectors = self._encode_uncached(list(missing.values()), batch_size)
+                self.cache.put_many(list(missing), vectors)
+                found.update(zip(missing, vectors))
+            embeddings = np.stack([found[key] for key in keys]) if keys else np.zeros((0, 0), dtype="float32")
+        if normalize and len(embeddings):
+            embeddings = embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12)
+        return embeddings
+
+    def _encode_uncached(self, texts: List[str], batch_size: Optional[int]) -> np.ndarray:
+        embeddings = self.model.encode(
+            texts,
+            batch_size=batch_size or self.batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return np.asarray(embeddings, dtype="float32")
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats() if self.cache is not None else {}
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = EmbeddingService(cache=EmbeddingCache() if USE_CACHE else None)
+        return _service
+
+
+def encode(texts: List[str], batch_size: Optional[int] = None, normalize: bool = False) -> np.ndarray:
+    return get_embedding_service().encode(texts, batch_size=batch_size, normalize=normalize)
@@ -0,0 +1,124 @@
+"""
+Local stand-in for the Gemini REST API, for tests, load tests and offline development.
+
+Serves POST /v1beta/models/<model>:generateContent and :streamGenerateContent?alt=sse with a
+deterministic response derived from the prompt, after a configurable time-to-first-token (plus an
+optional delay per 1k prompt tokens, to mimic prefill) and per-chunk delay. Point the app at it with GEMINI_API_BASE=http://127.0.0.1:<port>/v1beta.
+"""
+import re
+import json
+import time
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+SUMMARY_MARKER = "1. Summary of the privacy policy:"
+SUMMARY_LABELS = [
+    "a. Type of data collected",
+    "b. Purpose of data collection",
+    "c. Data sharing and disclosure",
+    "d. User rights and choices",
+    "e. Data storage and security",
+    "f. Use of cookies and tracking technologies",
+    "g. Other important information",
+]
+
+
+def fake_summary_text(prompt, digest, points=2):
+    """
+    A structured a-g summary whose points are sentences copied from the policy in the prompt,
+    so section parsing and quote matching can be exercised offline.
+    """
+    policy = prompt.rsplit("Here is the policy text:", 1)[-1]
+    sentences = [s for s in re.split(r"(?<=[.!?])\s+", policy) if len(s.split()) >= 5] or ["Not mentioned."]
+    lines = [SUMMARY_MARKER]
+    for i, label in enumerate(SUMMARY_LABELS):
+        lines.append(f"   {label}:")
+        for j in range(points):
+            pick = int(digest[(4 * (i * points + j)) % 60:][:4], 16)
+            lines.append(f"        {j + 1}: {sentences[pick % len(sentences)].strip()}")
+    return "\n".join(lines)
+
+
+def fake_response_text(prompt, words=60):
+    """
+    Deterministic reply for `prompt`: the same prompt always gets the same text. Summary prompts
+    get a structured summary (see fake_summary_text).
+    """
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    if SUMMARY_MARKER in prompt and "Here is the policy text:" in prompt:
+        return fake_summary_text(prompt, digest)
+    body = " ".join(f"token{int(digest[i % 64], 16)}" for i in range(words))
+    return f"Offline response {digest[:12]}. {body}"
+
+
+def prompt_text(payload):
+    parts = []
+    for content in payload.get("contents", []):
+        for part in content.get("parts", []):
+            parts.append(part.get("text", ""))
+    return "\n".join(parts)
+
+
+def make_handler(first_token_delay, chunk_delay, chunk_words, prefill_delay=0.0):
+    class FakeGeminiHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            prompt = prompt_text(payload)
+            text = fake_response_text(prompt)
+            usage = {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4}
+
+            time.sleep(first_token_delay + prefill_delay * usage["promptTokenCount"] / 1000)
+            if ":streamGenerateContent" in self.path:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                words = text.split(" ")
+                for i in range(0, len(words), chunk_words):
+                    piece = " ".join(words[i:i + chunk_words]) + (" " if i + chunk_words < len(words) else "")
+                    event = {"candidates": [{"content": {"parts": [{"text": piece}]}}], "usageMetadata": usage}
+                    self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode("utf-8"))
+                    self.wfile.flush()
+                    time.sleep(chunk_delay)
+                return
+
+            body = json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}], "usageMetadata": usage}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeGeminiHandler
+
+
+def start_fake_gemini_server(first_token_delay=0.2, chunk_delay=0.02, chunk_words=5, port=0, prefill_delay=0.0):
+    """
+    Starts the fake server on a background thread and returns (server, api_base).
+    `prefill_delay` is added per 1000 prompt tokens.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(first_token_delay, chunk_delay, chunk_words, prefill_delay))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1beta"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local fake Gemini API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--first_token_delay", type=float, default=0.2)
+    parser.add_argument("--chunk_delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    server, api_base = start_fake_gemini_server(args.first_token_delay, args.chunk_delay, port=args.port)
+    print(f"✅ Fake Gemini API listening, set GEMINI_API_BASE={api_base}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
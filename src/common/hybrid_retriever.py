@@ -0,0 +1,108 @@
+import os
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.common.bm25 import BM25Index, get_bm25_index
+from src.common.embeddings import get_embedding_service
+from src.common.quantization import as_scorable
+
+# Dense stays the default until hybrid recall has been benchmarked with the production embedding model.
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "dense")  # "dense", "hybrid" or "bm25"
+DENSE_WEIGHT = float(os.getenv("HYBRID_DENSE_WEIGHT", 0.6))
+FUSION = os.getenv("HYBRID_FUSION", "linear")  # "linear" (normalized score blend) or "rrf"
+RRF_K = 60
+
+
+def _default_encode(texts: List[str]) -> np.ndarray:
+    return get_embedding_service().encode(texts, normalize=True)
+
+
+def normalize_rows(scores: np.ndarray) -> np.ndarray:
+    """
+    Min-max scales each row to [0, 1]; constant rows become 0.
+    """
+    low = scores.min(axis=1, keepdims=True)
+    span = scores.max(axis=1, keepdims=True) - low
+    return np.divide(scores - low, span, out=np.zeros_like(scores), where=span > 0)
+
+
+def reciprocal_ranks(scores: np.ndarray, k: int = RRF_K) -> np.ndarray:
+    ranks = np.argsort(np.argsort(-scores, axis=1), axis=1)
+    return 1.0 / (k + 1 + ranks)
+
+
+def fuse_scores(dense: np.ndarray, lexical: np.ndarray, dense_weight: float = DENSE_WEIGHT, fusion: str = FUSION) -> np.ndarray:
+    if fusion == "rrf":
+        return dense_weight * reciprocal_ranks(dense) + (1 - dense_weight) * reciprocal_ranks(lexical)
+    return dense_weight * normalize_rows(dense) + (1 - dense_weight) * normalize_rows(lexical)
+
+
+def top_k_rows(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    Column indices of the top_k scores of every row, best first (argpartition, no full sort).
+    """
+    k = min(top_k, scores.shape[1])
+    if k == 0:
+        return np.zeros((scores.shape[0], 0), dtype=int)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+class HybridRetriever:
+    """
+    Dense + BM25 retrieval over one list of chunk texts.
+
+    Dense scores are dot products with the (normalized) chunk embeddings, lexical scores come from a
+    precomputed BM25 index, and both are fused per query so exact legal terms ("GDPR", "COPPA",
+    "data broker") are not lost to the embedding model.
+    """
+
+    def __init__(self, texts: Sequence[str], embeddings: Optional[np.ndarray] = None, bm25: Optional[BM25Index] = None,
+                 mode: str = RETRIEVAL_MODE, dense_weight: float = DENSE_WEIGHT, fusion: str = FUSION,
+                 encode: Callable[[List[str]], np.ndarray] = _default_encode):
+        self.texts = texts
+        self.embeddings = as_scorable(embeddings) if embeddings is not None else None
+        self.mode = mode if embeddings is not None else "bm25"
+        self.bm25 = bm25 if bm25 is not None or self.mode == "dense" else get_bm25_index(texts)
+        self.dense_weight = dense_weight
+        self.fusion = fusion
+        self.encode = encode
+
+    def dense_scores(self, queries: Sequence[str], query_embeddings: Optional[np.ndarray] = None) -> np.ndarray:
+        if query_embeddings is None:
+            query_embeddings = self.encode(list(queries))
+        return self.embeddings.scores(query_embeddings)
+
+    def scores(self, queries: Sequence[str], query_embeddings: Optional[np.ndarray] = None,
+               lexical_queries: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Returns {"score", "dense", "lexical"} (queries x chunks) matrices; `lexical_queries` replaces
+        `queries` for BM25 when the natural-language query is a poor keyword query.
+        """
+        lexical_queries = lexical_queries or queries
+        dense = self.dense_scores(queries, query_embeddings) if self.mode != "bm25" else None
+        lexical = self.bm25.scores(lexical_queries) if self.mode != "dense" else None
+        if self.mode == "dense":
+            score = dense
+        elif self.mode == "bm25":
+            score = lexical
+        else:
+            score = fuse_scores(dense, lexical, self.dense_weight, self.fusion)
+        return {"score": score, "dense": dense, "lexical": lexical}
+
+    def search(self, queries: Sequence[str], top_k: int = 5, query_embeddings: Optional[np.ndarray] = None,
+               lexical_queries: Optional[Sequence[str]] = None) -> List[List[Dict]]:
+        """
+        Returns, for each query, the top_k hits as {"index", "score", "dense"} dicts, best first.
+        """
+        matrices = self.scores(queries, query_embeddings, lexical_queries)
+        score, dense = matrices["score"], matrices["dense"]
+        results = []
+        for row, top in enumerate(top_k_rows(score, top_k)):
+            results.append([
+                {"index": int(i), "score": float(score[row, i]), "dense": float(dense[row, i]) if dense is not None else None}
+                for i in top
+            ])
+        return results
@@ -0,0 +1,311 @@
+"""
+Background job queue backed by sqlite, for summaries and comparisons that take too long to run inside
+a UI script or an HTTP request.
+
+    python -m src.common.jobs --workers 2      # a standalone worker process for the shared queue
+
+Any process can submit jobs and poll them by id. Worker threads (started in-process by get_job_queue()
+or by the command above) claim queued jobs from the same database, report stage-level progress and
+partial output while running, and store the result or the error when they finish. Each process
+refreshes a heartbeat on the jobs it is running; a running job whose heartbeat is older than
+JOB_STALE_SECONDS belonged to a process that died, and the next worker to look marks it failed.
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import argparse
+import importlib
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from src.common.paths import CACHE_DIR
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 1.0))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", 24 * 3600))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", 10))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", 60))
+PARTIAL_UPDATE_SECONDS = 0.5  # minimum interval between partial-output writes and cancellation checks
+
+# Handlers are imported lazily so worker processes can run any job kind without import cycles.
+JOB_HANDLERS = {
+    "summary": "src.summary.summary:run_summary_job",
+    "comparison": "src.comparison.src.policy_comparator:run_comparison_job",
+}
+
+FINISHED = ("done", "failed", "cancelled")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    """
+    Passed to a job handler to report progress. Every stage update, and partial output at most every
+    PARTIAL_UPDATE_SECONDS, also checks for cancellation and raises JobCancelled once it has been requested.
+    """
+
+    def __init__(self, queue: "JobQueue", job_id: str):
+        self.queue = queue
+        self.job_id = job_id
+        self._last_partial = 0.0
+
+    def check_cancelled(self):
+        if self.queue.cancel_requested(self.job_id):
+            raise JobCancelled(self.job_id)
+
+    def stage(self, name: str, progress: Optional[float] = None):
+        self.check_cancelled()
+        self.queue._update(self.job_id, stage=name, **({"progress": progress} if progress is not None else {}))
+
+    def partial(self, text: str):
+        now = time.monotonic()
+        if now - self._last_partial >= PARTIAL_UPDATE_SECONDS:
+            self._last_partial = now
+            self.check_cancelled()
+            self.queue._update(self.job_id, partial=text)
+
+
+class JobQueue:
+    """
+    Jobs are rows in `jobs.sqlite`: (id, kind, params, status, stage, progress, partial output, result, error).
+    Status goes queued -> running -> done / failed / cancelled. Claiming a job is a single conditional
+    UPDATE, so several worker threads or processes can share one queue file. Running jobs carry a
+    heartbeat_at timestamp that their process refreshes every JOB_HEARTBEAT_SECONDS.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(CACHE_DIR, "jobs.sqlite")
+        self._wakeup = threading.Event()
+        self._workers: List[threading.Thread] = []
+        self._running = set()  # ids of the jobs this process's workers are running
+        self._running_lock = threading.Lock()
+        self._heartbeat = None
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._db() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    progress REAL NOT NULL DEFAULT 0,
+                    partial TEXT,
+                    result TEXT,
+                    error TEXT,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    heartbeat_at REAL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "heartbeat_at" not in columns:  # queue files created before heartbeats
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+
+    @contextmanager
+    def _db(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _update(self, job_id: str, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._db() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def submit(self, kind: str, **params) -> str:
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._db() as conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?, ?) AND finished_at < ?", (*FINISHED, now - JOB_RETENTION_SECONDS)
+            )
+            conn.execute(
+                "INSERT INTO jobs (id, kind, params, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, kind, json.dumps(params), now),
+            )
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._db() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def list(self, limit: int = 50) -> List[Dict]:
+        with self._db() as conn:
+            rows = conn.execute(
+                "SELECT id, kind, params, status, stage, progress, created_at, finished_at FROM jobs ORDER BY created_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [dict(row, params=json.loads(row["params"])) for row in rows]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a queued job immediately, or asks a running one to stop at its next progress update.
+        Returns False if the job does not exist or has already finished.
+        """
+        with self._db() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status NOT IN (?, ?, ?)", (job_id, *FINISHED)
+            ).rowcount
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'", (time.time(), job_id)
+            )
+        return updated > 0
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._db() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def claim(self) -> Optional[Dict]:
+        """
+        Atomically moves the oldest queued job to running and returns it, or returns None.
+        """
+        with self._db() as conn:
+            row = conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1").fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            claimed = conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, heartbeat_at = ? WHERE id = ? AND status = 'queued'",
+                (now, now, row["id"]),
+            ).rowcount
+        return self.get(row["id"]) if claimed else self.claim()
+
+    def run(self, job: Dict):
+        context = JobContext(self, job["id"])
+        with self._running_lock:
+            self._running.add(job["id"])
+        try:
+            module_name, function_name = JOB_HANDLERS[job["kind"]].split(":")
+            handler = getattr(importlib.import_module(module_name), function_name)
+            result = handler(context, **job["params"])
+            self._update(job["id"], status="done", progress=1.0, result=json.dumps(result), finished_at=time.time())
+            print(f"✅ Job {job['id']} ({job['kind']}) done")
+        except JobCancelled:
+            self._update(job["id"], status="cancelled", finished_at=time.time())
+            print(f"⚠️ Job {job['id']} ({job['kind']}) cancelled")
+        except Exception as e:
+            self._update(job["id"], status="failed", error=str(e), finished_at=time.time())
+            print(f"⚠️ Job {job['id']} ({job['kind']}) failed: {str(e)}")
+        finally:
+            with self._running_lock:
+                self._running.discard(job["id"])
+
+    def _work(self):
+        while True:
+            job = self.claim()
+            if job is None:
+                self._wakeup.wait(JOB_POLL_SECONDS)
+                self._wakeup.clear()
+                continue
+            self.run(job)
+
+    def start_workers(self, count: int = JOB_WORKERS):
+        for _ in range(count - len(self._workers)):
+            worker = threading.Thread(target=self._work, name=f"job-worker-{len(self._workers)}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        if self._heartbeat is None:
+            self._heartbeat = threading.Thread(target=self._beat, name="job-heartbeat", daemon=True)
+            self._heartbeat.start()
+
+    def heartbeat(self):
+        """
+        Refreshes heartbeat_at on the jobs this process is running.
+        """
+        with self._running_lock:
+            running = list(self._running)
+        if running:
+            with self._db() as conn:
+                conn.execute(
+                    f"UPDATE jobs SET heartbeat_at = ? WHERE id IN ({', '.join('?' * len(running))}) AND status = 'running'",
+                    (time.time(), *running),
+                )
+
+    def _beat(self):
+        while True:
+            self.heartbeat()
+            failed = self.fail_interrupted(stale_after=JOB_STALE_SECONDS)
+            if failed:
+                print(f"⚠️ Marked {failed} jobs with no heartbeat for {JOB_STALE_SECONDS:.0f}s as failed")
+            time.sleep(JOB_HEARTBEAT_SECONDS)
+
+    def fail_interrupted(self, stale_after: Optional[float] = None) -> int:
+        """
+        Marks jobs left running by a process that exited as failed: every running job, or with
+        `stale_after` only those whose heartbeat is older than that many seconds. Returns how many.
+        """
+        now = time.time()
+        with self._db() as conn:
+            if stale_after is None:
+                return conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'Interrupted', finished_at = ? WHERE status = 'running'", (now,)
+                ).rowcount
+            return conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Interrupted', finished_at = ? "
+                "WHERE status = 'running' AND COALESCE(heartbeat_at, started_at, 0) < ?",
+                (now, now - stale_after),
+            ).rowcount
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue(workers: int = JOB_WORKERS) -> JobQueue:
+    """
+    Returns the shared queue, starting `workers` in-process worker threads on first use.
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+            _queue.start_workers(workers)
+        return _queue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background job workers for the shared job queue.")
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS)
+    parser.add_argument("--fail-interrupted", action="store_true", help="Mark every running job as failed first, without waiting for JOB_STALE_SECONDS")
+    args = parser.parse_args()
+
+    queue = JobQueue()
+    if args.fail_interrupted:
+        queue.fail_interrupted()
+    queue.start_workers(args.workers)
+    print(f"✅ {args.workers} job workers polling {queue.path}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from src.common.metrics import metrics
+from src.common.paths import CACHE_DIR
+
+TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000))
+ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+
+
+def llm_backend() -> str:
+    """
+    The configured LLM backend: LLM_BACKEND=gemini (the default) or LLM_BACKEND=fake.
+    """
+    return os.getenv("LLM_BACKEND", "gemini")
+
+
+def backend_version(version: str) -> str:
+    """
+    Scopes a policy version to the LLM backend, so stores of generated text never serve one backend's
+    output (e.g. the fake backend's) to another.
+    """
+    return f"{version}:{llm_backend()}"
+
+
+def response_key(model_name: str, prompt: str, config: Optional[Dict] = None) -> str:
+    """
+    Key for one LLM call: backend, model name, prompt hash and the generation config.
+    """
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    payload = json.dumps({"backend": llm_backend(), "model": model_name, "prompt": prompt_hash, "config": config or {}}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Persistent sqlite cache of LLM responses with a TTL and LRU eviction beyond `max_entries`.
+    Only successful, non-empty responses are stored.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: int = TTL_SECONDS, max_entries: int = MAX_ENTRIES):
+        self.path = path or os.path.join(CACHE_DIR, "llm_responses.sqlite")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._db() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+
+    @contextmanager
+    def _db(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, model_name: str, prompt: str, config: Optional[Dict] = None) -> Optional[str]:
+        key = response_key(model_name, prompt, config)
+        now = time.time()
+        with self._db() as conn:
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row:
+                conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        with self._lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return row[0] if row else None
+
+    def put(self, model_name: str, prompt: str, response: str, config: Optional[Dict] = None):
+        if not response:
+            return
+        key = response_key(model_name, prompt, config)
+        now = time.time()
+        with self._db() as conn:
+            conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)", (key, model_name, response, now, now))
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+_refresh = False
+
+
+def set_refresh(refresh: bool):
+    """
+    While set, cached_call and cached_stream skip cache lookups and store the fresh responses instead;
+    used by the batch precomputation CLIs' --force.
+    """
+    global _refresh
+    _refresh = refresh
+
+
+def get_llm_cache() -> LLMResponseCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache()
+        return _cache
+
+
+def cached_call(model_name: str, prompt: str, call: Callable[[], str], config: Optional[Dict] = None) -> str:
+    """
+    Returns the cached response for (model_name, prompt, config), or runs `call()` and caches its result.
+    """
+    if not ENABLED:
+        return call()
+    cache = get_llm_cache()
+    response = cache.get(model_name, prompt, config) if not _refresh else None
+    if response is None:
+        response = call()
+        cache.put(model_name, prompt, response, config)
+    return response
+
+
+def cached_stream(model_name: str, prompt: str, stream: Callable[[], Iterator[str]], config: Optional[Dict] = None,
+                  metric: Optional[str] = None) -> Iterator[str]:
+    """
+    Streaming counterpart of cached_call: yields the cached response in one piece, or yields the pieces
+    of `stream()` as they arrive and caches the concatenation once the stream completes.
+    Time-to-first-token is recorded under `metric` when given.
+    """
+    start = time.perf_counter()
+    cache = get_llm_cache() if ENABLED else None
+    cached = cache.get(model_name, prompt, config) if cache and not _refresh else None
+    if cached is not None:
+        if metric:
+            metrics.record(metric, time.perf_counter() - start)
+        yield cached
+        return
+
+    pieces = []
+    for piece in stream():
+        if not piece:
+            continue
+        if not pieces and metric:
+            metrics.record(metric, time.perf_counter() - start)
+        pieces.append(piece)
+        yield piece
+    if cache:
+        cache.put(model_name, prompt, "".join(pieces), config)
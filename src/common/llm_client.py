@@ -0,0 +1,260 @@
+import os
+import json
+import time
+import random
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.common.context_packer import get_token_estimator
+from src.common.fake_gemini_server import fake_response_text
+from src.common.llm_cache import cached_call, cached_stream, llm_backend
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+TIMEOUT = float(os.getenv("LLM_TIMEOUT_SECONDS", 120))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 4))
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def remaining_seconds(deadline: Optional[float]) -> Optional[float]:
+    """
+    Seconds left until `deadline` (a time.monotonic() value), never negative; None without a deadline.
+    """
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+class LLMClient:
+    """
+    Common interface for every LLM call in the app.
+
+    Subclasses implement _generate / _stream for one backend; this class adds the response
+    cache, a concurrency semaphore, an optional RateLimiter and token / latency accounting.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, max_concurrency: int = MAX_CONCURRENCY):
+        self.model_name = model_name
+        self.rate_limiter = None
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "errors": 0, "retries": 0, "prompt_tokens": 0, "output_tokens": 0, "latency_seconds": 0.0}
+
+    def _account(self, latency: float, usage: Optional[Dict] = None, error: bool = False):
+        usage = usage or {}
+        with self._stats_lock:
+            self._stats["requests"] += 1
+            self._stats["errors"] += int(error)
+            self._stats["latency_seconds"] += latency
+            self._stats["prompt_tokens"] += usage.get("promptTokenCount", 0)
+            self._stats["output_tokens"] += usage.get("candidatesTokenCount", 0)
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["mean_latency_seconds"] = stats["latency_seconds"] / stats["requests"] if stats["requests"] else 0.0
+        return stats
+
+    @staticmethod
+    def _cache_prompt(prompt: str, system: Optional[str]) -> str:
+        return f"{system}\n\n{prompt}" if system else prompt
+
+    def generate(self, prompt: str, system: Optional[str] = None, config: Optional[Dict] = None,
+                 deadline: Optional[float] = None) -> str:
+        """
+        Returns the full response text, served from the response cache when possible.
+        A `deadline` (a time.monotonic() value) bounds both the wait for a concurrency slot and the
+        request itself: past it LLMError is raised, so a caller that gave up does not keep holding a slot.
+        """
+        def call():
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            start = time.perf_counter()
+            if not self._semaphore.acquire(timeout=remaining_seconds(deadline)):
+                raise LLMError("LLM call deadline exceeded while waiting for a concurrency slot")
+            try:
+                text, usage = self._generate(prompt, system, config, deadline)
+            except Exception:
+                self._account(time.perf_counter() - start, error=True)
+                raise
+            finally:
+                self._semaphore.release()
+            self._account(time.perf_counter() - start, usage)
+            return text
+
+        return cached_call(self.model_name, self._cache_prompt(prompt, system), call, config)
+
+    def stream(self, prompt: str, system: Optional[str] = None, config: Optional[Dict] = None,
+               metric: Optional[str] = None) -> Iterator[str]:
+        """
+        Yields response text pieces as they arrive; see llm_cache.cached_stream.
+        """
+        def call():
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            start = time.perf_counter()
+            usage = None
+            with self._semaphore:
+                try:
+                    for piece, usage in self._stream(prompt, system, config):
+                        yield piece
+                except Exception:
+                    self._account(time.perf_counter() - start, error=True)
+                    raise
+            self._account(time.perf_counter() - start, usage)
+
+        return cached_stream(self.model_name, self._cache_prompt(prompt, system), call, config, metric)
+
+    def _generate(self, prompt: str, system: Optional[str], config: Optional[Dict],
+                  deadline: Optional[float] = None) -> Tuple[str, Dict]:
+        raise NotImplementedError
+
+    def _stream(self, prompt: str, system: Optional[str], config: Optional[Dict]) -> Iterator[Tuple[str, Dict]]:
+        text, usage = self._generate(prompt, system, config)
+        yield text, usage
+
+
+class GeminiClient(LLMClient):
+    """
+    Gemini REST client over one pooled requests.Session, with timeouts and exponential-backoff
+    retries on 429 / 5xx (honoring Retry-After).
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, api_key: Optional[str] = None, api_base: Optional[str] = None,
+                 max_concurrency: int = MAX_CONCURRENCY, timeout: float = TIMEOUT, max_retries: int = MAX_RETRIES):
+        super().__init__(model_name, max_concurrency)
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self.api_base = api_base or os.getenv("GEMINI_API_BASE", GEMINI_API_BASE)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _payload(self, prompt: str, system: Optional[str], config: Optional[Dict]) -> Dict:
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        if system:
+            payload["system_instruction"] = {"parts": [{"text": system}]}
+        if config:
+            payload["generationConfig"] = config
+        return payload
+
+    def _post(self, method: str, payload: Dict, stream: bool = False, deadline: Optional[float] = None):
+        if not self.api_key:
+            raise EnvironmentError("GEMINI_API_KEY environment variable not set.")
+        url = f"{self.api_base}/models/{self.model_name}:{method}"
+        params = {"key": self.api_key}
+        if stream:
+            params["alt"] = "sse"
+        for attempt in range(self.max_retries + 1):
+            timeout = self.timeout if deadline is None else min(self.timeout, remaining_seconds(deadline))
+            if timeout <= 0:
+                raise LLMError("Gemini API request deadline exceeded")
+            try:
+                response = self.session.post(url, params=params, json=payload, timeout=timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise LLMError(f"Gemini API request failed: {str(e)}")
+                delay = None
+            else:
+                if response.status_code == 200:
+                    return response
+                if response.status_code not in RETRYABLE_STATUS or attempt == self.max_retries:
+                    raise LLMError(
+                        f"Gemini API call failed with status code {response.status_code}: {response.text}",
+                        response.status_code,
+                    )
+                retry_after = response.headers.get("Retry-After")
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else None
+                response.close()
+            delay = delay if delay is not None else min(60.0, 2 ** attempt * (1 + random.random()))
+            if deadline is not None and delay >= remaining_seconds(deadline):
+                raise LLMError("Gemini API request deadline exceeded before the next retry")
+            if self.rate_limiter is not None:
+                self.rate_limiter.penalize(delay)
+            with self._stats_lock:
+                self._stats["retries"] += 1
+            time.sleep(delay)
+
+    @staticmethod
+    def _candidate_text(result: Dict) -> str:
+        candidate = result.get("candidates", [{}])[0]
+        parts = candidate.get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+    def _generate(self, prompt, system, config, deadline=None):
+        result = self._post("generateContent", self._payload(prompt, system, config), deadline=deadline).json()
+        text = self._candidate_text(result)
+        if not text:
+            raise LLMError("No text found in the Gemini API response.")
+        usage = result.get("usageMetadata", {})
+        # Real prompt token counts keep the local token estimator calibrated.
+        get_token_estimator().observe(self._cache_prompt(prompt, system), usage.get("promptTokenCount", 0))
+        return text, usage
+
+    def _stream(self, prompt, system, config):
+        usage = {}
+        with self._post("streamGenerateContent", self._payload(prompt, system, config), stream=True) as response:
+            for line in response.iter_lines(decode_unicode=True):
+                if line and line.startswith("data:"):
+                    event = json.loads(line[len("data:"):])
+                    usage = event.get("usageMetadata", usage)
+                    yield self._candidate_text(event), usage
+        # The last event carries the final usage; streamed prompts calibrate the estimator like _generate.
+        if usage.get("promptTokenCount"):
+            get_token_estimator().observe(self._cache_prompt(prompt, system), usage["promptTokenCount"])
+
+
+class FakeLLMClient(LLMClient):
+    """
+    Deterministic offline backend: the same prompt always yields the same text, after an optional latency.
+    Used for tests, load tests and benchmarks without network access (LLM_BACKEND=fake).
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, latency: float = float(os.getenv("FAKE_LLM_LATENCY", 0.0)),
+                 max_concurrency: int = MAX_CONCURRENCY):
+        super().__init__(model_name, max_concurrency)
+        self.latency = latency
+
+    def _generate(self, prompt, system, config, deadline=None):
+        if deadline is not None and self.latency > remaining_seconds(deadline):
+            time.sleep(remaining_seconds(deadline))
+            raise LLMError("Fake LLM call deadline exceeded")
+        time.sleep(self.latency)
+        text = fake_response_text(self._cache_prompt(prompt, system))
+        return text, {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4}
+
+    def _stream(self, prompt, system, config):
+        text, usage = self._generate(prompt, system, config)
+        words = text.split(" ")
+        for i in range(0, len(words), 5):
+            yield " ".join(words[i:i + 5]) + (" " if i + 5 < len(words) else ""), usage
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_llm_client(model_name: str = DEFAULT_MODEL, api_key: Optional[str] = None) -> LLMClient:
+    """
+    Returns the process-wide client for `model_name` on the configured backend
+    (LLM_BACKEND=gemini, the default, or LLM_BACKEND=fake).
+    """
+    backend = llm_backend()
+    with _clients_lock:
+        key = (backend, model_name, api_key)
+        if key not in _clients:
+            if backend == "fake":
+                _clients[key] = FakeLLMClient(model_name)
+            else:
+                _clients[key] = GeminiClient(model_name, api_key=api_key)
+        return _clients[key]
@@ -0,0 +1,41 @@
+import threading
+from collections import defaultdict, deque
+from typing import Dict
+
+import numpy as np
+
+WINDOW = 1000  # most recent observations kept per metric
+
+
+class Metrics:
+    """
+    Thread-safe in-process registry of latency-style observations (e.g. time-to-first-token).
+    """
+
+    def __init__(self, window: int = WINDOW):
+        self._values = defaultdict(lambda: deque(maxlen=window))
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, value: float):
+        with self._lock:
+            self._values[name].append(value)
+            self._counts[name] += 1
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            values = {name: np.array(observed) for name, observed in self._values.items()}
+            counts = dict(self._counts)
+        return {
+            name: {
+                "count": counts[name],
+                "mean": float(observed.mean()),
+                "p50": float(np.percentile(observed, 50)),
+                "p95": float(np.percentile(observed, 95)),
+                "last": float(observed[-1]),
+            }
+            for name, observed in values.items() if len(observed)
+        }
+
+
+metrics = Metrics()
@@ -0,0 +1,17 @@
+import os
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# All persisted caches/indexes live under one directory so they can be wiped or mounted together.
+CACHE_DIR = os.getenv("PRIVACY_CACHE_DIR", os.path.join(PROJECT_ROOT, ".cache"))
+
+PRIVACY_DB_CSV = os.path.join(PROJECT_ROOT, "src", "summary", "privacy_db.csv")
+
+
+def cache_path(*parts):
+    """
+    Returns a path inside CACHE_DIR, creating the parent directory if needed.
+    """
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
@@ -0,0 +1,123 @@
+import time
+import random
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.common.policy_store import PolicyFetchError, get_policy_store
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class RetryableFetchError(Exception):
+    pass
+
+
+def make_session(pool_size=16):
+    """
+    Returns a requests.Session whose connection pool is large enough for `pool_size` concurrent fetches,
+    so every document after the first reuses an open TLS connection.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class _HostLimiter:
+    """
+    Hands out one semaphore per host so a single host never sees more than `per_host` requests at once.
+    """
+
+    def __init__(self, per_host):
+        self._lock = threading.Lock()
+        self._semaphores = defaultdict(lambda: threading.BoundedSemaphore(per_host))
+
+    def __call__(self, url):
+        with self._lock:
+            return self._semaphores[urlparse(url).netloc]
+
+
+def _fetch_one(url, session, store, host_limiter, retries, backoff, timeout):
+    attempt = 0
+    while True:
+        try:
+            with host_limiter(url):
+                if store is not None:
+                    return store.get(url, session=session, timeout=timeout)
+                response = session.get(url, timeout=timeout)
+                if response.status_code in RETRYABLE_STATUS:
+                    raise RetryableFetchError(f"status {response.status_code}")
+                response.raise_for_status()
+                return response.text
+        except (requests.ConnectionError, requests.Timeout, RetryableFetchError, PolicyFetchError) as e:
+            if isinstance(e, PolicyFetchError) and e.status_code not in RETRYABLE_STATUS:
+                raise
+            if attempt >= retries:
+                raise
+            delay = backoff * (2 ** attempt) * (1 + random.random())
+            print(f"⚠️ Retrying {url} in {delay:.2f}s after: {str(e)}")
+            time.sleep(delay)
+            attempt += 1
+
+
+def fetch_policies(urls, max_workers=8, per_host=4, retries=3, backoff=0.5, timeout=20, session=None, use_store=True):
+    """
+    Fetches many policy texts concurrently over one pooled session.
+
+    Parameters:
+    urls: iterable of policy txt URLs (duplicates are fetched once).
+    max_workers: upper bound on concurrent requests overall.
+    per_host: upper bound on concurrent requests to any single host.
+    retries / backoff: retry attempts on connection errors, timeouts and 429/5xx, with jittered exponential backoff.
+    timeout: per-document request timeout in seconds.
+    use_store: read through the on-disk PolicyStore so cached documents skip the network.
+
+    Returns:
+    dict with `results` ({url: text}), `failures` ({url: error message}) and `elapsed` seconds.
+    """
+    unique_urls = list(dict.fromkeys(urls))
+    own_session = session is None
+    session = session or make_session(pool_size=max_workers)
+    store = get_policy_store() if use_store else None
+    host_limiter = _HostLimiter(per_host)
+    results, failures = {}, {}
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                url: executor.submit(_fetch_one, url, session, store, host_limiter, retries, backoff, timeout)
+                for url in unique_urls
+            }
+            for url, future in futures.items():
+                try:
+                    results[url] = future.result()
+                except Exception as e:
+                    failures[url] = str(e)
+    finally:
+        if own_session:
+            session.close()
+
+    return {"results": results, "failures": failures, "elapsed": time.perf_counter() - start}
+
+
+def fetch_policies_sequential(urls, timeout=20):
+    """
+    The original one-request-at-a-time loop, kept as the baseline for benchmarks.
+    """
+    results, failures = {}, {}
+    start = time.perf_counter()
+    for url in dict.fromkeys(urls):
+        try:
+            response = requests.get(url, timeout=timeout)
+            response.raise_for_status()
+            results[url] = response.text
+        except Exception as e:
+            failures[url] = str(e)
+    return {"results": results, "failures": failures, "elapsed": time.perf_counter() - start}
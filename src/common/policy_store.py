@@ -0,0 +1,208 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+
+import requests
+
+from src.common.paths import CACHE_DIR
+
+DEFAULT_MAX_BYTES = int(os.getenv("POLICY_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# The txt URLs carry a timestamp, so a cached copy rarely goes stale; revalidate once a day by default.
+DEFAULT_REVALIDATE_AFTER = int(os.getenv("POLICY_CACHE_REVALIDATE_SECONDS", 24 * 3600))
+
+
+def content_hash(text):
+    """
+    Returns the sha256 hex digest used to address a policy text (its "policy version").
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PolicyFetchError(Exception):
+    def __init__(self, url, status_code):
+        super().__init__(f"Could not load the document from {url} (status {status_code})")
+        self.url = url
+        self.status_code = status_code
+
+
+class PolicyStore:
+    """
+    Content-addressed on-disk store for policy texts, keyed by the `Privacy Policy Txt` URL.
+
+    Each distinct text is written once under blobs/<sha256>.txt. A small sqlite index maps
+    URLs to blobs together with the ETag / Last-Modified validators used for conditional
+    revalidation, and the last access time used for LRU eviction once `max_bytes` is exceeded.
+    """
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES, revalidate_after=DEFAULT_REVALIDATE_AFTER):
+        self.root = root or os.path.join(CACHE_DIR, "policies")
+        self.blob_dir = os.path.join(self.root, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self._db_path = os.path.join(self.root, "index.sqlite")
+        self._lock = threading.Lock()
+        with self._db() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    url TEXT PRIMARY KEY,
+                    sha256 TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+
+    @contextmanager
+    def _db(self):
+        conn = sqlite3.connect(self._db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _blob_path(self, sha256):
+        return os.path.join(self.blob_dir, f"{sha256}.txt")
+
+    def _read_blob(self, sha256):
+        try:
+            with open(self._blob_path(sha256), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _lookup(self, url):
+        with self._db() as conn:
+            row = conn.execute("SELECT * FROM entries WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def _touch(self, url, now, revalidated=False):
+        with self._db() as conn:
+            if revalidated:
+                conn.execute("UPDATE entries SET last_access = ?, fetched_at = ? WHERE url = ?", (now, now, url))
+            else:
+                conn.execute("UPDATE entries SET last_access = ? WHERE url = ?", (now, url))
+
+    def put(self, url, text, etag=None, last_modified=None):
+        """
+        Stores `text` for `url` and returns its sha256. Evicts least recently used entries if over the cap.
+        """
+        sha256 = content_hash(text)
+        data = text.encode("utf-8")
+        path = self._blob_path(sha256)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        now = time.time()
+        with self._lock:
+            with self._db() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (url, sha256, len(data), etag, last_modified, now, now),
+                )
+            self._evict()
+        return sha256
+
+    def _evict(self):
+        with self._db() as conn:
+            total = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM entries GROUP BY sha256)"
+            ).fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = conn.execute("SELECT url, sha256, size FROM entries ORDER BY last_access ASC").fetchall()
+            for row in rows[:-1]:  # always keep the most recent entry, even if it alone exceeds the cap
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM entries WHERE url = ?", (row["url"],))
+                still_used = conn.execute("SELECT 1 FROM entries WHERE sha256 = ? LIMIT 1", (row["sha256"],)).fetchone()
+                if not still_used:
+                    try:
+                        os.remove(self._blob_path(row["sha256"]))
+                    except FileNotFoundError:
+                        pass
+                    total -= row["size"]
+
+    def get_with_version(self, url, session=None, timeout=30):
+        """
+        Returns (text, sha256) for `url`, serving from disk when fresh and revalidating with
+        If-None-Match / If-Modified-Since otherwise. A stale copy is served if the network fails.
+        """
+        now = time.time()
+        entry = self._lookup(url)
+        cached_text = self._read_blob(entry["sha256"]) if entry else None
+        if cached_text is None:
+            entry = None
+        elif now - entry["fetched_at"] < self.revalidate_after:
+            self._touch(url, now)
+            return cached_text, entry["sha256"]
+
+        headers = {}
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        http = session or requests
+        try:
+            response = http.get(url, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            if entry:
+                print(f"⚠️ Revalidation failed for {url}, serving cached copy: {str(e)}")
+                return cached_text, entry["sha256"]
+            raise
+
+        if response.status_code == 304 and entry:
+            self._touch(url, now, revalidated=True)
+            return cached_text, entry["sha256"]
+        if response.status_code != 200:
+            if entry and response.status_code >= 500:
+                return cached_text, entry["sha256"]
+            raise PolicyFetchError(url, response.status_code)
+
+        text = response.text
+        sha256 = self.put(url, text, etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+        return text, sha256
+
+    def get(self, url, session=None, timeout=30):
+        """
+        Returns the policy text for `url`, see get_with_version.
+        """
+        return self.get_with_version(url, session=session, timeout=timeout)[0]
+
+    def version(self, url):
+        """
+        Returns the sha256 of the cached text for `url`, or None if it has not been fetched yet.
+        """
+        entry = self._lookup(url)
+        return entry["sha256"] if entry else None
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_policy_store():
+    """
+    Returns the process-wide PolicyStore shared by Q&A, summary and comparison.
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = PolicyStore()
+        return _default_store
+
+
+def fetch_policy_text(url, session=None, timeout=30):
+    return get_policy_store().get(url, session=session, timeout=timeout)
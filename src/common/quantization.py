@@ -0,0 +1,109 @@
+import os
+from typing import Optional
+
+import numpy as np
+
+EMBEDDING_STORAGE = os.getenv("EMBEDDING_STORAGE", "float32")  # "float32", "float16" or "int8"
+STORAGE_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+BLOCK_ROWS = 4096  # rows converted to float32 at a time while scoring
+
+
+def quantize_int8(vectors: np.ndarray):
+    """
+    Symmetric per-row scalar quantization: returns (int8 codes, float32 scales) with vectors ~= codes * scales.
+    """
+    vectors = np.asarray(vectors, dtype="float32")
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype("float32")
+
+
+class QuantizedEmbeddings:
+    """
+    An embedding matrix stored as float32, float16 or per-row int8, scored block by block in float32.
+
+    int8 scoring can also quantize the queries: int8 x int8 products summed over 384 dimensions stay
+    well below 2**24, so float32 BLAS computes the integer dot product exactly, then both scales are applied.
+    """
+
+    def __init__(self, data: np.ndarray, scales: Optional[np.ndarray] = None):
+        self.data = data
+        self.scales = scales
+        self.storage = {np.dtype(v): k for k, v in STORAGE_DTYPES.items()}[data.dtype]
+
+    @classmethod
+    def from_float32(cls, embeddings: np.ndarray, storage: str = EMBEDDING_STORAGE):
+        if storage not in STORAGE_DTYPES:
+            raise ValueError(f"Unknown embedding storage: {storage}")
+        if storage == "int8":
+            return cls(*quantize_int8(embeddings))
+        return cls(np.ascontiguousarray(embeddings, dtype=STORAGE_DTYPES[storage]))
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def rows(self, start: int, end: int) -> "QuantizedEmbeddings":
+        """
+        Rows start..end-1 as a view (a slice of the possibly memory-mapped data, not a copy).
+        """
+        return QuantizedEmbeddings(self.data[start:end], self.scales[start:end] if self.scales is not None else None)
+
+    def to_float32(self) -> np.ndarray:
+        vectors = np.asarray(self.data, dtype="float32")
+        return vectors * self.scales[:, None] if self.scales is not None else vectors
+
+    def scores(self, queries: np.ndarray, quantize_queries: bool = False) -> np.ndarray:
+        """
+        Returns the (queries x rows) dot-product matrix in float32.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype="float32"))
+        if self.storage == "float32":
+            return queries @ self.data.T
+        query_scales = None
+        if quantize_queries and self.storage == "int8":
+            codes, query_scales = quantize_int8(queries)
+            queries = codes.astype("float32")
+
+        out = np.empty((queries.shape[0], len(self)), dtype="float32")
+        for start in range(0, len(self), BLOCK_ROWS):
+            block = np.asarray(self.data[start:start + BLOCK_ROWS], dtype="float32")
+            out[:, start:start + len(block)] = queries @ block.T
+        if self.scales is not None:
+            out *= self.scales[None, :]
+        if query_scales is not None:
+            out *= query_scales[:, None]
+        return out
+
+    def save(self, path: str, name: str = "embeddings"):
+        np.save(os.path.join(path, f"{name}.npy"), self.data)
+        if self.scales is not None:
+            np.save(os.path.join(path, f"{name}.scales.npy"), self.scales)
+
+    @classmethod
+    def load(cls, path: str, name: str = "embeddings", mmap: bool = True):
+        mmap_mode = "r" if mmap else None
+        data = np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+        scales_path = os.path.join(path, f"{name}.scales.npy")
+        scales = np.load(scales_path) if os.path.exists(scales_path) else None
+        return cls(data, scales)
+
+
+def as_scorable(embeddings):
+    """
+    Wraps a plain float array so callers can score QuantizedEmbeddings and arrays the same way.
+    """
+    if isinstance(embeddings, QuantizedEmbeddings):
+        return embeddings
+    embeddings = np.asarray(embeddings)
+    if embeddings.dtype not in (np.float32, np.float16):
+        embeddings = embeddings.astype("float32")
+    return QuantizedEmbeddings(embeddings)
@@ -0,0 +1,186 @@
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import quote as url_quote
+
+from src.common.policy_store import content_hash
+
+NGRAM = 3  # words per shingle in the fuzzy index
+FUZZY_MIN_SCORE = 0.8  # word-level similarity between a quote and its best span for a fuzzy match
+DIAGONAL_BAND = 3  # words a fuzzy match may drift by (insertions / deletions in the quote)
+NEGATION_CONTEXT = 2  # words before a matched span checked for a negation the quote left out
+MEMORY_ENTRIES = 32  # quote indexes kept in memory, one per policy version
+
+# A word keeps inner hyphens and apostrophes, which normalize_word then drops: "e-mail" == "email",
+# "don’t" == "dont".
+WORD = re.compile(r"\w+(?:[-'’]\w+)*")
+INNER_PUNCTUATION = re.compile(r"[-'’]")
+NEGATIONS = frozenset(
+    "no not never nor neither none nothing nobody nowhere without cannot cant dont doesnt didnt isnt arent "
+    "wasnt werent wont wouldnt shouldnt couldnt mustnt hasnt havent hadnt".split()
+)
+SENTENCE_BREAK = re.compile(r"[.!?;:]")
+
+
+def normalize_word(word: str) -> str:
+    return INNER_PUNCTUATION.sub("", word.lower())
+
+
+def count_negations(words: Sequence[str]) -> int:
+    return sum(word in NEGATIONS for word in words)
+
+
+class QuoteIndex:
+    """
+    Locates quotes in one source text, word by word, ignoring case, whitespace and punctuation.
+
+    Built once per text: normalized word tokens with their character offsets, and a map from every
+    NGRAM-word shingle to its positions. A quote whose words all appear contiguously and in order
+    is an exact match. Otherwise each of its shingles votes for an alignment (source position minus
+    position in the quote); around the best alignment the quote is aligned word by word with the
+    source, and the similarity of the quote and the aligned span (difflib ratio over words) is the
+    fuzzy score.
+
+    A match is unverified when the quote and its span disagree on negation: a negation word added,
+    dropped or replaced by a non-negation in the alignment, or a negation just before the span (in
+    the same sentence) that the quote left out. "We sell your data" never verifies against
+    "We don't sell your data", while "do not" against "don't" is still a fuzzy match.
+    """
+
+    def __init__(self, text: str, ngram: int = NGRAM):
+        self.text = text
+        self.ngram = ngram
+        matches = list(WORD.finditer(text))
+        self.words = [normalize_word(m.group()) for m in matches]
+        self.starts = [m.start() for m in matches]
+        self.ends = [m.end() for m in matches]
+        self.positions: Dict[str, List[int]] = defaultdict(list)
+        for i in range(len(self.words) - ngram + 1):
+            self.positions[" ".join(self.words[i:i + ngram])].append(i)
+        self.unigrams: Dict[str, List[int]] = defaultdict(list)
+        for i, word in enumerate(self.words):
+            self.unigrams[word].append(i)
+
+    def _span(self, first: int, last: int, score: float, status: str) -> Dict:
+        start, end = self.starts[first], self.ends[last]
+        return {"status": status, "score": round(score, 3), "start": start, "end": end,
+                "fragment": text_fragment(self.text[start:end])}
+
+    def _negated_before(self, first: int) -> bool:
+        for i in range(first - 1, max(0, first - NEGATION_CONTEXT) - 1, -1):
+            if SENTENCE_BREAK.search(self.text[self.ends[i]:self.starts[i + 1]]):
+                return False
+            if self.words[i] in NEGATIONS:
+                return True
+        return False
+
+    def _changes_negation(self, matcher: SequenceMatcher, first: int) -> bool:
+        words, span = matcher.a, matcher.b
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag != "equal" and count_negations(words[i1:i2]) != count_negations(span[j1:j2]):
+                return True
+        return self._negated_before(first)
+
+    def _align(self, words: List[str], diagonal: int):
+        """
+        Aligns the quote word by word with the source around `diagonal`; returns (first, last, matcher)
+        where matcher compares the quote with source words first..last, or None if nothing aligns there.
+        """
+        low = max(0, diagonal - DIAGONAL_BAND)
+        window = self.words[low:diagonal + len(words) + DIAGONAL_BAND]
+        blocks = [
+            block for block in SequenceMatcher(None, words, window, autojunk=False).get_matching_blocks()
+            if block.size and abs(low + block.b - block.a - diagonal) <= DIAGONAL_BAND
+        ]
+        if not blocks:
+            return None
+        first = low + blocks[0].b
+        last = low + blocks[-1].b + blocks[-1].size - 1
+        return first, last, SequenceMatcher(None, words, self.words[first:last + 1], autojunk=False)
+
+    def _exact(self, words: List[str]) -> Optional[int]:
+        if len(words) >= self.ngram:
+            candidates = self.positions.get(" ".join(words[:self.ngram]), [])
+        else:
+            candidates = self.unigrams.get(words[0], [])
+        for position in candidates:
+            if self.words[position:position + len(words)] == words:
+                return position
+        return None
+
+    def locate(self, quote: str) -> Dict:
+        """
+        Returns {"status": "exact" | "fuzzy" | "unverified" | "empty", "score", "start", "end", "fragment"};
+        start / end are character offsets into the source text (None when not located).
+        """
+        words = [normalize_word(w) for w in WORD.findall(quote)]
+        if not words:
+            return {"status": "empty", "score": 0.0, "start": None, "end": None, "fragment": None}
+        position = self._exact(words)
+        if position is not None:
+            if self._negated_before(position):
+                return {"status": "unverified", "score": 0.0, "start": None, "end": None, "fragment": None}
+            return self._span(position, position + len(words) - 1, 1.0, "exact")
+        if len(words) < self.ngram:
+            return {"status": "unverified", "score": 0.0, "start": None, "end": None, "fragment": None}
+
+        shingles = [" ".join(words[i:i + self.ngram]) for i in range(len(words) - self.ngram + 1)]
+        votes = Counter()
+        for i, shingle in enumerate(shingles):
+            for position in self.positions.get(shingle, ()):
+                votes[position - i] += 1
+        if not votes:
+            return {"status": "unverified", "score": 0.0, "start": None, "end": None, "fragment": None}
+
+        best = max(votes, key=lambda d: sum(votes.get(d + k, 0) for k in range(-DIAGONAL_BAND, DIAGONAL_BAND + 1)))
+        aligned = self._align(words, best)
+        if aligned is None:
+            return {"status": "unverified", "score": 0.0, "start": None, "end": None, "fragment": None}
+        first, last, matcher = aligned
+        score = matcher.ratio()
+        if score < FUZZY_MIN_SCORE or self._changes_negation(matcher, first):
+            return {"status": "unverified", "score": round(score, 3), "start": None, "end": None, "fragment": None}
+        return self._span(first, last, score, "fuzzy")
+
+    def locate_all(self, quotes: Sequence[str]) -> List[Dict]:
+        return [self.locate(quote) for quote in quotes]
+
+
+def text_fragment(span_text: str, edge_words: int = 4) -> Optional[str]:
+    """
+    A URL text fragment (#:~:text=...) that makes browsers scroll to and highlight the span.
+    """
+    words = span_text.split()
+    if not words:
+        return None
+    encode = lambda part: url_quote(part, safe="").replace("-", "%2D")
+    if len(words) <= 2 * edge_words:
+        return "#:~:text=" + encode(" ".join(words))
+    return f"#:~:text={encode(' '.join(words[:edge_words]))},{encode(' '.join(words[-edge_words:]))}"
+
+
+_indexes: "OrderedDict[str, QuoteIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_quote_index(text: str) -> QuoteIndex:
+    """
+    The QuoteIndex for `text`, built once per policy version and kept in a small LRU.
+    """
+    key = content_hash(text)
+    with _indexes_lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+    index = QuoteIndex(text)
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > MEMORY_ENTRIES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def verify_quotes(text: str, quotes: Sequence[str]) -> List[Dict]:
+    return get_quote_index(text).locate_all(quotes)
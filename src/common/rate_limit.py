@@ -0,0 +1,34 @@
+import time
+import threading
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket: at most `rate_per_minute` acquisitions per minute, with bursts up to `burst`.
+    """
+
+    def __init__(self, rate_per_minute, burst=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst or max(1, int(rate_per_minute // 6))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def penalize(self, seconds):
+        """
+        Drains the bucket so nobody acquires for roughly `seconds`, e.g. after an HTTP 429.
+        """
+        with self._lock:
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
@@ -0,0 +1,106 @@
+import os
+import time
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.common.metrics import metrics
+
+RERANKER = os.getenv("RERANKER", "off")  # "off" or "cross-encoder"
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", 50))
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", 300))
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", 16))
+
+
+class CrossEncoderReranker:
+    """
+    Second-stage reranker: scores (query, chunk) pairs with a small CPU cross-encoder.
+
+    Candidates are scored in first-stage order, one batch at a time, while the next batch is expected
+    to fit in the per-query latency budget (judged by a moving average of batch time, shared by all
+    threads). The first batch is always scored, so the average keeps tracking the model and one slow
+    batch cannot switch reranking off for good. Scored candidates
+    are reordered by cross-encoder score; the unscored tail keeps its first-stage order behind them.
+    """
+
+    def __init__(self, model_name: str = RERANKER_MODEL, batch_size: int = RERANK_BATCH_SIZE,
+                 budget_ms: float = RERANK_BUDGET_MS):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.budget_seconds = budget_ms / 1000.0
+        self._model = None
+        self._lock = threading.Lock()
+        self._batch_seconds = 0.0  # moving average of one batch, used to stop before the budget runs out
+        self._batch_lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+                    self._model = CrossEncoder(self.model_name, device="cpu")
+                    print(f"✅ Loaded reranker model {self.model_name}")
+        return self._model
+
+    def rerank(self, query: str, candidates: Sequence[str], top_k: Optional[int] = None) -> Dict:
+        """
+        Returns {"order": candidate indices best first (top_k of them), "scores", "scored", "seconds"}.
+        """
+        model = self.model
+        start = time.perf_counter()
+        scores = []
+        for batch_start in range(0, len(candidates), self.batch_size):
+            elapsed = time.perf_counter() - start
+            with self._batch_lock:
+                expected = self._batch_seconds
+            if scores and elapsed + expected > self.budget_seconds:
+                break
+            batch_started = time.perf_counter()
+            batch = [(query, text) for text in candidates[batch_start:batch_start + self.batch_size]]
+            scores.extend(np.asarray(model.predict(batch, batch_size=self.batch_size, show_progress_bar=False), dtype="float32"))
+            batch_seconds = time.perf_counter() - batch_started
+            with self._batch_lock:
+                self._batch_seconds = batch_seconds if not self._batch_seconds else 0.8 * self._batch_seconds + 0.2 * batch_seconds
+
+        scored = len(scores)
+        order = [int(i) for i in np.argsort(-np.asarray(scores))] + list(range(scored, len(candidates)))
+        seconds = time.perf_counter() - start
+        metrics.record("rerank", seconds)
+        return {"order": order[:top_k] if top_k else order, "scores": scores, "scored": scored, "seconds": seconds}
+
+
+_reranker = None
+_reranker_lock = threading.Lock()
+
+
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    """
+    Returns the shared reranker, or None when RERANKER is "off".
+    """
+    global _reranker
+    if RERANKER == "off":
+        return None
+    with _reranker_lock:
+        if _reranker is None:
+            _reranker = CrossEncoderReranker()
+        return _reranker
+
+
+def rerank_texts(query: str, candidates: Sequence[str], top_k: int) -> List[str]:
+    """
+    The top_k candidates after reranking, or simply the first top_k when reranking is off.
+    """
+    reranker = get_reranker()
+    if reranker is None or len(candidates) <= 1:
+        return list(candidates[:top_k])
+    return [candidates[i] for i in reranker.rerank(query, candidates, top_k)["order"]]
+
+
+def candidate_count(top_k: int) -> int:
+    """
+    How many first-stage candidates to retrieve for a final top_k.
+    """
+    return max(top_k, RERANK_CANDIDATES) if get_reranker() is not None else top_k
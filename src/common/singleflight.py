@@ -0,0 +1,127 @@
+import threading
+from typing import Callable, Dict, Hashable, Iterable, Iterator
+
+
+class _Flight:
+    def __init__(self, key: Hashable):
+        self.key = key
+        self.events = []
+        self.done = False
+        self.error = None
+        self.subscribers = 1
+        self.cancelled = False
+        self.cond = threading.Condition()
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight computations: while one is running for a key, callers with the same
+    key share it instead of starting their own.
+
+    stream() runs the producer on a background thread and buffers its events; every caller (including
+    the one that started it) replays the buffer as it grows, so a session that joins late still sees the
+    whole stream, and the computation keeps going while any caller is still reading it, even if the one
+    that started it went away. When the last caller closes its stream early (a cancelled job, a closed
+    page), the producer is closed at its next event, i.e. between stages or stream pieces, and the flight
+    is dropped so a later call starts over. A producer error is raised to every caller. Finished flights
+    are forgotten, so later calls start fresh.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.started = 0
+        self.shared = 0
+        self.cancelled = 0
+
+    def _run(self, flight: _Flight, produce: Callable[[], Iterable]):
+        events = None
+        try:
+            events = iter(produce())
+            for event in events:
+                if flight.cancelled:
+                    break
+                with flight.cond:
+                    flight.events.append(event)
+                    flight.cond.notify_all()
+        except Exception as e:
+            flight.error = e
+        finally:
+            if hasattr(events, "close"):
+                events.close()  # stops a generator producer at its current yield and runs its cleanup
+            with self._lock:
+                if self._flights.get(flight.key) is flight:
+                    del self._flights[flight.key]
+            with flight.cond:
+                flight.done = True
+                flight.cond.notify_all()
+
+    def stream(self, key: Hashable, produce: Callable[[], Iterable]) -> Iterator:
+        """
+        Yields the events of produce(), shared with every concurrent caller using the same key.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight(key)
+                self.started += 1
+                threading.Thread(target=self._run, args=(flight, produce), name=f"singleflight-{self.name}", daemon=True).start()
+            else:
+                flight.subscribers += 1
+                self.shared += 1
+                print(f"✅ Joined in-flight {self.name} for {key!r}")
+        return self._replay(flight)
+
+    def _replay(self, flight: _Flight) -> Iterator:
+        seen = 0
+        try:
+            while True:
+                with flight.cond:
+                    while seen == len(flight.events) and not flight.done:
+                        flight.cond.wait()
+                    pending = flight.events[seen:]
+                    finished = flight.done
+                yield from pending
+                seen += len(pending)
+                if finished and seen == len(flight.events):
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+        finally:
+            self._leave(flight)
+
+    def _leave(self, flight: _Flight):
+        """
+        Called when a caller's stream ends or is closed; cancels the producer once nobody is reading it.
+        """
+        with self._lock:
+            flight.subscribers -= 1
+            if flight.subscribers > 0 or flight.done or flight.cancelled:
+                return
+            flight.cancelled = True
+            self.cancelled += 1
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+        print(f"⚠️ Cancelled {self.name} for {flight.key!r}: no callers left")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            in_flight = len(self._flights)
+        return {"started": self.started, "shared": self.shared, "cancelled": self.cancelled, "in_flight": in_flight}
+
+
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight(name)
+        return _groups[name]
+
+
+def single_flight_stats() -> Dict[str, Dict]:
+    with _groups_lock:
+        return {name: group.stats() for name, group in _groups.items()}
@@ -0,0 +1,61 @@
+import os
+import math
+
+import faiss
+import numpy as np
+
+from src.common.quantization import EMBEDDING_STORAGE
+
+BACKENDS = ["flat", "ivf", "hnsw", "ivfpq"]
+ANN_MIN_VECTORS = 2048  # below this an exact flat index is as fast as any ANN index
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", 16))
+HNSW_M = 32
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", 64))
+
+
+def index_factory_string(backend: str, num_vectors: int, dimension: int, storage: str = EMBEDDING_STORAGE) -> str:
+    """
+    FAISS factory string for an index backend sized for `num_vectors`:
+    flat (exact), ivf (inverted lists), hnsw (graph) or ivfpq (inverted lists + product quantization).
+    Small collections always get an exact flat index. With float16 / int8 embedding storage the
+    vectors inside flat, ivf and hnsw indexes are scalar-quantized the same way.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown index backend: {backend}")
+    codec = {"float32": "Flat", "float16": "SQfp16", "int8": "SQ8"}[storage]
+    if backend == "flat" or num_vectors < ANN_MIN_VECTORS:
+        return codec
+    if backend == "hnsw":
+        return f"HNSW{HNSW_M},{codec}"
+    # ~4 * sqrt(n) lists, with at least 39 training points per list as k-means needs.
+    nlist = max(16, min(int(4 * math.sqrt(num_vectors)), num_vectors // 39))
+    if backend == "ivf":
+        return f"IVF{nlist},{codec}"
+    sub_quantizers = max(m for m in range(1, dimension // 8 + 1) if dimension % m == 0)
+    nbits = 8 if num_vectors >= 256 * 39 else 4
+    return f"IVF{nlist},PQ{sub_quantizers}x{nbits}"
+
+
+def configure_search(index, nprobe: int = IVF_NPROBE, ef_search: int = HNSW_EF_SEARCH):
+    """
+    Applies the query-time speed/recall knobs (IVF nprobe, HNSW efSearch); no-op for flat indexes.
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe, ivf.nlist)
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = ef_search
+    return index
+
+
+def make_index(embeddings: np.ndarray, backend: str = "flat", storage: str = EMBEDDING_STORAGE):
+    """
+    Builds, trains (IVF / PQ / scalar quantizer) and fills an inner-product FAISS index over normalized float32 embeddings.
+    """
+    num_vectors, dimension = embeddings.shape
+    factory = index_factory_string(backend, num_vectors, dimension, storage)
+    index = faiss.index_factory(dimension, factory, faiss.METRIC_INNER_PRODUCT)
+    if not index.is_trained:
+        index.train(embeddings)
+    index.add(embeddings)
+    return configure_search(index)
@@ -4,10 +4,12 @@ import sys
 import os
 from dotenv import load_dotenv
 
-sys.path.append(os.path.abspath('.'))
+# Import through the repository's top-level `src` package, which holds the shared src/common modules;
+# `src` must not resolve to src/comparison/src when this app is run from its own directory.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
-from src.policy_loader import load_policies
-from src.policy_comparator import PolicyComparator
+from src.comparison.src.policy_loader import load_policies
+from src.comparison.src.policy_comparator import PolicyComparator
 
 load_dotenv()
 
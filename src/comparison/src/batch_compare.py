@@ -0,0 +1,90 @@
+import os
+import argparse
+from itertools import combinations
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from .policy_loader import load_policies
+from .policy_comparator import PolicyComparator
+from .comparison_store import get_comparison_store
+from src.common.llm_cache import set_refresh
+from src.common.policy_store import content_hash
+
+def select_pairs(platforms: List[str], against: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    All unordered pairs of `platforms`, or `against` paired with every other platform.
+    One order per pair is enough: the comparison store serves (B, A) from a stored (A, B).
+    """
+    if against:
+        return [(against, other) for other in platforms if other != against]
+    return list(combinations(sorted(platforms), 2))
+
+def batch_compare(pairs: Optional[List[Tuple[str, str]]] = None, against: Optional[str] = None, workers: int = 4,
+                  force: bool = False, comparator: Optional[PolicyComparator] = None, df=None) -> Dict:
+    """
+    Precomputes comparisons for `pairs` (default: all pairs, or `against` vs. every other platform).
+
+    Aspect retrieval runs once per platform up front; the per-pair Gemini calls then run on a worker pool
+    and are written to the comparison store as they finish. `force` recomputes stored pairs and bypasses the
+    LLM response cache. Returns a report with `done`, `skipped` and `failures`.
+    """
+    comparator = comparator or PolicyComparator(api_key=os.getenv('GEMINI_API_KEY'))
+    df = load_policies() if df is None else df
+    policies = dict(zip(df['Platform'], df['Policy']))
+    pairs = select_pairs(list(policies), against) if pairs is None else pairs
+    store = get_comparison_store()
+    report = {"done": [], "skipped": [], "failures": {}}
+
+    needed = sorted({platform for pair in pairs for platform in pair})
+    missing = [platform for platform in needed if platform not in policies]
+    for platform in missing:
+        report["failures"][platform] = "policy not loaded"
+    hashes = {platform: content_hash(policies[platform]) for platform in needed if platform in policies}
+
+    todo = []
+    for a, b in pairs:
+        if a in missing or b in missing:
+            continue
+        if not force and store.get_comparison(a, b, hashes[a], hashes[b]) is not None:
+            report["skipped"].append((a, b))
+        else:
+            todo.append((a, b))
+
+    # Per-platform work: chunk, embed and retrieve every aspect once, however many pairs use the platform.
+    sections = {}
+    for platform in sorted({platform for pair in todo for platform in pair}):
+        sections[platform] = comparator.extract_aspect_sections(policies[platform])
+    print(f"✅ Aspect sections ready for {len(sections)} platforms, {len(todo)} pairs to compare")
+
+    def compare(a, b):
+        result = comparator.compare_sections(a, b, sections[a], sections[b])
+        store.put_comparison(a, b, hashes[a], hashes[b], result)
+
+    set_refresh(force)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(compare, a, b): (a, b) for a, b in todo}
+            for future in as_completed(futures):
+                pair = futures[future]
+                try:
+                    future.result()
+                    report["done"].append(pair)
+                    print(f"✅ Compared {pair[0]} vs {pair[1]} ({len(report['done'])}/{len(todo)})")
+                except Exception as e:
+                    report["failures"][f"{pair[0]} vs {pair[1]}"] = str(e)
+                    print(f"⚠️ Failed to compare {pair[0]} vs {pair[1]}: {str(e)}")
+    finally:
+        set_refresh(False)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute pairwise policy comparisons.")
+    parser.add_argument("--against", type=str, help="Compare this platform against every other platform")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--force", action="store_true", help="Recompute pairs that are already stored")
+    args = parser.parse_args()
+
+    policy_df = load_policies()
+    selected = select_pairs(list(policy_df['Platform']), args.against)
+    report = batch_compare(selected, workers=args.workers, force=args.force, df=policy_df)
+    print(f"\nDone: {len(report['done'])}, already stored: {len(report['skipped'])}, failed: {len(report['failures'])}")
@@ -0,0 +1,122 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from src.common.llm_cache import backend_version
+from src.common.paths import CACHE_DIR
+
+CITATION = re.compile(r"\[([AB])(\d+)\]")
+
+
+def swap_comparison(result: Dict) -> Dict:
+    """
+    The comparison of (B, A) from a stored comparison of (A, B): the two platform columns of the
+    table are swapped and every citation is relabelled, [A1] <-> [B1], along with its passages and spans.
+    """
+    relabel = lambda citation_id: ("B" if citation_id[0] == "A" else "A") + citation_id[1:]
+    lines = []
+    for line in result['comparison'].splitlines():
+        cells = line.split("|")
+        if line.strip().startswith("|") and len(cells) >= 5:
+            cells[2], cells[3] = cells[3], cells[2]
+            line = "|".join(cells)
+        lines.append(line)
+    comparison = CITATION.sub(lambda m: f"[{'B' if m.group(1) == 'A' else 'A'}{m.group(2)}]", "\n".join(lines))
+
+    swapped = dict(result, comparison=comparison)
+    for side, other in (('a', 'b'), ('b', 'a')):
+        swapped[f'citations_{side}'] = {relabel(k): v for k, v in result.get(f'citations_{other}', {}).items()}
+        if f'citation_spans_{other}' in result:
+            swapped[f'citation_spans_{side}'] = {relabel(k): v for k, v in result[f'citation_spans_{other}'].items()}
+    return swapped
+
+
+class ComparisonStore:
+    """
+    Stores per-policy aspect sections and finished pairwise comparisons.
+
+    Aspect sections are keyed by policy hash (plus chunker/model/aspect config), so they are computed
+    once per platform version and shared by every pair; comparisons are keyed by the ordered platform pair and both policy hashes, scoped to the LLM backend.
+    A comparison stored for (A, B) also answers (B, A), with its columns and citations swapped.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(CACHE_DIR, "comparisons.sqlite")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._db() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS aspect_sections (
+                    key TEXT PRIMARY KEY,
+                    sections TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS comparisons (
+                    platform_a TEXT NOT NULL,
+                    platform_b TEXT NOT NULL,
+                    hash_a TEXT NOT NULL,
+                    hash_b TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (platform_a, platform_b, hash_a, hash_b)
+                )
+                """
+            )
+
+    @contextmanager
+    def _db(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_sections(self, key: str) -> Optional[Dict]:
+        with self._db() as conn:
+            row = conn.execute("SELECT sections FROM aspect_sections WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_sections(self, key: str, sections: Dict):
+        with self._db() as conn:
+            conn.execute("INSERT OR REPLACE INTO aspect_sections VALUES (?, ?)", (key, json.dumps(sections)))
+
+    def _get(self, platform_a: str, platform_b: str, hash_a: str, hash_b: str) -> Optional[Dict]:
+        with self._db() as conn:
+            row = conn.execute(
+                "SELECT result FROM comparisons WHERE platform_a = ? AND platform_b = ? AND hash_a = ? AND hash_b = ?",
+                (platform_a, platform_b, backend_version(hash_a), backend_version(hash_b)),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_comparison(self, platform_a: str, platform_b: str, hash_a: str, hash_b: str) -> Optional[Dict]:
+        result = self._get(platform_a, platform_b, hash_a, hash_b)
+        if result is None:
+            reverse = self._get(platform_b, platform_a, hash_b, hash_a)
+            result = swap_comparison(reverse) if reverse is not None else None
+        return result
+
+    def put_comparison(self, platform_a: str, platform_b: str, hash_a: str, hash_b: str, result: Dict):
+        with self._db() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO comparisons VALUES (?, ?, ?, ?, ?, ?)",
+                (platform_a, platform_b, backend_version(hash_a), backend_version(hash_b), json.dumps(result), time.time()),
+            )
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_comparison_store() -> ComparisonStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ComparisonStore()
+        return _store
@@ -1,50 +1,109 @@
-import google.generativeai as genai
+import json
+import time
+from contextlib import closing
 from .text_processor import TextProcessor
-from typing import Dict, List
+from .comparison_store import get_comparison_store
+from .policy_loader import canonical_platform, load_policy_text
+from src.common.chunker import CHUNKER_VERSION
+from src.common.hybrid_retriever import DENSE_WEIGHT, FUSION, RETRIEVAL_MODE
+from src.common.llm_client import get_llm_client
+from src.common.metrics import metrics
+from src.common.policy_store import content_hash
+from src.common.quote_verifier import verify_quotes
+from src.common.singleflight import get_single_flight
+from typing import Dict, Iterator, List, Optional, Tuple
 
 class PolicyComparator:
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
+    ASPECTS = [
+        "Data Collection",
+        "Data Sharing",
+        "User Rights",
+        "Cookies",
+        "Third-party Data",
+        "Data Retention",
+        "Security Measures"
+    ]
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.model_name = 'gemini-2.0-flash'
+        self.client = get_llm_client(self.model_name, api_key=api_key)
         self.text_processor = TextProcessor()
 
-        self.aspects = [
-            "Data Collection",
-            "Data Sharing",
-            "User Rights",
-            "Cookies",
-            "Third-party Data",
-            "Data Retention",
-            "Security Measures"
-        ]
+        self.aspects = list(self.ASPECTS)
 
     def prepare_policy_chunks(self, policy_text: str) -> Dict:
         chunks = self.text_processor.create_chunks(policy_text)
         embeddings = self.text_processor.create_embeddings(chunks)
         return {'chunks': chunks, 'embeddings': embeddings}
 
+    @staticmethod
+    def aspect_query(aspect: str) -> str:
+        return f"Find information about {aspect} in privacy policy"
+
     def get_relevant_sections(self, aspect: str, policy_data: Dict) -> List[Dict]:
-        query = f"Find information about {aspect} in privacy policy"
+        query = self.aspect_query(aspect)
         return self.text_processor.find_relevant_chunks(
             query,
             policy_data['chunks'],
-            policy_data['embeddings']
+            policy_data['embeddings'],
+            lexical_query=aspect
         )
 
-    def compare_policies_gemini(self, platform_a: str, platform_b: str, df):
-        policy_a_text = df[df['Platform'] == platform_a]['Policy'].iloc[0]
-        policy_b_text = df[df['Platform'] == platform_b]['Policy'].iloc[0]
+    def get_relevant_sections_for_aspects(self, policy_data: Dict) -> Dict[str, List[Dict]]:
+        """
+        get_relevant_sections for every aspect in one batched retrieval pass.
+        """
+        queries = [self.aspect_query(aspect) for aspect in self.aspects]
+        results = self.text_processor.find_relevant_chunks_batch(
+            queries,
+            policy_data['chunks'],
+            policy_data['embeddings'],
+            lexical_queries=self.aspects
+        )
+        return dict(zip(self.aspects, results))
+
+    def extract_aspect_sections(self, policy_text: str, use_store: bool = True) -> Dict[str, List[Dict]]:
+        """
+        Returns {aspect: relevant sections} for one policy. This is the per-platform part of a
+        comparison, so it is stored by policy hash and reused for every pair the platform appears in.
+        """
+        store = get_comparison_store()
+        key = self._sections_key(content_hash(policy_text))
+        if use_store:
+            sections = store.get_sections(key)
+            if sections is not None:
+                return sections
 
-        policy_a_data = self.prepare_policy_chunks(policy_a_text)
-        policy_b_data = self.prepare_policy_chunks(policy_b_text)
+        policy_data = self.prepare_policy_chunks(policy_text)
+        sections = {}
+        for aspect, relevant in self.get_relevant_sections_for_aspects(policy_data).items():
+            sections[aspect] = [
+                {'chunk': chunk['chunk'], 'similarity': float(chunk['similarity']), 'index': int(chunk['index'])}
+                for chunk in relevant
+            ]
+        store.put_sections(key, sections)
+        return sections
 
+    def _sections_key(self, policy_hash: str) -> str:
+        config = [
+            policy_hash,
+            self.aspects,
+            self.text_processor.chunk_size,
+            self.text_processor.overlap,
+            CHUNKER_VERSION,
+            [RETRIEVAL_MODE, DENSE_WEIGHT, FUSION],
+            self.text_processor.embedder.model_name,
+        ]
+        return content_hash(json.dumps(config))
+
+    def _prepare_comparison(self, platform_a: str, platform_b: str, sections_a: Dict, sections_b: Dict):
         comparison_data = []
         citations_a, citations_b = {}, {}
         citation_counter_a, citation_counter_b = 1, 1
 
         for aspect in self.aspects:
-            relevant_a = self.get_relevant_sections(aspect, policy_a_data)
-            relevant_b = self.get_relevant_sections(aspect, policy_b_data)
+            relevant_a = sections_a[aspect]
+            relevant_b = sections_b[aspect]
 
             citations_a[f"A{citation_counter_a}"] = " ".join(chunk['chunk'] for chunk in relevant_a)
             citations_b[f"B{citation_counter_b}"] = " ".join(chunk['chunk'] for chunk in relevant_b)
@@ -63,14 +122,106 @@ class PolicyComparator:
         prompt = self._build_comparison_prompt(
             platform_a, platform_b, comparison_data
         )
+        return prompt, citations_a, citations_b
 
-        response = self.model.generate_content(prompt)
+    def citation_spans(self, policy_text: str, sections: Dict, prefix: str) -> Dict[str, List[Dict]]:
+        """
+        Locates the passages behind each citation ([A1], [A2], ... in aspect order, as numbered by
+        _prepare_comparison) in the policy text: {citation id: [match per passage]} with character
+        offsets and a deep-link text fragment (see src/common/quote_verifier.py).
+        """
+        spans = {}
+        for number, aspect in enumerate(self.aspects, start=1):
+            spans[f"{prefix}{number}"] = verify_quotes(policy_text, [chunk['chunk'] for chunk in sections[aspect]])
+        return spans
+
+    def compare_sections(self, platform_a: str, platform_b: str, sections_a: Dict, sections_b: Dict) -> Dict:
+        prompt, citations_a, citations_b = self._prepare_comparison(platform_a, platform_b, sections_a, sections_b)
+        comparison = self.client.generate(prompt)
         return {
-            'comparison': response.text,
+            'comparison': comparison,
+            'citations_a': citations_a,
+            'citations_b': citations_b
+        }
+
+    def compare_sections_stream(self, platform_a: str, platform_b: str, sections_a: Dict, sections_b: Dict) -> Iterator[Tuple[str, object]]:
+        """
+        Yields ("comparison", text) events as the comparison table streams in, then ("result", result dict).
+        """
+        prompt, citations_a, citations_b = self._prepare_comparison(platform_a, platform_b, sections_a, sections_b)
+
+        pieces = []
+        for piece in self.client.stream(prompt):
+            pieces.append(piece)
+            yield 'comparison', piece
+        yield 'result', {
+            'comparison': "".join(pieces),
             'citations_a': citations_a,
             'citations_b': citations_b
         }
 
+    def compare_texts(self, platform_a: str, platform_b: str, policy_a_text: str, policy_b_text: str, use_store: bool = True) -> Dict:
+        """
+        Compares two policy texts, serving a stored comparison for the same pair and policy versions if there is one.
+        """
+        result = None
+        for kind, payload in self.compare_texts_stream(platform_a, platform_b, policy_a_text, policy_b_text, use_store):
+            if kind == 'result':
+                result = payload
+        return result
+
+    def compare_texts_stream(self, platform_a: str, platform_b: str, policy_a_text: str, policy_b_text: str, use_store: bool = True) -> Iterator[Tuple[str, object]]:
+        """
+        Streaming counterpart of compare_texts. ("stage", name) events mark the stages in COMPARISON_STAGES
+        as they start. Time to the first comparison text is recorded as `ttft.comparison`.
+        Concurrent requests for the same pair and policy versions share one comparison.
+        """
+        hash_a, hash_b = content_hash(policy_a_text), content_hash(policy_b_text)
+        key = (self.model_name, platform_a, platform_b, hash_a, hash_b, use_store)
+        return get_single_flight('comparison').stream(
+            key, lambda: self._produce_comparison(platform_a, platform_b, policy_a_text, policy_b_text, hash_a, hash_b, use_store)
+        )
+
+    def _produce_comparison(self, platform_a: str, platform_b: str, policy_a_text: str, policy_b_text: str,
+                            hash_a: str, hash_b: str, use_store: bool) -> Iterator[Tuple[str, object]]:
+        start = time.perf_counter()
+        store = get_comparison_store()
+        stored = store.get_comparison(platform_a, platform_b, hash_a, hash_b) if use_store else None
+        if stored is not None and 'citation_spans_a' not in stored:
+            # Stored by the batch CLI, which does not locate citations; sections are stored too, so this is cheap.
+            stored['citation_spans_a'] = self.citation_spans(policy_a_text, self.extract_aspect_sections(policy_a_text), 'A')
+            stored['citation_spans_b'] = self.citation_spans(policy_b_text, self.extract_aspect_sections(policy_b_text), 'B')
+        if stored is not None:
+            metrics.record('ttft.comparison', time.perf_counter() - start)
+            yield 'comparison', stored['comparison']
+            yield 'result', stored
+            return
+
+        yield 'stage', 'sections'
+        sections_a = self.extract_aspect_sections(policy_a_text, use_store)
+        sections_b = self.extract_aspect_sections(policy_b_text, use_store)
+        yield 'stage', 'compare'
+        first = True
+        for kind, payload in self.compare_sections_stream(platform_a, platform_b, sections_a, sections_b):
+            if kind == 'comparison' and first:
+                metrics.record('ttft.comparison', time.perf_counter() - start)
+                first = False
+            if kind == 'result':
+                payload['citation_spans_a'] = self.citation_spans(policy_a_text, sections_a, 'A')
+                payload['citation_spans_b'] = self.citation_spans(policy_b_text, sections_b, 'B')
+                store.put_comparison(platform_a, platform_b, hash_a, hash_b, payload)
+            yield kind, payload
+
+    def compare_policies_gemini_stream(self, platform_a: str, platform_b: str, df) -> Iterator[Tuple[str, object]]:
+        policy_a_text = df[df['Platform'] == platform_a]['Policy'].iloc[0]
+        policy_b_text = df[df['Platform'] == platform_b]['Policy'].iloc[0]
+        return self.compare_texts_stream(platform_a, platform_b, policy_a_text, policy_b_text)
+
+    def compare_policies_gemini(self, platform_a: str, platform_b: str, df):
+        policy_a_text = df[df['Platform'] == platform_a]['Policy'].iloc[0]
+        policy_b_text = df[df['Platform'] == platform_b]['Policy'].iloc[0]
+        return self.compare_texts(platform_a, platform_b, policy_a_text, policy_b_text)
+
     def _build_comparison_prompt(self, platform_a, platform_b, comparison_data):
         prompt = f"""
 Compare the privacy policies of {platform_a} and {platform_b} based on the following extracted sections.
@@ -92,3 +243,29 @@ Use these sections to create your comparison:
             prompt += f"{platform_b}: {data['platform_b_text']} {data['citation_b']}\n"
 
         return prompt
+
+
+COMPARISON_STAGES = ['fetch', 'sections', 'compare']
+
+
+def run_comparison_job(job, platform_a: str, platform_b: str, use_store: bool = True) -> Dict:
+    """
+    Background job handler (see src/common/jobs.py): reports stages and the partial comparison table,
+    returns the comparison result dict.
+    """
+    job.stage('fetch', 0.0)
+    platform_a, platform_b = canonical_platform(platform_a), canonical_platform(platform_b)
+    policy_a_text, policy_b_text = load_policy_text(platform_a), load_policy_text(platform_b)
+    comparator = PolicyComparator()
+    pieces, result = [], None
+    # Closing the stream when the job is cancelled stops the shared comparison if no one else is reading it.
+    with closing(comparator.compare_texts_stream(platform_a, platform_b, policy_a_text, policy_b_text, use_store)) as events:
+        for kind, payload in events:
+            if kind == 'stage':
+                job.stage(payload, COMPARISON_STAGES.index(payload) / len(COMPARISON_STAGES))
+            elif kind == 'comparison':
+                pieces.append(payload)
+                job.partial("".join(pieces))
+            else:
+                result = payload
+    return result
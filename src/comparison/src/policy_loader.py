@@ -1,6 +1,8 @@
 import os
 import pandas as pd
-import requests
+
+from src.common.policy_fetcher import fetch_policies
+from src.common.policy_store import fetch_policy_text
 
 def find_privacy_db_csv():
     """Find the privacy_db.csv file in the project."""
@@ -15,6 +17,29 @@ def find_privacy_db_csv():
     
     raise FileNotFoundError("Could not find privacy_db.csv file. Please make sure it exists in src/summary/.")
 
+def find_platform(platform_name):
+    """
+    The privacy_db.csv row of a platform, matched case-insensitively: {"Platform", "Privacy Policy Txt", ...}.
+    """
+    df = pd.read_csv(find_privacy_db_csv())
+    match = df[df["Platform"].str.lower() == platform_name.lower()]
+    if match.empty:
+        raise FileNotFoundError(f"Platform '{platform_name}' not found in privacy_db.csv.")
+    return match.iloc[0].to_dict()
+
+def canonical_platform(platform_name):
+    """
+    The platform name as spelled in privacy_db.csv, which comparisons are stored and coalesced under.
+    """
+    return find_platform(platform_name)["Platform"]
+
+def load_policy_text(platform_name):
+    """
+    Fetches the policy text of one platform in privacy_db.csv (through the policy cache), stripped
+    the same way as load_policies so every path hashes the same text.
+    """
+    return fetch_policy_text(find_platform(platform_name)["Privacy Policy Txt"]).strip()
+
 def load_policies(data_dir=None):
     """
     Load policies from privacy_db.csv and fetch their content.
@@ -29,24 +54,21 @@ def load_policies(data_dir=None):
     df = pd.read_csv(csv_path)
     
     # Keep only the Platform and Privacy Policy Txt columns
+    report = fetch_policies(df["Privacy Policy Txt"].tolist())
     policy_records = []
     
     for _, row in df.iterrows():
         platform_name = row["Platform"]
         policy_url = row["Privacy Policy Txt"]
         
-        try:
-            # Fetch the policy content
-            response = requests.get(policy_url)
-            response.raise_for_status()
-            policy_content = response.text.strip()
-            
+        if policy_url in report["results"]:
             policy_records.append({
                 "Platform": platform_name,
-                "Policy": policy_content
+                "Policy": report["results"][policy_url].strip()
             })
-            print(f"✅ Loaded policy for {platform_name}")
-        except Exception as e:
-            print(f"⚠️ Failed to load policy for {platform_name}: {str(e)}")
+    
+    print(f"✅ Loaded {len(policy_records)} policies in {report['elapsed']:.2f}s")
+    for policy_url, error in report["failures"].items():
+        print(f"⚠️ Failed to load policy from {policy_url}: {error}")
     
     return pd.DataFrame(policy_records)
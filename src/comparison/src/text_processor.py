@@ -1,39 +1,38 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import textwrap
 
+from src.common.chunker import chunk_texts
+from src.common.embeddings import get_embedding_service
+from src.common.hybrid_retriever import HybridRetriever
+
 class TextProcessor:
     def __init__(self):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedder = get_embedding_service()
         self.chunk_size = 200
         self.overlap = 50
 
     def create_chunks(self, text: str) -> List[str]:
-        words = text.split()
-        chunks = []
-        
-        for i in range(0, len(words), self.chunk_size - self.overlap):
-            chunk = ' '.join(words[i:i + self.chunk_size])
-            chunks.append(chunk)
-        
-        return chunks
+        return chunk_texts(text, max_words=self.chunk_size, overlap=self.overlap)
 
     def create_embeddings(self, chunks: List[str]) -> np.ndarray:
-        return self.model.encode(chunks)
+        return self.embedder.encode(chunks)
+
+    def find_relevant_chunks(self, query: str, chunks: List[str], embeddings: np.ndarray, top_k: int = 3,
+                             lexical_query: Optional[str] = None) -> List[Dict]:
+        lexical_queries = [lexical_query] if lexical_query else None
+        return self.find_relevant_chunks_batch([query], chunks, embeddings, top_k, lexical_queries)[0]
 
-    def find_relevant_chunks(self, query: str, chunks: List[str], embeddings: np.ndarray, top_k: int = 3) -> List[Dict]:
-        query_embedding = self.model.encode([query])[0]
-        similarities = np.dot(embeddings, query_embedding)
-        
-        top_indices = np.argsort(similarities)[-top_k:][::-1]
-        
-        results = []
-        for idx in top_indices:
-            results.append({
-                'chunk': chunks[idx],
-                'similarity': similarities[idx],
-                'index': idx
-            })
-        
-        return results
+    def find_relevant_chunks_batch(self, queries: List[str], chunks: List[str], embeddings: np.ndarray, top_k: int = 3,
+                                   lexical_queries: Optional[List[str]] = None) -> List[List[Dict]]:
+        """
+        find_relevant_chunks for several queries at once: one encode call and one hybrid
+        (dense + BM25) score matrix, with an argpartition top-k per query instead of a full sort.
+        `similarity` is the fused score.
+        """
+        query_embeddings = self.embedder.encode(queries)
+        hits = HybridRetriever(chunks, embeddings).search(queries, top_k, query_embeddings, lexical_queries)
+        return [
+            [{'chunk': chunks[hit['index']], 'similarity': hit['score'], 'index': hit['index']} for hit in row]
+            for row in hits
+        ]
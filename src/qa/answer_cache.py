@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from src.common.metrics import metrics
+from src.common.paths import CACHE_DIR
+
+ENABLED = os.getenv("QA_CACHE", "1") != "0"
+SIMILARITY_THRESHOLD = float(os.getenv("QA_CACHE_THRESHOLD", 0.92))
+PER_PLATFORM_CAPACITY = int(os.getenv("QA_CACHE_PER_PLATFORM", 200))
+TTL_SECONDS = int(os.getenv("QA_CACHE_TTL_SECONDS", 30 * 24 * 3600))
+
+
+class SemanticAnswerCache:
+    """
+    Q&A answers keyed by (platform, policy version) and the question's embedding.
+
+    A lookup returns the answer to the most similar earlier question about the same policy version
+    when the cosine similarity reaches `threshold`. Each platform keeps at most `capacity` answers
+    (least recently used evicted first), answers for older policy versions are dropped when a new
+    version is cached, and entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, path=None, threshold=SIMILARITY_THRESHOLD, capacity=PER_PLATFORM_CAPACITY, ttl=TTL_SECONDS):
+        self.path = path or os.path.join(CACHE_DIR, "qa_answers.sqlite")
+        self.threshold = threshold
+        self.capacity = capacity
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._db() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS answers (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    platform TEXT NOT NULL,
+                    policy_version TEXT NOT NULL,
+                    question TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    answer TEXT NOT NULL,
+                    sources TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS answers_platform ON answers (platform, policy_version)")
+
+    @contextmanager
+    def _db(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def lookup(self, platform, policy_version, question_embedding):
+        """
+        Returns {"question", "answer", "sources", "similarity"} for the closest cached question, or None.
+        `question_embedding` must be L2-normalized.
+        """
+        now = time.time()
+        with self._db() as conn:
+            rows = conn.execute(
+                "SELECT id, question, embedding, answer, sources FROM answers "
+                "WHERE platform = ? AND policy_version = ? AND created_at >= ?",
+                (platform.lower(), policy_version, now - self.ttl),
+            ).fetchall()
+            if not rows:
+                self._count(False)
+                return None
+            matrix = np.stack([np.frombuffer(row["embedding"], dtype="float32") for row in rows])
+            similarities = matrix @ np.asarray(question_embedding, dtype="float32")
+            best = int(np.argmax(similarities))
+            metrics.record("qa.cache_similarity", float(similarities[best]))
+            if similarities[best] < self.threshold:
+                self._count(False)
+                return None
+            row = rows[best]
+            conn.execute("UPDATE answers SET last_access = ?, hits = hits + 1 WHERE id = ?", (now, row["id"]))
+        self._count(True)
+        return {
+            "question": row["question"],
+            "answer": row["answer"],
+            "sources": json.loads(row["sources"]),
+            "similarity": float(similarities[best]),
+        }
+
+    def put(self, platform, policy_version, question, question_embedding, answer, sources):
+        if not answer:
+            return
+        platform = platform.lower()
+        now = time.time()
+        embedding = np.asarray(question_embedding, dtype="float32").tobytes()
+        with self._db() as conn:
+            conn.execute(
+                "INSERT INTO answers (platform, policy_version, question, embedding, answer, sources, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (platform, policy_version, question, embedding, answer, json.dumps(sources), now, now),
+            )
+            evicted = conn.execute(
+                "DELETE FROM answers WHERE platform = ? AND (policy_version != ? OR created_at < ?)",
+                (platform, policy_version, now - self.ttl),
+            ).rowcount
+            evicted += conn.execute(
+                "DELETE FROM answers WHERE id IN ("
+                "SELECT id FROM answers WHERE platform = ? ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (platform, self.capacity),
+            ).rowcount
+        with self._lock:
+            self.evictions += evicted
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        with self._db() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticAnswerCache()
+        return _cache
@@ -0,0 +1,40 @@
+import argparse
+import pandas as pd
+
+from src.common.paths import PRIVACY_DB_CSV
+from src.common.policy_fetcher import fetch_policies
+from src.qa.qa import DEFAULT_CHUNK_SIZE, index_key, load_index, load_or_build_index
+
+def build_all_indexes(csv_path=PRIVACY_DB_CSV, max_chunk_size=DEFAULT_CHUNK_SIZE, platforms=None):
+    """
+    Prebuilds the persisted Q&A index for every platform in privacy_db.csv (or only `platforms`).
+    Returns {platform: error message} for the platforms that could not be indexed.
+    """
+    df = pd.read_csv(csv_path)
+    if platforms:
+        wanted = {p.lower() for p in platforms}
+        df = df[df["Platform"].str.lower().isin(wanted)]
+
+    # Warm the policy store concurrently; indexing below then reads from disk.
+    fetch_policies(df["Privacy Policy Txt"].tolist())
+
+    failures = {}
+    for _, row in df.iterrows():
+        platform_name, txt_href = row["Platform"], row["Privacy Policy Txt"]
+        if load_index(index_key(txt_href, max_chunk_size)) is not None:
+            print(f"✅ Index up to date for {platform_name}")
+            continue
+        try:
+            load_or_build_index(txt_href, max_chunk_size)
+            print(f"✅ Built index for {platform_name}")
+        except Exception as e:
+            failures[platform_name] = str(e)
+            print(f"⚠️ Failed to build index for {platform_name}: {str(e)}")
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prebuild persisted Q&A embedding indexes for privacy_db.csv.")
+    parser.add_argument("--platform", action="append", help="Only build the given platform (repeatable)")
+    parser.add_argument("--max_chunk_size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+    build_all_indexes(max_chunk_size=args.max_chunk_size, platforms=args.platform)
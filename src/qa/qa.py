@@ -1,16 +1,31 @@
 import os
 import json
-import requests
-import os
 import regex as re
 import argparse
 import pandas as pd
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
-import numpy as np
 import faiss
 from urllib.parse import quote
 
+from collections import OrderedDict
+import hashlib
+import shutil
+import threading
+
+from src.common.chunker import CHUNKER_VERSION, chunk_texts
+from src.common.context_packer import estimate_tokens, pack_context
+from src.common.corpus_index import get_corpus_index
+from src.common.hybrid_retriever import RETRIEVAL_MODE, HybridRetriever
+from src.common.llm_cache import backend_version
+from src.common.llm_client import get_llm_client
+from src.common.embeddings import MODEL_NAME as EMBEDDING_MODEL_NAME, encode
+from src.common.paths import CACHE_DIR
+from src.common.policy_store import fetch_policy_text, get_policy_store
+from src.common.reranker import candidate_count, rerank_texts
+from src.common.quantization import EMBEDDING_STORAGE, QuantizedEmbeddings
+from src.common.vector_index import make_index
+from src.qa.answer_cache import ENABLED as ANSWER_CACHE_ENABLED, get_answer_cache
+
 dotenv_path = os.path.join(os.path.dirname(__file__), '..', '..', '.env')
 load_dotenv(dotenv_path=dotenv_path)
 
@@ -21,15 +36,17 @@ if __name__ == "__main__":
     parser.add_argument('--question', type=str, help="The question to ask about the privacy policy")
     args = parser.parse_args()
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_API_URL = (
-    f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={GEMINI_API_KEY}"
-)
+GEMINI_MODEL = "gemini-2.0-flash"
+SYSTEM_PROMPT = "You are a privacy policy expert. You will answer user's question accurately given the context provided, and you will include the reference text content you used to generate the answer by marking it as 'Reference Used:'."
+CORPUS_SYSTEM_PROMPT = "You are a privacy policy expert. You will answer user's question across the privacy policies of several platforms given the context provided, where each excerpt starts with its platform in brackets. Name the platform behind every point, and include the reference text content you used to generate the answer by marking it as 'Reference Used:'."
 
 BASE_URL = 'https://transparencydb.dev.berkmancenter.org/company/'
 
-# embedding model
-embedder = SentenceTransformer('all-MiniLM-L6-v2')
+DEFAULT_CHUNK_SIZE = 500
+QA_CANDIDATES = 8  # chunks retrieved per question before packing
+QA_CONTEXT_TOKENS = int(os.getenv("QA_CONTEXT_TOKENS", 2500))  # prompt budget for question + context
+INDEX_DIR = os.path.join(CACHE_DIR, "qa_index")
+INDEX_MEMORY_ENTRIES = 64  # loaded indexes kept in memory
 
 def load_policy_link(policy_name):
     """
@@ -81,98 +98,142 @@ def load_policy_link(policy_name):
 
 def load_document(txt_href):
     """
-    Downloads the document using txt_href link.
+    Loads the document using txt_href link, served from the local policy store when cached.
     """
-    response = requests.get(txt_href)
-    if response.status_code != 200:
-        raise Exception(f"Could not load the document from {txt_href}")
+    text = fetch_policy_text(txt_href)
     print("✅ Policy loaded")
-    return response.text
+    return text
 
-def chunk_text(text, max_chunk_size=500):
+def chunk_text(text, max_chunk_size=DEFAULT_CHUNK_SIZE):
     """
-    Splits the text into chunks of approximately max_chunk_size words.
-    Adjust the splitting logic as needed (e.g., by paragraph).
+    Splits the text into chunks of at most max_chunk_size words along headings and paragraphs
+    (see src/common/chunker.py); the layout is cached per policy version.
     """
-    words = text.split()
-    chunks = []
-    for i in range(0, len(words), max_chunk_size):
-        chunk = " ".join(words[i:i+max_chunk_size])
-        chunks.append(chunk)
+    chunks = chunk_texts(text, max_words=max_chunk_size)
     print("✅ Chuncking complete")
     return chunks
 
 def build_index(chunks):
     """
-    Embeds the text chunks and builds a FAISS index for similarity search.
+    Embeds the text chunks and builds a FAISS index for similarity search. A policy has a few hundred
+    chunks at most, where exact (flat) search is as fast as any approximate index; the approximate
+    backends are for the corpus index (CORPUS_INDEX_BACKEND).
     """
-    embeddings = embedder.encode(chunks, convert_to_tensor=False)
-    embeddings = np.array(embeddings).astype("float32")
-    d = embeddings.shape[1]
-    index = faiss.IndexFlatIP(d)
+    embeddings = encode(chunks)
     faiss.normalize_L2(embeddings)
-    index.add(embeddings)
+    index = make_index(embeddings, "flat")
     print("✅ FAISS embedding complete")
     return index, embeddings
 
-def retrieve_relevant_chunks(question, chunks, index, chunk_embeddings, top_k=3):
+def index_key(txt_href, max_chunk_size=DEFAULT_CHUNK_SIZE, model_name=EMBEDDING_MODEL_NAME):
+    """
+    Identifies a persisted index by policy URL, chunker config, embedding model and embedding storage.
+    """
+    config = json.dumps({"url": txt_href, "chunker": {"max_chunk_size": max_chunk_size, "version": CHUNKER_VERSION}, "model": model_name, "storage": EMBEDDING_STORAGE}, sort_keys=True)
+    return hashlib.sha256(config.encode("utf-8")).hexdigest()[:32]
+
+def save_index(key, chunks, index, embeddings):
     """
-    Embeds the question and retrieves the top_k most similar text chunks.
+    Writes chunk texts, normalized embeddings (in EMBEDDING_STORAGE precision) and the FAISS index to INDEX_DIR/<key>/.
     """
-    question_embedding = embedder.encode([question], convert_to_tensor=False)
-    question_embedding = np.array(question_embedding).astype("float32")
+    index_path = os.path.join(INDEX_DIR, key)
+    tmp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    os.makedirs(tmp_path, exist_ok=True)
+    with open(os.path.join(tmp_path, "chunks.json"), "w", encoding="utf-8") as f:
+        json.dump(chunks, f)
+    QuantizedEmbeddings.from_float32(embeddings).save(tmp_path)
+    faiss.write_index(index, os.path.join(tmp_path, "index.faiss"))
+    if os.path.exists(index_path):
+        shutil.rmtree(tmp_path)
+    else:
+        os.replace(tmp_path, index_path)
+
+_loaded_indexes = OrderedDict()
+_loaded_indexes_lock = threading.Lock()
+
+def load_index(key):
+    """
+    Memory-maps a persisted index. Returns (chunks, index, embeddings) or None if it was never built.
+    Loaded indexes stay in a small LRU; a missing index is not remembered, so one built later
+    (e.g. by `python -m src.qa.build_index` in another process) is picked up on the next call.
+    """
+    with _loaded_indexes_lock:
+        if key in _loaded_indexes:
+            _loaded_indexes.move_to_end(key)
+            return _loaded_indexes[key]
+    index_path = os.path.join(INDEX_DIR, key)
+    if not os.path.exists(os.path.join(index_path, "index.faiss")):
+        return None
+    with open(os.path.join(index_path, "chunks.json"), "r", encoding="utf-8") as f:
+        chunks = json.load(f)
+    embeddings = QuantizedEmbeddings.load(index_path)
+    index = faiss.read_index(os.path.join(index_path, "index.faiss"), faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_READ_ONLY", 0))
+    loaded = (chunks, index, embeddings)
+    with _loaded_indexes_lock:
+        _loaded_indexes[key] = loaded
+        while len(_loaded_indexes) > INDEX_MEMORY_ENTRIES:
+            _loaded_indexes.popitem(last=False)
+    return loaded
+
+def load_or_build_index(txt_href, max_chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Returns (chunks, index, embeddings) for a policy, building and persisting the index on first use.
+    Normally the index is prebuilt offline with `python -m src.qa.build_index`.
+    """
+    key = index_key(txt_href, max_chunk_size)
+    loaded = load_index(key)
+    if loaded is not None:
+        print("✅ Loaded prebuilt index")
+        return loaded
+    chunks = chunk_text(load_document(txt_href), max_chunk_size)
+    index, embeddings = build_index(chunks)
+    save_index(key, chunks, index, embeddings)
+    return load_index(key)
+
+def retrieve_relevant_chunks(question, chunks, index, chunk_embeddings, top_k=QA_CANDIDATES):
+    """
+    Embeds the question and retrieves the top_k most relevant text chunks, best first.
+    Uses the FAISS index when RETRIEVAL_MODE is "dense", otherwise hybrid BM25 + dense scoring;
+    with a reranker enabled, a wider candidate set is retrieved and reranked down to top_k.
+    """
+    question_embedding = encode([question])
     faiss.normalize_L2(question_embedding)
-    D, I = index.search(question_embedding, top_k)
-    retrieved = [chunks[i] for i in I[0]]
+    candidates = candidate_count(top_k)
+    if RETRIEVAL_MODE == "dense":
+        D, I = index.search(question_embedding, min(candidates, index.ntotal))
+        retrieved = [chunks[i] for i in I[0] if i >= 0]
+    else:
+        hits = HybridRetriever(chunks, chunk_embeddings).search([question], candidates, query_embeddings=question_embedding)[0]
+        retrieved = [chunks[hit["index"]] for hit in hits]
+    retrieved = rerank_texts(question, retrieved, top_k)
     print("✅ Reterieved context")
     return retrieved
 
+def build_answer_prompt(question, context_chunks, budget=QA_CONTEXT_TOKENS):
+    """
+    Packs the retrieved chunks, in relevance order and without overlapping text, into what is
+    left of the token budget after the system prompt and the question.
+    """
+    remaining = budget - estimate_tokens(SYSTEM_PROMPT) - estimate_tokens(question)
+    context = " ".join(pack_context(context_chunks, max(remaining, 0), separator=" ", keep_order=False)["chunks"])
+    return f"question: {question} context: {context}"
+
 def generate_answer(question, context_chunks):
     """
-    Generates an answer by calling the Gemini API using the gemini-2.0-flash-lite model.
-    The API is called via a REST POST request with a payload that mirrors the provided curl example.
+    Generates an answer with the gemini-2.0-flash model through the shared LLM client.
     """
-    context = " ".join(context_chunks)
-    input_text = f"question: {question} context: {context}"
-    
-    # Construct payload per the Gemini API documentation.
-    payload = {
-        "system_instruction": {
-            "parts": [
-                {
-                "text": "You are a privacy policy expert. You will answer user's question accurately given the context provided, and you will include the reference text content you used to generate the answer by marking it as 'Reference Used:'."
-                }
-            ]
-        },
-        "contents": [
-            {
-                "parts": [
-                    {
-                        "text": input_text
-                    }
-                ]
-            }
-        ]
-    }
-    
-    headers = {
-        "Content-Type": "application/json"
-    }
-    
-    response = requests.post(GEMINI_API_URL, headers=headers, json=payload)
-    if response.status_code != 200:
-        raise Exception(f"Gemini API call failed with status code {response.status_code}: {response.text}")
-    
-    result = response.json()
-    # print("🐛 Debug Gemini API response:", result)
-    
-    candidate = result.get("candidates", [{}])[0]
-    answer = candidate.get("content", {}).get("parts", [{}])[0].get("text")
-    
+    answer = get_llm_client(GEMINI_MODEL).generate(build_answer_prompt(question, context_chunks), system=SYSTEM_PROMPT)
     if not answer:
         raise Exception("No answer found in the Gemini API response.")
     return answer
 
+def generate_answer_stream(question, context_chunks):
+    """
+    Streaming version of generate_answer: yields answer text pieces as Gemini produces them.
+    Time-to-first-token is recorded as `ttft.qa`.
+    """
+    yield from get_llm_client(GEMINI_MODEL).stream(build_answer_prompt(question, context_chunks), system=SYSTEM_PROMPT, metric="ttft.qa")
+
 # def extract_reference_snippet(answer_text):
 #     """
 #     Extracts the reference snippet from the LLM's answer based on a "Reference Used:" marker.
@@ -203,14 +264,88 @@ def generate_answer(question, context_chunks):
 #     highlight_link = f"{base_url}#:~:text={encoded_snippet}"
 #     return highlight_link
 
-def main(company_name, user_question):
+def answer_cache_version(txt_href):
+    # Cached answers are only valid for one policy text, question-embedding model and LLM backend.
+    policy_hash = get_policy_store().version(txt_href)
+    return backend_version(f"{policy_hash}:{EMBEDDING_MODEL_NAME}") if policy_hash else None
+
+def stream_answer(company_name, user_question, use_cache=ANSWER_CACHE_ENABLED):
+    """
+    Yields ("answer", text) events as the answer is generated, then one final
+    ("result", {"answer", "txt_href", "sources", "cached"}) event.
+
+    Near-identical earlier questions about the same policy version are answered from the
+    semantic answer cache without retrieval or a Gemini call.
+    """
     txt_href = load_policy_link(company_name)
-    document = load_document(txt_href)
-    chunks = chunk_text(document)
-    index, chunk_embeddings = build_index(chunks)
+    question_embedding = encode([user_question], normalize=True)[0]
+    cache = get_answer_cache()
+    version = answer_cache_version(txt_href)
+    if use_cache and version:
+        hit = cache.lookup(company_name, version, question_embedding)
+        if hit:
+            print(f"✅ Answer served from cache (similar question: {hit['question']!r}, {hit['similarity']:.3f})")
+            yield "answer", hit["answer"]
+            yield "result", {"answer": hit["answer"], "txt_href": txt_href, "sources": hit["sources"], "cached": True}
+            return
+
+    chunks, index, chunk_embeddings = load_or_build_index(txt_href)
     relevant_chunks = retrieve_relevant_chunks(user_question, chunks, index, chunk_embeddings)
-    answer = generate_answer(user_question, relevant_chunks)
-    return answer, txt_href
+    pieces = []
+    for piece in generate_answer_stream(user_question, relevant_chunks):
+        pieces.append(piece)
+        yield "answer", piece
+    answer = "".join(pieces)
+    version = version or answer_cache_version(txt_href)
+    if use_cache and answer and version:
+        cache.put(company_name, version, user_question, question_embedding, answer, relevant_chunks)
+    yield "result", {"answer": answer, "txt_href": txt_href, "sources": relevant_chunks, "cached": False}
+
+def retrieve_corpus_chunks(question, platforms=None, top_k=QA_CANDIDATES):
+    """
+    Retrieves chunks for the question from the corpus index: the best top_k across every platform, or,
+    for named platforms, the best of each platform so every one of them is represented. Best first.
+    """
+    corpus = get_corpus_index()
+    question_embedding = encode([question], normalize=True)
+    try:
+        if platforms:
+            per_platform = corpus.search_per_platform(question_embedding, platforms, max(1, top_k // len(platforms)), [question])[0]
+            hits = sorted((hit for hits in per_platform.values() for hit in hits), key=lambda hit: -hit["score"])
+        else:
+            hits = corpus.search(question_embedding, None, top_k, [question])[0]
+    except KeyError as e:
+        raise FileNotFoundError(e.args[0])
+    print("✅ Reterieved context across platforms")
+    return hits
+
+def build_corpus_answer_prompt(question, hits, budget=QA_CONTEXT_TOKENS):
+    remaining = budget - estimate_tokens(CORPUS_SYSTEM_PROMPT) - estimate_tokens(question)
+    excerpts = [f"[{hit['platform']}] {hit['text']}" for hit in hits]
+    context = "\n".join(pack_context(excerpts, max(remaining, 0), separator="\n", keep_order=False)["chunks"])
+    return f"question: {question} context: {context}"
+
+def stream_corpus_answer(user_question, platforms=None):
+    """
+    Answers a question across several platforms (every platform in the corpus index if None) from one
+    search of the corpus index. Yields ("answer", text) events, then one final
+    ("result", {"answer", "sources"}) event; each source has its platform, section and character offsets.
+    """
+    hits = retrieve_corpus_chunks(user_question, platforms)
+    pieces = []
+    prompt = build_corpus_answer_prompt(user_question, hits)
+    for piece in get_llm_client(GEMINI_MODEL).stream(prompt, system=CORPUS_SYSTEM_PROMPT, metric="ttft.qa"):
+        pieces.append(piece)
+        yield "answer", piece
+    sources = [{key: hit[key] for key in ("platform", "section", "start", "end", "text", "score")} for hit in hits]
+    yield "result", {"answer": "".join(pieces), "sources": sources}
+
+def main(company_name, user_question):
+    for kind, payload in stream_answer(company_name, user_question):
+        if kind == "result":
+            if not payload["answer"]:
+                raise Exception("No answer found in the Gemini API response.")
+            return payload["answer"], payload["txt_href"]
 
     # reference_snippet = extract_reference_snippet(answer)
     # if reference_snippet:
@@ -0,0 +1,98 @@
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from src.common.llm_cache import set_refresh
+from src.common.paths import PRIVACY_DB_CSV
+from src.common.policy_fetcher import fetch_policies
+from src.common.policy_store import get_policy_store
+from src.common.rate_limit import RateLimiter
+from src.summary.summary import summarize_policy_for_platform, set_rate_limiter
+from src.summary.summary_store import get_summary_store
+
+def is_rate_limited(error):
+    if getattr(error, "status_code", None) == 429:
+        return True
+    text = str(error)
+    return "429" in text or "ResourceExhausted" in type(error).__name__ or "quota" in text.lower()
+
+def summarize_with_backoff(platform, limiter, csv_path=None, force=False, retries=4, backoff=10.0):
+    """
+    Summarizes one platform, backing off (and throttling every other worker) when Gemini rate-limits us.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return summarize_policy_for_platform(platform, csv_path=csv_path, use_store=not force)
+        except Exception as e:
+            if not is_rate_limited(e) or attempt == retries:
+                raise
+            delay = backoff * (2 ** attempt)
+            print(f"⚠️ Rate limited on {platform}, backing off {delay:.0f}s")
+            limiter.penalize(delay)
+            time.sleep(delay)
+
+def batch_summarize(csv_path=PRIVACY_DB_CSV, workers=4, requests_per_minute=15, force=False, platforms=None):
+    """
+    Summarizes every platform in privacy_db.csv into the summary store.
+
+    Each platform is stored as soon as it finishes, so an interrupted run resumes where it stopped,
+    and platforms whose policy hash already has a stored summary are skipped unless `force` is set;
+    `force` also bypasses the LLM response cache, so every summary is regenerated by Gemini.
+    Returns a report dict with `done`, `skipped` and `failures` ({platform: error}).
+    """
+    df = pd.read_csv(csv_path)
+    if platforms:
+        wanted = {p.lower() for p in platforms}
+        df = df[df["Platform"].str.lower().isin(wanted)]
+
+    fetched = fetch_policies(df["Privacy Policy Txt"].tolist())
+    policy_store, summary_store = get_policy_store(), get_summary_store()
+    report = {"done": [], "skipped": [], "failures": {}}
+
+    todo = []
+    for _, row in df.iterrows():
+        platform, url = row["Platform"], row["Privacy Policy Txt"]
+        if url not in fetched["results"]:
+            report["failures"][platform] = fetched["failures"].get(url, "policy not fetched")
+        elif not force and summary_store.get(platform, policy_store.version(url)):
+            report["skipped"].append(platform)
+        else:
+            todo.append(platform)
+    print(f"✅ {len(todo)} platforms to summarize, {len(report['skipped'])} unchanged")
+
+    limiter = RateLimiter(requests_per_minute)
+    set_rate_limiter(limiter)
+    set_refresh(force)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(summarize_with_backoff, platform, limiter, csv_path, force): platform for platform in todo}
+            for future in as_completed(futures):
+                platform = futures[future]
+                try:
+                    summary, _, _ = future.result()
+                    if not summary:
+                        raise ValueError("empty summary")
+                    report["done"].append(platform)
+                    print(f"✅ Summarized {platform} ({len(report['done'])}/{len(todo)})")
+                except Exception as e:
+                    report["failures"][platform] = str(e)
+                    print(f"⚠️ Failed to summarize {platform}: {str(e)}")
+    finally:
+        set_rate_limiter(None)
+        set_refresh(False)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute summaries for every platform in privacy_db.csv.")
+    parser.add_argument("--platform", action="append", help="Only summarize the given platform (repeatable)")
+    parser.add_argument("--workers", type=int, default=4, help="Number of platforms summarized concurrently")
+    parser.add_argument("--rpm", type=int, default=15, help="Maximum Gemini requests per minute")
+    parser.add_argument("--force", action="store_true", help="Regenerate even if the policy has not changed")
+    args = parser.parse_args()
+
+    report = batch_summarize(workers=args.workers, requests_per_minute=args.rpm, force=args.force, platforms=args.platform)
+    print(f"\nDone: {len(report['done'])}, unchanged: {len(report['skipped'])}, failed: {len(report['failures'])}")
+    for platform, error in report["failures"].items():
+        print(f"  {platform}: {error}")
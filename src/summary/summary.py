@@ -1,24 +1,40 @@
 import os
 import argparse
 import pandas as pd
-import requests
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-import google.generativeai as genai
+from sklearn.preprocessing import normalize
 import re 
 import html
+import time
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from src.common.chunker import chunk_texts
+from src.common.context_packer import estimate_tokens, pack_context
+from src.common.embeddings import get_embedding_service
+from src.common.hybrid_retriever import HybridRetriever
+from src.common.llm_client import get_llm_client, remaining_seconds
+from src.common.metrics import metrics
+from src.common.reranker import candidate_count, rerank_texts
+from src.common.policy_store import fetch_policy_text, get_policy_store
+from src.common.quote_verifier import verify_quotes
+from src.common.singleflight import get_single_flight
+from src.summary.summary_store import get_summary_store
 
 # ==== Step 1: Configure Gemini ====
-API_KEY = os.getenv("GEMINI_API_KEY")
-if not API_KEY:
-    raise EnvironmentError("GEMINI_API_KEY environment variable not set.")
-
-genai.configure(api_key=API_KEY)
-model = genai.GenerativeModel("gemini-2.0-flash")
+# Calls go through the shared LLM client; GEMINI_API_KEY is checked on the first request.
+MODEL_NAME = "gemini-2.0-flash"
 
 # ==== Step 2: Constants ====
-TOKEN_LIMIT = 50000  # conservative threshold for Gemini input
+TOKEN_LIMIT = int(os.getenv("SUMMARY_TOKEN_LIMIT", 50000))  # prompt budget for whole-document summarization
+SECTION_CONTEXT_TOKENS = int(os.getenv("SUMMARY_SECTION_CONTEXT_TOKENS", 3000))  # context budget per RAG section
+RAG_CANDIDATES = 12  # chunks retrieved per RAG section before packing
+RAG_CONCURRENCY = int(os.getenv("SUMMARY_RAG_CONCURRENCY", 4))  # parallel Gemini calls in the RAG fallback
+RAG_SECTION_TIMEOUT = float(os.getenv("SUMMARY_RAG_SECTION_TIMEOUT", 90))  # seconds per section, from its submission
+REFERENCES_MODE = os.getenv("SUMMARY_REFERENCES", "pipelined")  # "full", "pipelined" or "local"
+REFERENCE_CONTEXT_TOKENS = int(os.getenv("SUMMARY_REFERENCE_CONTEXT_TOKENS", 1200))  # excerpts per pipelined references call
+LOCAL_QUOTES_PER_POINT = 2
+LOCAL_QUOTE_MIN_SIMILARITY = float(os.getenv("SUMMARY_LOCAL_QUOTE_MIN_SIMILARITY", 0.3))
 
 QUESTIONS = {
     "a. Type of data collected": "What types of data are collected?",
@@ -38,45 +54,76 @@ QUESTIONS = {
     )
 }
 
+# Keyword queries for the BM25 half of hybrid retrieval; the long questions above would also match
+# the topics they tell the model to exclude.
+SECTION_KEYWORDS = {
+    "a. Type of data collected": "personal information data collect name email address device location contacts biometric",
+    "b. Purpose of data collection": "purpose use information provide improve personalize advertising analytics legitimate interests",
+    "c. Data sharing and disclosure": "share disclose third parties partners service providers affiliates sell data brokers advertisers law enforcement",
+    "d. User rights and choices": "rights access delete correct opt out portability consent withdraw GDPR CCPA request",
+    "e. Data storage and security": "retain retention store security protect encryption safeguards breach servers",
+    "f. Use of cookies and tracking technologies": "cookies tracking pixels web beacons SDK identifiers analytics advertising",
+    "g. Other important information": "children COPPA minors international transfer changes updates policy third-party links contact",
+}
+
 # ==== Step 3: Utilities ====
+def set_rate_limiter(limiter):
+    """
+    Applies a RateLimiter to uncached Gemini calls; used by the batch precomputation CLI.
+    """
+    get_llm_client(MODEL_NAME).rate_limiter = limiter
+
+def generate(prompt, deadline=None):
+    """
+    Calls Gemini through the shared client; identical prompts are served from the response cache.
+    Past `deadline` (a time.monotonic() value) the call gives up with an LLMError.
+    """
+    return get_llm_client(MODEL_NAME).generate(prompt, deadline=deadline)
+
+def generate_stream(prompt):
+    """
+    Streaming counterpart of generate: yields response text pieces as they arrive.
+    """
+    return get_llm_client(MODEL_NAME).stream(prompt)
+
 def fetch_text_from_url(url):
-    response = requests.get(url)
-    response.raise_for_status()
-    return response.text
+    return fetch_policy_text(url)
 
 def estimate_token_count(text):
-    return len(text) // 4  # approx. 1 token = 4 characters
+    return estimate_tokens(text)
 
 def chunk_text_by_paragraph(text, max_chars=1000, min_words=4):
-    raw_paragraphs = [p.strip() for p in text.split("\n\n")]
-    paragraphs = [p for p in raw_paragraphs if len(p.split()) >= min_words]
-    chunks, current_chunk = [], ""
-    for para in paragraphs:
-        if len(current_chunk) + len(para) + 2 < max_chars:
-            current_chunk += para.strip() + "\n"
-        else:
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-            current_chunk = para + "\n"
-    if current_chunk:
-        chunks.append(current_chunk.strip())
-    return chunks
-
-def embed_chunks(chunks, model):
-    return model.encode(chunks, convert_to_tensor=True)
-
-def retrieve_relevant_chunks(chunks, chunk_embeddings, question, model, top_k=8, similarity_threshold=0.01):
-    question_embedding = model.encode(question, convert_to_tensor=True)
-    similarities = cosine_similarity(
-        question_embedding.cpu().numpy().reshape(1, -1),
-        chunk_embeddings.cpu().numpy()
-    ).flatten()
-    top_indices = similarities.argsort()[::-1][:top_k]
-    return [chunks[i] for i in top_indices if similarities[i] > similarity_threshold]
+    # Paragraph-aligned chunks from the shared chunker; max_chars is converted at ~6 characters per word.
+    return chunk_texts(text, max_words=max(max_chars // 6, min_words), min_words=min_words)
+
+def embed_chunks(chunks, model=None):
+    model = model or get_embedding_service()
+    return model.encode(chunks)
+
+def retrieve_relevant_chunks(chunks, chunk_embeddings, question, model=None, top_k=8, similarity_threshold=0.01, keywords=None):
+    return retrieve_relevant_chunks_batch(
+        chunks, chunk_embeddings, [question], model, top_k, similarity_threshold, [keywords] if keywords else None
+    )[0]
+
+def retrieve_relevant_chunks_batch(chunks, chunk_embeddings, questions, model=None, top_k=8, similarity_threshold=0.01, keywords=None):
+    """
+    Same as retrieve_relevant_chunks for several questions, with one encode call and one hybrid
+    (cosine + BM25 on `keywords`, or the questions) score matrix. Chunks whose cosine similarity
+    is not above `similarity_threshold` are dropped; with a reranker enabled, a wider candidate set
+    is reranked down to top_k per question.
+    """
+    model = model or get_embedding_service()
+    question_embeddings = normalize(model.encode(list(questions)))
+    retriever = HybridRetriever(chunks, normalize(np.asarray(chunk_embeddings)))
+    hits = retriever.search(questions, candidate_count(top_k), question_embeddings, keywords)
+    return [
+        rerank_texts(question, [chunks[hit["index"]] for hit in row if hit["dense"] is None or hit["dense"] > similarity_threshold], top_k)
+        for question, row in zip(questions, hits)
+    ]
 
 # ==== Step 4: Direct full-document summarization ====
 
-def generate_summary_only(policy_text, company=None):
+def build_summary_prompt(policy_text, company=None):
     company_note = f"The privacy policy belongs to {company}." if company else ""
     prompt = f"""
 You are a legal assistant AI. {company_note} Please do not state other words except for the summary. 
@@ -123,8 +170,10 @@ Please return only the summary and no other words, using exactly the labels and
 If the information for any section is missing or not mentioned, say "Missing" for that section and don't need to say anything else.
 
 """
-    response = model.generate_content(prompt)
-    return response.text.strip()
+    return prompt
+
+def generate_summary_only(policy_text, company=None):
+    return generate(build_summary_prompt(policy_text, company)).strip()
 
 def generate_references_only(policy_text, summary_text):
     prompt = f"""
@@ -175,31 +224,191 @@ Reference quote from the original privacy policy text:
         Reference 2: "..."
         ...
 """
-    response = model.generate_content(prompt)
-    return response.text.strip()
+    return generate(prompt).strip()
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[\"“(A-Z0-9])")
+
+def split_sentences(text, min_words=4):
+    """
+    Sentences of a chunk, used as quote candidates; fragments under min_words are dropped.
+    """
+    return [s.strip() for s in SENTENCE_BOUNDARY.split(text) if len(s.split()) >= min_words]
+
+SECTION_HEADER = re.compile(r"^\s*([a-g])\.\s", re.MULTILINE)
+SECTION_LABELS = {label[0]: label for label in QUESTIONS}
+
+def split_summary_sections(summary_text):
+    """
+    Returns [(letter, section text)] for the a-g sections of a structured summary, in order.
+    """
+    headers = list(SECTION_HEADER.finditer(summary_text))
+    return [
+        (match.group(1), summary_text[match.start():headers[i + 1].start() if i + 1 < len(headers) else len(summary_text)].strip())
+        for i, match in enumerate(headers)
+    ]
+
+def summary_points(section_text):
+    """
+    The numbered points of one summary section, without the header line and numbering.
+    """
+    points = []
+    for line in section_text.splitlines()[1:]:
+        point = re.sub(r"^\s*(\d+[:.)]|[-*•])\s*", "", line).strip()
+        if point and point != "...":
+            points.append(point)
+    return points
+
+def build_section_references_prompt(label, section_text, excerpts):
+    combined_context = "\n\n".join(excerpts)
+    return f"""
+You are a legal assistant AI. Given one section of a privacy policy summary, return the direct quotes from the policy excerpts below that support each of its points.
+If no relevant quote can be found for a point, say "Missing." DO NOT fabricate quotes.
+
+Summary section:
+\"\"\"
+{section_text}
+\"\"\"
 
-def summarize_entire_document(policy_text, company=None, original_url=None):
-    summary = generate_summary_only(policy_text, company=company)
-    references = generate_references_only(policy_text, summary_text=summary)
-    return summary, references, original_url
+Policy excerpts:
+\"\"\"
+{combined_context}
+\"\"\"
 
+Output only the references in this format:
+{label}:
+    Reference 1: "..."
+    Reference 2: "..."
+    ...
+"""
 
+class SectionReferences:
+    """
+    Finds the supporting quotes for each a-g summary section as soon as that section is complete,
+    while the rest of the summary is still streaming.
+
+    The policy is chunked and embedded in the background when the summary starts. In "pipelined"
+    mode each finished section gets one small Gemini call over the chunks retrieved for it (packed
+    into REFERENCE_CONTEXT_TOKENS); in "local" mode every summary point is matched to its closest
+    policy sentences by hybrid retrieval and those are quoted verbatim, without any Gemini call.
+    Each section gets `section_timeout` seconds from its submission; its Gemini call gives up at that
+    deadline too. Sections whose references failed or timed out are listed in `failed` after result().
+    """
+
+    def __init__(self, policy_text, mode=REFERENCES_MODE, max_concurrency=RAG_CONCURRENCY, section_timeout=RAG_SECTION_TIMEOUT):
+        self.mode = mode
+        self.section_timeout = section_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency))
+        self._index = self._executor.submit(self._build_index, policy_text)
+        self._futures = {}
+        self._deadlines = {}
+        self.failed = []
+
+    def _build_index(self, policy_text):
+        if self.mode == "local":
+            passages = [sentence for chunk in chunk_text_by_paragraph(policy_text) for sentence in split_sentences(chunk)]
+        else:
+            passages = chunk_text_by_paragraph(policy_text)
+        return passages, embed_chunks(passages)
+
+    def submit(self, letter, section_text):
+        if letter in SECTION_LABELS and letter not in self._futures:
+            deadline = self._deadlines[letter] = time.monotonic() + self.section_timeout
+            self._futures[letter] = self._executor.submit(self._references_for, SECTION_LABELS[letter], section_text, deadline)
+
+    def submit_completed(self, summary_text, final=False):
+        """
+        Submits every section of `summary_text` that is complete: all but the last one while the
+        summary is still streaming, all of them once it is `final`.
+        """
+        sections = split_summary_sections(summary_text)
+        for letter, section_text in sections if final else sections[:-1]:
+            self.submit(letter, section_text)
+
+    def _references_for(self, label, section_text, deadline=None):
+        passages, embeddings = self._index.result(timeout=remaining_seconds(deadline))
+        points = summary_points(section_text)
+        if not passages or not points:
+            return f"{label}:\n    Missing."
+        if self.mode == "local":
+            matches = retrieve_relevant_chunks_batch(
+                passages, embeddings, points, top_k=LOCAL_QUOTES_PER_POINT, similarity_threshold=LOCAL_QUOTE_MIN_SIMILARITY
+            )
+            quotes = list(dict.fromkeys(" ".join(quote.split()) for row in matches for quote in row))
+            lines = [f'    Reference {i + 1}: "{quote}"' for i, quote in enumerate(quotes)] or ["    Missing."]
+            return f"{label}:\n" + "\n".join(lines)
+        candidates = retrieve_relevant_chunks(passages, embeddings, section_text, top_k=RAG_CANDIDATES)
+        excerpts = pack_context(candidates, REFERENCE_CONTEXT_TOKENS, keep_order=False)["chunks"]
+        reference = generate(build_section_references_prompt(label, section_text, excerpts), deadline).strip()
+        # Keep the section header that format_reference_quotes groups quotes under.
+        return reference if reference.lower().startswith(label.lower()) else f"{label}:\n{reference}"
+
+    def result(self):
+        """
+        Waits for all submitted sections, each until its deadline, and returns the references in a-g order.
+        """
+        references = []
+        try:
+            for letter, label in SECTION_LABELS.items():
+                future = self._futures.get(letter)
+                if future is None:
+                    references.append(f"{label}:\n    Missing.")
+                    continue
+                try:
+                    references.append(future.result(timeout=remaining_seconds(self._deadlines[letter])))
+                except Exception as e:
+                    print(f"⚠️ References for '{label}' failed: {str(e) or type(e).__name__}")
+                    self.failed.append(label)
+                    references.append(f"{label}:\n    Missing.")
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        return "\n\n".join(references)
+
+def iter_summary_with_references(policy_text, company=None, mode=REFERENCES_MODE):
+    """
+    Streams a whole-document summary as ("summary", text) events, then yields ("stage", "references")
+    and ("references", text), preceded by ("degraded", [section labels]) if some sections' references
+    failed and were replaced by "Missing.".
+
+    "full" sends the whole policy a second time for the references after the summary is done;
+    "pipelined" and "local" find each section's references while later sections are still being
+    generated (see SectionReferences), so only the last section's references are left to wait for.
+    """
+    pieces = []
+    references = SectionReferences(policy_text, mode) if mode != "full" else None
+    for piece in generate_stream(build_summary_prompt(policy_text, company)):
+        pieces.append(piece)
+        if references is not None and "\n" in piece:
+            references.submit_completed("".join(pieces))
+        yield "summary", piece
+    summary = "".join(pieces).strip()
+
+    yield "stage", "references"
+    start = time.perf_counter()
+    if references is None:
+        reference = generate_references_only(policy_text, summary_text=summary)
+    else:
+        references.submit_completed(summary, final=True)
+        reference = references.result()
+        if references.failed:
+            yield "degraded", references.failed
+    metrics.record("summary.references_wait", time.perf_counter() - start)
+    yield "references", reference
+
+def summarize_entire_document(policy_text, company=None, original_url=None, mode=REFERENCES_MODE):
+    pieces, references = [], None
+    for kind, payload in iter_summary_with_references(policy_text, company, mode):
+        if kind == "summary":
+            pieces.append(payload)
+        elif kind == "references":
+            references = payload
+    return "".join(pieces).strip(), references, original_url
 
-# ==== Step 5: RAG-based fallback ====
-def rag_summarize_with_similarity(policy_chunks, company, original_url):
-    final_summary, references = [], []
-    embedder = SentenceTransformer("all-MiniLM-L6-v2")
-    chunk_embeddings = embed_chunks(policy_chunks, embedder)
 
-    for label, question in QUESTIONS.items():
-        relevant_chunks = retrieve_relevant_chunks(policy_chunks, chunk_embeddings, question, embedder)
-        if not relevant_chunks:
-            final_summary.append(f"{label}\nNot mentioned.")
-            references.append(f"References for {label}:\nNone found.")
-            continue
 
-        combined_context = "\n\n".join(relevant_chunks)
-        prompt = f"""
+# ==== Step 5: RAG-based fallback ====
+def summarize_section(company, question, relevant_chunks, deadline=None):
+    combined_context = "\n\n".join(relevant_chunks)
+    prompt = f"""
 You are a legal assistant AI summarizing a privacy policy for {company}.
 Answer the following summarization question **only based on the provided text below**. 
 If the answer is not directly mentioned, say "Not mentioned."
@@ -213,14 +422,61 @@ Text:
 
 Provide a concise answer grounded in the original text.
 """
-        response = model.generate_content(prompt)
-        final_summary.append(f"{label}\n{response.text.strip()}")
-        references.append(f"References for {label}:\n" + "\n---\n".join(relevant_chunks))
-
+    return generate(prompt, deadline).strip()
+
+def iter_rag_sections(policy_chunks, company, max_concurrency=RAG_CONCURRENCY, section_timeout=RAG_SECTION_TIMEOUT):
+    """
+    Yields (summary section, reference section, generated) in QUESTIONS order as each one completes.
+
+    All questions are embedded in one call, each section's context is packed into
+    SECTION_CONTEXT_TOKENS, and the per-section Gemini calls run concurrently;
+    a section that fails or is not done `section_timeout` seconds after it was submitted falls back
+    to a note (with generated=False) while its retrieved references are still returned. The Gemini
+    call gives up at the same deadline, so a timed-out section does not keep a concurrency slot.
+    """
+    embedder = get_embedding_service()
+    chunk_embeddings = embed_chunks(policy_chunks, embedder)
+    labels = list(QUESTIONS)
+    candidates = retrieve_relevant_chunks_batch(
+        policy_chunks, chunk_embeddings, [QUESTIONS[label] for label in labels], embedder, top_k=RAG_CANDIDATES,
+        keywords=[SECTION_KEYWORDS[label] for label in labels],
+    )
+    relevant = [pack_context(chunks, SECTION_CONTEXT_TOKENS, keep_order=False)["chunks"] for chunks in candidates]
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency))
+    deadline = time.monotonic() + section_timeout
+    futures = [
+        executor.submit(summarize_section, company, QUESTIONS[label], chunks, deadline) if chunks else None
+        for label, chunks in zip(labels, relevant)
+    ]
+    try:
+        for label, relevant_chunks, future in zip(labels, relevant, futures):
+            if future is None:
+                yield f"{label}\nNot mentioned.", f"References for {label}:\nNone found.", True
+                continue
+            generated = False
+            try:
+                answer = future.result(timeout=remaining_seconds(deadline))
+                generated = True
+            except FutureTimeoutError:
+                print(f"⚠️ Section '{label}' timed out after {section_timeout}s")
+                answer = "Could not be generated in time. Please see the references below."
+            except Exception as e:
+                print(f"⚠️ Section '{label}' failed: {str(e)}")
+                answer = "Could not be generated. Please see the references below."
+            yield f"{label}\n{answer}", f"References for {label}:\n" + "\n---\n".join(relevant_chunks), generated
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def rag_summarize_with_similarity(policy_chunks, company, original_url, max_concurrency=RAG_CONCURRENCY, section_timeout=RAG_SECTION_TIMEOUT):
+    final_summary, references = [], []
+    for summary_section, reference_section, _ in iter_rag_sections(policy_chunks, company, max_concurrency, section_timeout):
+        final_summary.append(summary_section)
+        references.append(reference_section)
     return "\n\n".join(final_summary), "\n\n".join(references), original_url
 
 # ==== Step 6: Main control logic ====
-def summarize_policy_for_platform(platform_name, csv_path=None):
+def find_platform_row(platform_name, csv_path=None):
     if csv_path is None:
         # Try to determine the correct path
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -238,19 +494,116 @@ def summarize_policy_for_platform(platform_name, csv_path=None):
     match = df[df["Platform"].str.lower() == platform_name.lower()]
     if match.empty:
         print(f"Platform '{platform_name}' not found in {csv_path}.")
-        return None, None, None
-
-    txt_url = match.iloc[0]["Privacy Policy Txt"]
-    original_url = match.iloc[0]["Privacy Policy URL"]
-    company = match.iloc[0]["Platform"]
-    policy_text = fetch_text_from_url(txt_url)
-
-    if estimate_token_count(policy_text) < TOKEN_LIMIT:
-        summary, reference, original_url = summarize_entire_document(policy_text, company, original_url)
-        return summary, reference, original_url
+        return None
+    return match.iloc[0]
+
+def stream_policy_summary(platform_name, csv_path=None, use_store=True):
+    """
+    Yields ("summary", text) events as the summary is generated, then one final
+    ("result", (summary, references, original_url)) event. ("stage", name) events mark the
+    pipeline stages in SUMMARY_STAGES as they start. Time to the first summary text is
+    recorded as `ttft.summary`.
+
+    Concurrent requests for the same platform and policy version share one generation.
+    """
+    row = find_platform_row(platform_name, csv_path)
+    if row is None:
+        return (event for event in [("result", (None, None, None))])  # a generator, so callers can close() it
+    key = (row["Platform"].lower(), get_policy_store().version(row["Privacy Policy Txt"]), use_store)
+    return get_single_flight("summary").stream(key, lambda: produce_policy_summary(row, use_store))
+
+def produce_policy_summary(row, use_store=True):
+    start = time.perf_counter()
+    txt_url = row["Privacy Policy Txt"]
+    original_url = row["Privacy Policy URL"]
+    company = row["Platform"]
+    yield "stage", "fetch"
+    policy_text, policy_hash = get_policy_store().get_with_version(txt_url)
+
+    summary_store = get_summary_store()
+    if use_store:
+        stored = summary_store.get(company, policy_hash)
+        if stored:
+            print(f"✅ Serving stored summary for {company}")
+            metrics.record("ttft.summary", time.perf_counter() - start)
+            yield "summary", stored["summary"]
+            yield "result", (stored["summary"], stored["refs"], stored["source_url"])
+            return
+
+    # Sections that fell back to a placeholder; such a summary is returned but not stored.
+    pieces, degraded = [], []
+    summary_prompt = build_summary_prompt(policy_text, company)
+    if estimate_token_count(summary_prompt) < TOKEN_LIMIT:
+        yield "stage", "summarize"
+        for kind, payload in iter_summary_with_references(policy_text, company):
+            if kind == "summary":
+                if not pieces:
+                    metrics.record("ttft.summary", time.perf_counter() - start)
+                pieces.append(payload)
+                yield "summary", payload
+            elif kind == "stage":
+                yield kind, payload
+            elif kind == "degraded":
+                degraded.extend(payload)
+            else:
+                reference = payload
+        summary = "".join(pieces).strip()
     else:
+        yield "stage", "chunk"
         chunks = chunk_text_by_paragraph(policy_text)
-        return rag_summarize_with_similarity(chunks, company, original_url)
+        references = []
+        yield "stage", "embed"
+        for summary_section, reference_section, generated in iter_rag_sections(chunks, company):
+            if not generated:
+                degraded.append(summary_section.splitlines()[0])
+            if not pieces:
+                metrics.record("ttft.summary", time.perf_counter() - start)
+                yield "stage", "summarize"
+            piece = summary_section if not pieces else "\n\n" + summary_section
+            pieces.append(piece)
+            references.append(reference_section)
+            yield "summary", piece
+        summary = "".join(pieces)
+        reference = "\n\n".join(references)
+
+    if summary and degraded:
+        print(f"⚠️ Not storing the summary for {company}: incomplete sections {', '.join(degraded)}")
+    elif summary:
+        summary_store.put(company, policy_hash, summary, reference, original_url)
+    yield "result", (summary, reference, original_url)
+
+SUMMARY_STAGES = ["fetch", "chunk", "embed", "summarize", "references"]
+
+def run_summary_job(job, platform, use_store=True):
+    """
+    Background job handler (see src/common/jobs.py): reports stages and the partial summary,
+    returns {"summary", "references", "source"}.
+    """
+    summary, pieces = None, []
+    # Closing the stream when the job is cancelled stops the shared generation if no one else is reading it.
+    with closing(stream_policy_summary(platform, use_store=use_store)) as events:
+        for kind, payload in events:
+            if kind == "stage":
+                job.stage(payload, SUMMARY_STAGES.index(payload) / len(SUMMARY_STAGES))
+            elif kind == "summary":
+                pieces.append(payload)
+                job.partial("".join(pieces))
+            else:
+                summary, refs, link = payload
+    if summary is None:
+        raise ValueError(f"Could not summarize {platform}: unknown platform or empty summary.")
+    return {"summary": summary, "references": refs, "source": link, "quotes": verify_summary_references(platform, refs)}
+
+def summarize_policy_for_platform(platform_name, csv_path=None, use_store=True):
+    """
+    Returns (summary, references, original_url). A summary stored for the current policy
+    version (e.g. by batch_summary.py) is returned without calling Gemini.
+    """
+    result = None, None, None
+    for kind, payload in stream_policy_summary(platform_name, csv_path, use_store):
+        if kind == "result":
+            result = payload
+    return result
 
 
 def format_summary_for_html(summary_text):
@@ -271,10 +624,56 @@ def format_summary_for_html(summary_text):
     return "\n".join(html_lines)
 
 
-def format_reference_quotes(ref_text):
+REFERENCE_LINE = re.compile(r"Reference\s+(\d+):\s+(.*)", re.IGNORECASE)
+
+def parse_reference_quotes(ref_text):
+    """
+    The "Reference N:" quotes of a references text, in order, as {"section", "number", "quote"} dicts.
+    """
+    quotes, section_label = [], None
+    for line in ref_text.strip().splitlines():
+        line = html.unescape(line.strip())
+        section_match = re.match(r"^([a-g])\.\s+(.*?):", line, re.IGNORECASE)
+        if section_match:
+            section_label = f"{section_match.group(1).lower()}. {section_match.group(2)}"
+            continue
+        ref_match = REFERENCE_LINE.match(line)
+        if ref_match:
+            quotes.append({"section": section_label, "number": int(ref_match.group(1)), "quote": ref_match.group(2).strip().strip('"')})
+    return quotes
+
+def verify_summary_references(platform_name, ref_text, csv_path=None):
+    """
+    Locates every reference quote in the platform's policy text (see src/common/quote_verifier.py).
+    Returns the parse_reference_quotes dicts with "status", "score", "start", "end" and "fragment" added.
+    """
+    row = find_platform_row(platform_name, csv_path)
+    quotes = parse_reference_quotes(ref_text or "")
+    if row is None or not quotes:
+        return []
+    policy_text = get_policy_store().get(row["Privacy Policy Txt"])
+    return [dict(quote, **match) for quote, match in zip(quotes, verify_quotes(policy_text, [q["quote"] for q in quotes]))]
+
+def verification_badge(match, source_url=None):
+    if match["status"] == "exact":
+        badge = "<span title='Found verbatim in the policy'>✅</span>"
+    elif match["status"] == "fuzzy":
+        badge = f"<span title='Closest passage in the policy matches {match['score']:.0%}'>≈ {match['score']:.0%}</span>"
+    else:
+        badge = "<span style='color:#B91C1C;' title='Not found in the policy text'>⚠️ not found in policy</span>"
+    if source_url and match.get("fragment"):
+        badge += f" <a href='{html.escape(source_url + match['fragment'])}' target='_blank' title='Open at this passage'>↗</a>"
+    return badge
+
+def format_reference_quotes(ref_text, verification=None, source_url=None):
+    """
+    Renders a references text as HTML. With `verification` (from verify_summary_references),
+    each quote gets a badge for where it was found in the policy and a deep link to that passage.
+    """
     lines = ref_text.strip().splitlines()
     html_output = []
     section_label = None
+    reference_count = 0
 
     for line in lines:
         line = html.unescape(line.strip())
@@ -287,13 +686,17 @@ def format_reference_quotes(ref_text):
             continue
 
         # Match references like: Reference 1: "..." (or unquoted text)
-        ref_match = re.match(r"Reference\s+(\d+):\s+(.*)", line, re.IGNORECASE)
+        ref_match = REFERENCE_LINE.match(line)
         if ref_match:
             number = ref_match.group(1)
             quote = ref_match.group(2).strip()
             quote = quote.strip('"')  # Remove existing quotes to avoid double quoting
+            badge = ""
+            if verification and reference_count < len(verification):
+                badge = " " + verification_badge(verification[reference_count], source_url)
+            reference_count += 1
             html_output.append(
-                f"<p style='margin-left: 1.5em;'><strong>Reference {number}:</strong> \"{html.escape(quote)}\"</p>"
+                f"<p style='margin-left: 1.5em;'><strong>Reference {number}:</strong> \"{html.escape(quote)}\"{badge}</p>"
             )
             continue
 
@@ -0,0 +1,80 @@
+import os
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from src.common.llm_cache import backend_version, llm_backend
+from src.common.paths import CACHE_DIR
+
+
+class SummaryStore:
+    """
+    Versioned store of generated summaries, one row per (platform, policy hash, LLM backend).
+    Written by the batch precomputation CLI and read first by summarize_policy_for_platform.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(CACHE_DIR, "summaries.sqlite")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._db() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS summaries (
+                    platform TEXT NOT NULL,
+                    policy_hash TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    refs TEXT NOT NULL,
+                    source_url TEXT,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (platform, policy_hash)
+                )
+                """
+            )
+
+    @contextmanager
+    def _db(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, platform, policy_hash):
+        """
+        Returns the stored record for this exact policy version, or None.
+        """
+        with self._db() as conn:
+            row = conn.execute(
+                "SELECT * FROM summaries WHERE platform = ? AND policy_hash = ?", (platform.lower(), backend_version(policy_hash))
+            ).fetchone()
+        return dict(row) if row else None
+
+    def latest(self, platform):
+        with self._db() as conn:
+            row = conn.execute(
+                "SELECT * FROM summaries WHERE platform = ? AND policy_hash LIKE ? ORDER BY created_at DESC LIMIT 1",
+                (platform.lower(), f"%:{llm_backend()}"),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def put(self, platform, policy_hash, summary, refs, source_url):
+        with self._db() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?, ?)",
+                (platform.lower(), backend_version(policy_hash), summary, refs, source_url, time.time()),
+            )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_summary_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SummaryStore()
+        return _store
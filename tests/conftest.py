@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# Every store and cache lives under PRIVACY_CACHE_DIR, which src.common.paths reads at import time,
+# so point it at a throwaway directory before any test imports the package.
+os.environ["PRIVACY_CACHE_DIR"] = tempfile.mkdtemp(prefix="privacy-cache-")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
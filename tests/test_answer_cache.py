@@ -0,0 +1,68 @@
+import time
+
+import numpy as np
+
+import src.qa.qa as qa
+from src.qa.answer_cache import SemanticAnswerCache
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype="float32")
+    return vector / np.linalg.norm(vector)
+
+
+def make_cache(tmp_path, **kwargs):
+    return SemanticAnswerCache(str(tmp_path / "answers.sqlite"), **kwargs)
+
+
+def test_similar_question_hits_and_dissimilar_misses(tmp_path):
+    cache = make_cache(tmp_path, threshold=0.9)
+    cache.put("TikTok", "v1", "Do you sell my data?", unit(1, 0, 0), "No.", ["chunk"])
+    hit = cache.lookup("tiktok", "v1", unit(1, 0.1, 0))
+    assert hit["answer"] == "No." and hit["sources"] == ["chunk"] and hit["similarity"] > 0.9
+    assert cache.lookup("tiktok", "v1", unit(0, 1, 0)) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_answers_are_scoped_to_the_policy_version(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("TikTok", "v1", "q", unit(1, 0), "old", [])
+    assert cache.lookup("TikTok", "v2", unit(1, 0)) is None
+    cache.put("TikTok", "v2", "q", unit(1, 0), "new", [])
+    assert cache.stats()["entries"] == 1  # the v1 answer was dropped
+    assert cache.lookup("TikTok", "v2", unit(1, 0))["answer"] == "new"
+
+
+def test_capacity_evicts_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path, capacity=2)
+    cache.put("Reddit", "v1", "a", unit(1, 0, 0), "A", [])
+    time.sleep(0.01)
+    cache.put("Reddit", "v1", "b", unit(0, 1, 0), "B", [])
+    time.sleep(0.01)
+    cache.lookup("Reddit", "v1", unit(1, 0, 0))  # "a" is now more recent than "b"
+    time.sleep(0.01)
+    cache.put("Reddit", "v1", "c", unit(0, 0, 1), "C", [])
+    assert cache.lookup("Reddit", "v1", unit(0, 1, 0)) is None
+    assert cache.lookup("Reddit", "v1", unit(1, 0, 0))["answer"] == "A"
+
+
+def test_expired_and_empty_answers(tmp_path):
+    cache = make_cache(tmp_path, ttl=-1)
+    cache.put("Reddit", "v1", "q", unit(1, 0), "A", [])
+    assert cache.lookup("Reddit", "v1", unit(1, 0)) is None
+    cache = make_cache(tmp_path)
+    cache.put("Reddit", "v1", "q", unit(1, 0), "", [])
+    assert cache.lookup("Reddit", "v1", unit(1, 0)) is None
+
+
+def test_answer_cache_version_includes_model_and_backend(monkeypatch):
+    class Store:
+        def version(self, url):
+            return "hash"
+
+    monkeypatch.setattr(qa, "get_policy_store", lambda: Store())
+    monkeypatch.setenv("LLM_BACKEND", "fake")
+    fake = qa.answer_cache_version("https://example.com/p.txt")
+    monkeypatch.setenv("LLM_BACKEND", "gemini")
+    gemini = qa.answer_cache_version("https://example.com/p.txt")
+    assert fake != gemini and qa.EMBEDDING_MODEL_NAME in gemini
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+import requests
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException
+
+from src.api import server
+from src.common.llm_client import LLMError
+from src.common.policy_store import PolicyFetchError
+
+
+def status_for(error):
+    def fail():
+        raise error
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(server.run_blocking(fail))
+    return raised.value.status_code
+
+
+def test_pipeline_errors_map_to_http_errors():
+    assert status_for(FileNotFoundError("no such platform")) == 404
+    assert status_for(LLMError("quota", 429)) == 429
+    assert status_for(LLMError("bad gateway", 500)) == 502
+    assert status_for(PolicyFetchError("https://example.com/p.txt", 404)) == 502
+    assert status_for(PolicyFetchError("https://example.com/p.txt", 503)) == 503
+    assert status_for(requests.ConnectionError("refused")) == 503
+    assert status_for(requests.Timeout("slow")) == 504
+    assert status_for(ValueError("boom")) == 500
+
+
+def test_results_pass_through():
+    assert asyncio.run(server.run_blocking(lambda a, b: a + b, 1, 2)) == 3
+
+
+def test_compare_uses_the_same_names_and_texts_as_the_batch_and_ui(tmp_path, monkeypatch):
+    from src.comparison.src import policy_loader
+
+    csv_path = tmp_path / "privacy_db.csv"
+    csv_path.write_text("Platform,Privacy Policy URL,Privacy Policy Txt\n"
+                        "TikTok,https://tiktok.com/p,https://example.com/tiktok.txt\n"
+                        "Reddit,https://reddit.com/p,https://example.com/reddit.txt\n")
+    raw = {"https://example.com/tiktok.txt": "\n  TikTok policy text.  \n", "https://example.com/reddit.txt": "Reddit policy.\n\n"}
+    monkeypatch.setattr(policy_loader, "find_privacy_db_csv", lambda: str(csv_path))
+    monkeypatch.setattr(policy_loader, "fetch_policy_text", lambda url: raw[url])
+    monkeypatch.setattr(policy_loader, "fetch_policies", lambda urls: {"results": {u: raw[u] for u in urls}, "failures": {}, "elapsed": 0.0})
+
+    calls = []
+
+    class RecordingComparator:
+        def compare_texts(self, *args):
+            calls.append(args)
+            return {"comparison": "table"}
+
+    monkeypatch.setattr(server, "_comparator", RecordingComparator())
+    platform_a, platform_b, result = server.compare_platforms("tiktok", "REDDIT", True)
+
+    df = policy_loader.load_policies()
+    policies = dict(zip(df["Platform"], df["Policy"]))
+    assert (platform_a, platform_b) == ("TikTok", "Reddit")
+    assert calls[0] == ("TikTok", "Reddit", policies["TikTok"], policies["Reddit"], True)
+    assert result == {"comparison": "table"}
+    with pytest.raises(FileNotFoundError):
+        server.compare_platforms("Myspace", "Reddit", True)
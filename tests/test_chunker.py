@@ -0,0 +1,56 @@
+import os
+
+import src.common.chunker as chunker
+from src.common.chunker import chunk_policy, is_heading, iter_chunks
+
+POLICY = """Privacy Policy
+
+1. INFORMATION WE COLLECT
+
+We collect your name, email address and phone number when you create an account. We also collect device identifiers and approximate location.
+
+2. HOW WE SHARE YOUR INFORMATION
+
+We share information with service providers who process it on our behalf. We do not sell your personal information.
+
+Cookies:
+
+We use cookies and similar technologies to remember your preferences and measure how the service is used.
+"""
+
+
+def test_is_heading():
+    assert is_heading("2. HOW WE SHARE YOUR INFORMATION")
+    assert is_heading("Cookies:")
+    assert not is_heading("We do not sell your personal information.")
+    assert not is_heading("- a bullet point")
+
+
+def test_chunks_follow_sections_and_keep_offsets():
+    chunks = list(iter_chunks(POLICY, max_words=40))
+    # The title alone is too short for a chunk of its own, so it stays with the first section.
+    assert [chunk["section"] for chunk in chunks] == ["Privacy Policy", "2. HOW WE SHARE YOUR INFORMATION", "Cookies"]
+    assert "1. INFORMATION WE COLLECT" in chunks[0]["text"]
+    for chunk in chunks:
+        assert POLICY[chunk["start"]:chunk["end"]] == chunk["text"]
+    assert chunks[1]["text"].startswith("2. HOW WE SHARE")
+    assert len({chunk["id"] for chunk in chunks}) == len(chunks)
+
+
+def test_long_paragraphs_are_split_with_overlap():
+    text = " ".join(f"word{i}" for i in range(100))
+    chunks = list(iter_chunks(text, max_words=30, overlap=5))
+    assert all(len(chunk["text"].split()) <= 30 for chunk in chunks)
+    assert chunks[0]["text"].split()[-5:] == chunks[1]["text"].split()[:5]
+    assert chunks[-1]["text"].endswith("word99")
+
+
+def test_chunk_policy_caches_layout_on_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(chunker, "CHUNK_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(chunker, "_memory", chunker.OrderedDict())
+    first = chunk_policy(POLICY, max_words=40)
+    assert len(os.listdir(tmp_path)) == 1
+
+    chunker._memory.clear()
+    assert chunk_policy(POLICY, max_words=40) == first
+    assert chunk_policy(POLICY, max_words=40, use_cache=False) == first
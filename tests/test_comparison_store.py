@@ -0,0 +1,45 @@
+import pandas as pd
+
+from src.comparison.src.batch_compare import batch_compare, select_pairs
+from src.comparison.src.comparison_store import ComparisonStore, swap_comparison
+
+RESULT = {
+    "comparison": (
+        "| Privacy Aspect | Alpha | Beta |\n"
+        "|---------------|--------------|--------------|\n"
+        "| Data sharing | Shares with partners [A1] | Never shares [B1] |"
+    ),
+    "citations_a": {"A1": "We share with partners."},
+    "citations_b": {"B1": "We never share your data."},
+    "citation_spans_a": {"A1": [{"status": "exact"}]},
+    "citation_spans_b": {"B1": [{"status": "fuzzy"}]},
+}
+
+
+def test_swap_comparison_swaps_columns_and_citations():
+    swapped = swap_comparison(RESULT)
+    assert swapped["comparison"].splitlines()[0] == "| Privacy Aspect | Beta | Alpha |"
+    assert swapped["comparison"].splitlines()[2] == "| Data sharing | Never shares [A1] | Shares with partners [B1] |"
+    assert swapped["citations_a"] == {"A1": "We never share your data."}
+    assert swapped["citations_b"] == {"B1": "We share with partners."}
+    assert swapped["citation_spans_a"] == {"A1": [{"status": "fuzzy"}]}
+    assert swap_comparison(swapped) == RESULT
+
+
+def test_store_serves_the_reverse_pair(tmp_path):
+    store = ComparisonStore(str(tmp_path / "comparisons.sqlite"))
+    store.put_comparison("Alpha", "Beta", "ha", "hb", RESULT)
+    assert store.get_comparison("Alpha", "Beta", "ha", "hb") == RESULT
+    assert store.get_comparison("Beta", "Alpha", "hb", "ha") == swap_comparison(RESULT)
+    assert store.get_comparison("Beta", "Alpha", "ha", "hb") is None  # policy versions must match too
+
+
+def test_select_pairs():
+    assert select_pairs(["c", "a", "b"]) == [("a", "b"), ("a", "c"), ("b", "c")]
+    assert select_pairs(["a", "b", "c"], against="b") == [("b", "a"), ("b", "c")]
+
+
+def test_batch_compare_with_no_pairs_does_nothing():
+    df = pd.DataFrame({"Platform": ["Alpha", "Beta"], "Policy": ["policy a", "policy b"]})
+    report = batch_compare([], comparator=object(), df=df)
+    assert report == {"done": [], "skipped": [], "failures": {}}
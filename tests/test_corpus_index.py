@@ -0,0 +1,167 @@
+import numpy as np
+import pytest
+
+import src.common.corpus_index as corpus_index
+from src.common.corpus_index import CorpusIndex
+from src.common.quantization import QuantizedEmbeddings
+
+VOCABULARY = ["collect", "share", "brokers", "children", "delete", "cookies", "retain", "encrypt"]
+
+POLICIES = {
+    "TikTok": "We collect your contacts.\n\nWe share data with brokers and advertisers.\n\nCookies track your visits.",
+    "Reddit": "We collect very little.\n\nChildren under 13 may not register.\n\nYou can delete your account.",
+    "Bumble": "We retain messages for a year.\n\nWe encrypt data in transit.\n\nWe share data with brokers sometimes.",
+}
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # A few sentences per policy; six-word chunks give every platform several rows.
+    monkeypatch.setattr(corpus_index, "CHUNK_WORDS", 6)
+    monkeypatch.setattr(corpus_index, "CHUNK_OVERLAP", 0)
+
+
+def bag_of_words(texts):
+    vectors = np.array([[text.lower().count(word) + 0.01 for word in VOCABULARY] for text in texts], dtype="float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def build(storage="float32"):
+    return CorpusIndex.build(POLICIES, encode=bag_of_words, storage=storage, urls=["a", "b", "c"])
+
+
+def test_chunks_keep_platform_offsets_and_ranges():
+    index = build()
+    assert index.platforms == list(POLICIES)
+    for platform, (start, end) in index.platform_ranges.items():
+        assert end - start >= 2
+        for meta in index.metadata[start:end]:
+            assert meta["platform"] == platform
+            assert POLICIES[platform][meta["start"]:meta["end"]] == meta["text"]
+
+
+def test_filtered_search_matches_brute_force_over_the_platforms():
+    index = build()
+    query = bag_of_words(["share with brokers"])
+    hits = index.search(query, ["bumble", "TikTok"], top_k=2)[0]
+    assert {hit["platform"] for hit in hits} <= {"Bumble", "TikTok"}
+
+    rows = [row for row, meta in enumerate(index.metadata) if meta["platform"] in ("Bumble", "TikTok")]
+    expected = sorted((float(index.embeddings.to_float32()[row] @ query[0]) for row in rows), reverse=True)[:2]
+    np.testing.assert_allclose([hit["score"] for hit in hits], expected, rtol=1e-5)
+    assert all("brokers" in hit["text"] for hit in hits)
+
+
+def test_unfiltered_search_covers_every_platform_and_unknown_platforms_fail():
+    index = build()
+    hits = index.search(bag_of_words(["children"]), top_k=1)[0]
+    assert hits[0]["platform"] == "Reddit"
+    with pytest.raises(KeyError):
+        index.search(bag_of_words(["children"]), ["Myspace"])
+
+
+def test_corpus_bm25_finds_exact_terms_the_dense_scores_miss(monkeypatch):
+    policies = dict(POLICIES, Reddit=POLICIES["Reddit"] + "\n\nWe comply with COPPA for minors.")
+    index = CorpusIndex.build(policies, encode=bag_of_words)
+    query, missed = ["COPPA cookies"], bag_of_words(["cookies"])  # an embedding that misses the legal term
+    monkeypatch.setattr(corpus_index, "RETRIEVAL_MODE", "dense")
+    assert "COPPA" not in index.search(missed, top_k=1, queries=query)[0][0]["text"]
+    monkeypatch.setattr(corpus_index, "RETRIEVAL_MODE", "bm25")
+    assert "COPPA" in index.search(missed, top_k=1, queries=query)[0][0]["text"]
+    monkeypatch.setattr(corpus_index, "RETRIEVAL_MODE", "hybrid")
+    assert any("COPPA" in hit["text"] for hit in index.search(missed, top_k=2, queries=query)[0])
+    per_platform = index.search_per_platform(missed, ["Reddit", "TikTok"], top_k=1, queries=query)[0]
+    assert "COPPA" in per_platform["Reddit"][0]["text"]
+
+
+def test_search_per_platform_returns_each_platform():
+    index = build()
+    results = index.search_per_platform(bag_of_words(["brokers", "delete"]), ["TikTok", "Reddit"], top_k=1)
+    assert list(results[0]) == ["TikTok", "Reddit"]
+    assert "brokers" in results[0]["TikTok"][0]["text"]
+    assert "delete" in results[1]["Reddit"][0]["text"]
+
+
+def test_platform_rows_are_views_not_copies():
+    embeddings = QuantizedEmbeddings.from_float32(bag_of_words(list(POLICIES.values()) * 4), "int8")
+    rows = embeddings.rows(2, 7)
+    assert np.shares_memory(rows.data, embeddings.data)
+    np.testing.assert_allclose(rows.to_float32(), embeddings.to_float32()[2:7])
+
+
+def test_save_load_and_rebuild_when_policy_urls_change(tmp_path, monkeypatch):
+    path = str(tmp_path / "corpus")
+    links = {"TikTok": "https://example.com/tiktok/1.txt"}
+    builds = []
+
+    def fake_build(csv_path, path):
+        index = CorpusIndex.build(POLICIES, encode=bag_of_words, urls=sorted(links.values()))
+        index.save(path)
+        builds.append(index)
+        return index
+
+    monkeypatch.setattr(corpus_index, "corpus_policies", lambda csv_path: dict(links))
+    monkeypatch.setattr(corpus_index, "build_corpus_index", fake_build)
+    monkeypatch.setattr(corpus_index, "_corpus", None)
+
+    first = corpus_index.get_corpus_index(path)
+    assert corpus_index.get_corpus_index(path) is first and len(builds) == 1
+    monkeypatch.setattr(corpus_index, "_corpus", None)
+    loaded = corpus_index.get_corpus_index(path)
+    assert len(builds) == 1 and loaded.metadata == first.metadata
+    assert loaded.bm25 is not None and loaded.bm25.num_documents == len(loaded.metadata)
+
+    links["TikTok"] = "https://example.com/tiktok/2.txt"
+    corpus_index.get_corpus_index(path)
+    assert len(builds) == 2
+
+
+def test_cross_platform_answer_names_sources(monkeypatch):
+    import src.qa.qa as qa
+
+    index = build()
+    monkeypatch.setenv("LLM_BACKEND", "fake")
+    monkeypatch.setattr(qa, "get_corpus_index", lambda: index)
+    monkeypatch.setattr(qa, "encode", lambda texts, normalize=False: bag_of_words(texts))
+    events = list(qa.stream_corpus_answer("Who shares data with brokers?", ["TikTok", "Bumble"]))
+    result = events[-1][1]
+    assert events[-1][0] == "result" and result["answer"]
+    assert {source["platform"] for source in result["sources"]} == {"TikTok", "Bumble"}
+    with pytest.raises(FileNotFoundError):
+        list(qa.stream_corpus_answer("Who shares data?", ["Myspace"]))
+
+
+def test_approximate_backend_serves_dense_search_and_persists(tmp_path):
+    exact = build()
+    approximate = CorpusIndex.build(POLICIES, encode=bag_of_words, backend="hnsw")
+    assert approximate.ann is not None and exact.ann is None
+    assert approximate.search(bag_of_words(["cookies"]), top_k=1)[0][0]["row"] == approximate.ann.search(bag_of_words(["cookies"]), 1)[1][0][0]
+    query = bag_of_words(["share with brokers"])
+    for platforms in (None, ["Bumble"], ["TikTok", "Reddit"]):
+        expected = [hit["score"] for hit in exact.search(query, platforms, top_k=2)[0]]
+        hits = approximate.search(query, platforms, top_k=2)[0]
+        np.testing.assert_allclose([hit["score"] for hit in hits], expected, rtol=1e-5)
+        assert platforms is None or {hit["platform"] for hit in hits} <= set(platforms)
+    assert approximate.search_per_platform(query, ["Reddit"], top_k=1)[0]["Reddit"][0]["platform"] == "Reddit"
+
+    approximate.save(str(tmp_path / "corpus"))
+    loaded = CorpusIndex.load(str(tmp_path / "corpus"))
+    assert loaded.backend == "hnsw" and loaded.config() == approximate.config()
+    assert [hit["row"] for hit in loaded.search(query, ["Bumble"], top_k=1)[0]] == \
+        [hit["row"] for hit in approximate.search(query, ["Bumble"], top_k=1)[0]]
+
+
+def test_factory_strings_size_the_backend_to_the_collection():
+    from src.common.vector_index import index_factory_string, make_index
+
+    assert index_factory_string("ivf", 1000, 384, "float32") == "Flat"
+    assert index_factory_string("hnsw", 100000, 384, "int8") == "HNSW32,SQ8"
+    assert index_factory_string("ivfpq", 100000, 384, "float32").startswith("IVF")
+    with pytest.raises(ValueError):
+        index_factory_string("lsh", 100000, 384)
+
+    vectors = np.random.default_rng(0).standard_normal((5000, 16)).astype("float32")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = make_index(vectors, "ivf", "float32")
+    assert index.nprobe == 16
+    assert (index.search(vectors[:20], 1)[1][:, 0] == np.arange(20)).mean() > 0.9
@@ -0,0 +1,121 @@
+import time
+import threading
+
+import pytest
+
+import src.common.jobs as jobs
+from src.common.jobs import JobQueue
+
+started = threading.Event()
+release = threading.Event()
+
+
+def echo_job(job, text):
+    job.stage("first", 0.5)
+    job.partial(text[:2])
+    return {"text": text}
+
+
+def failing_job(job):
+    raise ValueError("bad input")
+
+
+def slow_job(job):
+    job.stage("waiting")
+    started.set()
+    while not release.wait(0.01):
+        job.check_cancelled()
+    return {}
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "echo", f"{__name__}:echo_job")
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "failing", f"{__name__}:failing_job")
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "slow", f"{__name__}:slow_job")
+    started.clear()
+    release.clear()
+    return JobQueue(str(tmp_path / "jobs.sqlite"))
+
+
+def wait_for(queue, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in jobs.FINISHED:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_runs_to_completion(queue):
+    job_id = queue.submit("echo", text="hello")
+    assert queue.get(job_id)["status"] == "queued"
+    queue.run(queue.claim())
+    job = queue.get(job_id)
+    assert job["status"] == "done" and job["progress"] == 1.0
+    assert job["stage"] == "first" and job["partial"] == "he"
+    assert job["result"] == {"text": "hello"}
+    assert queue.claim() is None
+
+
+def test_failed_job_records_the_error(queue):
+    job_id = queue.submit("failing")
+    queue.run(queue.claim())
+    assert queue.get(job_id)["status"] == "failed"
+    assert queue.get(job_id)["error"] == "bad input"
+
+
+def test_unknown_kind_is_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.submit("nope")
+
+
+def test_cancel_queued_and_running_jobs(queue):
+    queued = queue.submit("echo", text="x")
+    assert queue.cancel(queued)
+    assert queue.get(queued)["status"] == "cancelled"
+    assert not queue.cancel(queued)
+    assert queue.claim() is None
+
+    running = queue.submit("slow")
+    queue.start_workers(1)
+    assert started.wait(5)
+    assert queue.cancel(running)
+    assert wait_for(queue, running)["status"] == "cancelled"
+
+
+def test_workers_in_two_queues_share_the_file(queue):
+    other = JobQueue(queue.path)
+    job_id = other.submit("echo", text="shared")
+    queue.start_workers(2)
+    assert wait_for(other, job_id)["result"] == {"text": "shared"}
+
+
+def test_fail_interrupted(queue):
+    job_id = queue.submit("echo", text="x")
+    queue.claim()
+    queue.fail_interrupted()
+    assert queue.get(job_id)["error"] == "Interrupted"
+
+
+def test_partial_output_checks_cancellation_at_the_write_interval(queue, monkeypatch):
+    job_id = queue.submit("echo", text="x")
+    queue.claim()
+    checks = []
+    monkeypatch.setattr(queue, "cancel_requested", lambda job_id: checks.append(job_id) or False)
+    context = jobs.JobContext(queue, job_id)
+    for piece in range(100):
+        context.partial(str(piece))
+    assert len(checks) == 1 and queue.get(job_id)["partial"] == "0"
+
+
+def test_only_jobs_without_a_recent_heartbeat_are_failed(queue):
+    dead, alive = queue.submit("echo", text="x"), queue.submit("echo", text="y")
+    queue.claim(), queue.claim()
+    queue._update(dead, heartbeat_at=time.time() - 120)
+    queue._running.add(alive)
+    queue.heartbeat()
+    assert queue.fail_interrupted(stale_after=60) == 1
+    assert queue.get(dead)["status"] == "failed" and queue.get(dead)["error"] == "Interrupted"
+    assert queue.get(alive)["status"] == "running" and queue.get(alive)["heartbeat_at"] > time.time() - 5
@@ -0,0 +1,62 @@
+import src.common.llm_cache as llm_cache
+from src.common.llm_cache import LLMResponseCache, backend_version, cached_call, cached_stream, response_key, set_refresh
+from src.comparison.src.comparison_store import ComparisonStore
+from src.summary.summary_store import SummaryStore
+
+
+def test_response_key_depends_on_backend(monkeypatch):
+    monkeypatch.setenv("LLM_BACKEND", "gemini")
+    gemini_key = response_key("gemini-2.0-flash", "prompt")
+    monkeypatch.setenv("LLM_BACKEND", "fake")
+    assert response_key("gemini-2.0-flash", "prompt") != gemini_key
+    assert backend_version("abc") == "abc:fake"
+
+
+def test_fake_responses_are_not_served_to_gemini(tmp_path, monkeypatch):
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite"))
+    monkeypatch.setenv("LLM_BACKEND", "fake")
+    cache.put("gemini-2.0-flash", "prompt", "fake text")
+    assert cache.get("gemini-2.0-flash", "prompt") == "fake text"
+    monkeypatch.setenv("LLM_BACKEND", "gemini")
+    assert cache.get("gemini-2.0-flash", "prompt") is None
+
+
+def test_cache_expires_and_evicts(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite"), ttl=3600, max_entries=2)
+    for i in range(3):
+        cache.put("model", f"prompt {i}", f"response {i}")
+    assert cache.get("model", "prompt 0") is None
+    assert cache.get("model", "prompt 2") == "response 2"
+    cache.put("model", "empty", "")
+    assert cache.get("model", "empty") is None
+    assert LLMResponseCache(str(tmp_path / "llm.sqlite"), ttl=-1).get("model", "prompt 2") is None
+
+
+def test_stores_are_scoped_to_the_backend(tmp_path, monkeypatch):
+    summaries = SummaryStore(str(tmp_path / "summaries.sqlite"))
+    comparisons = ComparisonStore(str(tmp_path / "comparisons.sqlite"))
+    monkeypatch.setenv("LLM_BACKEND", "fake")
+    summaries.put("Example", "hash", "fake summary", "refs", "https://example.com")
+    comparisons.put_comparison("a", "b", "ha", "hb", {"comparison": "fake table"})
+    assert summaries.get("example", "hash")["summary"] == "fake summary"
+    assert comparisons.get_comparison("a", "b", "ha", "hb") == {"comparison": "fake table"}
+
+    monkeypatch.setenv("LLM_BACKEND", "gemini")
+    assert summaries.get("example", "hash") is None
+    assert summaries.latest("example") is None
+    assert comparisons.get_comparison("a", "b", "ha", "hb") is None
+
+
+def test_refresh_skips_lookups_and_stores_fresh_responses(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_cache, "_cache", LLMResponseCache(str(tmp_path / "llm.sqlite")))
+    responses = iter(["first", "second", "third"])
+    call = lambda: next(responses)
+    assert cached_call("model", "prompt", call) == "first"
+    assert cached_call("model", "prompt", call) == "first"
+    set_refresh(True)
+    try:
+        assert cached_call("model", "prompt", call) == "second"
+        assert "".join(cached_stream("model", "prompt", lambda: iter(["thi", "rd"]))) == "third"
+    finally:
+        set_refresh(False)
+    assert cached_call("model", "prompt", call) == "third"
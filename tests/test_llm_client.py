@@ -0,0 +1,19 @@
+import src.common.llm_client as llm_client
+from src.common.context_packer import TokenEstimator
+from src.common.fake_gemini_server import start_fake_gemini_server
+from src.common.llm_client import GeminiClient
+
+
+def test_generate_and_stream_both_calibrate_the_token_estimator(monkeypatch):
+    server, api_base = start_fake_gemini_server(first_token_delay=0.0, chunk_delay=0.0)
+    estimator = TokenEstimator()
+    monkeypatch.setattr(llm_client, "get_token_estimator", lambda: estimator)
+    client = GeminiClient(api_key="test", api_base=api_base)
+    try:
+        text, _ = client._generate("Summarize this privacy policy, please.", None, None)
+        assert text and estimator.observations == 1
+        pieces = [piece for piece, _ in client._stream("Compare these two privacy policies, please.", "Be brief.", None)]
+        assert len(pieces) > 1 and estimator.observations == 2
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,68 @@
+import pytest
+
+from benchmarks.local_policy_server import start_server, synthetic_policy
+from src.common.policy_fetcher import fetch_policies
+
+
+@pytest.fixture(scope="module")
+def server():
+    # Shared by the tests below; each uses its own paths, so the per-path request counts stay separate.
+    server, base_url = start_server(latency=0.05)
+    yield server, base_url
+    server.shutdown()
+    server.server_close()
+
+
+def fetch(urls, **kwargs):
+    return fetch_policies(urls, backoff=0.01, use_store=False, **kwargs)
+
+
+def test_partial_results_come_with_a_failure_report(server):
+    server, base_url = server
+    ok = [f"{base_url}/partial_{i}.txt" for i in range(3)]
+    missing = f"{base_url}/fail-404/partial.txt"
+    report = fetch(ok + [missing, ok[0]])
+    assert report["results"] == {url: synthetic_policy(url.split("/")[-1]) for url in ok}
+    assert list(report["failures"]) == [missing] and "404" in report["failures"][missing]
+    assert server.requests["/partial_0.txt"] == 1  # duplicates are fetched once
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_throttling_and_server_errors_are_retried(server, status):
+    server, base_url = server
+    url = f"{base_url}/flaky-{status}-2/retried.txt"
+    report = fetch([url], retries=3)
+    assert report["results"][url] == synthetic_policy("retried.txt") and not report["failures"]
+    assert server.requests[f"/flaky-{status}-2/retried.txt"] == 3
+
+
+def test_retries_give_up_after_the_last_attempt(server):
+    server, base_url = server
+    url = f"{base_url}/fail-503/unavailable.txt"
+    report = fetch([url], retries=2)
+    assert url in report["failures"]
+    assert server.requests["/fail-503/unavailable.txt"] == 3
+
+
+def test_not_found_is_not_retried(server):
+    server, base_url = server
+    report = fetch([f"{base_url}/fail-404/missing.txt"], retries=3)
+    assert len(report["failures"]) == 1
+    assert server.requests["/fail-404/missing.txt"] == 1
+
+
+def test_retries_through_the_policy_store(server):
+    server, base_url = server
+    url = f"{base_url}/flaky-502-1/stored.txt"
+    report = fetch_policies([url], backoff=0.01, use_store=True)
+    assert report["results"][url] == synthetic_policy("stored.txt")
+    assert server.requests["/flaky-502-1/stored.txt"] == 2
+
+
+def test_per_host_limit_caps_concurrent_requests(server):
+    server, base_url = server
+    urls = [f"{base_url}/limited_{i}.txt" for i in range(12)]
+    server.max_in_flight = 0
+    report = fetch(urls, max_workers=8, per_host=2)
+    assert len(report["results"]) == 12
+    assert server.max_in_flight == 2
@@ -0,0 +1,68 @@
+import pytest
+import requests
+
+from src.common.policy_store import PolicyFetchError, PolicyStore, content_hash
+
+URL = "https://example.com/policy.txt"
+
+
+class Response:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+
+class Session:
+    """
+    Returns the queued responses in order (raising queued exceptions) and records request headers.
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(headers or {})
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def test_fresh_copy_is_served_from_disk(tmp_path):
+    store = PolicyStore(str(tmp_path))
+    session = Session(Response(200, "policy v1", {"ETag": '"v1"'}))
+    assert store.get_with_version(URL, session) == ("policy v1", content_hash("policy v1"))
+    assert store.get(URL, Session()) == "policy v1"  # no request made
+    assert store.version(URL) == content_hash("policy v1")
+
+
+def test_stale_copy_is_revalidated_with_validators(tmp_path):
+    store = PolicyStore(str(tmp_path), revalidate_after=0)
+    store.get(URL, Session(Response(200, "policy v1", {"ETag": '"v1"'})))
+    session = Session(Response(304), Response(200, "policy v2"))
+    assert store.get(URL, session) == "policy v1"
+    assert session.requests[0]["If-None-Match"] == '"v1"'
+    assert store.get(URL, session) == "policy v2"
+
+
+def test_network_failures_serve_the_stored_copy_or_raise(tmp_path):
+    store = PolicyStore(str(tmp_path), revalidate_after=0)
+    with pytest.raises(PolicyFetchError):
+        store.get(URL, Session(Response(404)))
+    with pytest.raises(requests.ConnectionError):
+        store.get(URL, Session(requests.ConnectionError("down")))
+
+    store.put(URL, "policy v1")
+    assert store.get(URL, Session(requests.ConnectionError("down"))) == "policy v1"
+    assert store.get(URL, Session(Response(503))) == "policy v1"
+
+
+def test_least_recently_used_policies_are_evicted(tmp_path):
+    store = PolicyStore(str(tmp_path), max_bytes=20)
+    store.put("https://example.com/a.txt", "a" * 10)
+    store.put("https://example.com/b.txt", "b" * 10)
+    store.put("https://example.com/c.txt", "c" * 10)
+    assert store.version("https://example.com/a.txt") is None
+    assert store.version("https://example.com/c.txt") == content_hash("c" * 10)
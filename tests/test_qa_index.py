@@ -0,0 +1,32 @@
+import numpy as np
+
+import src.qa.qa as qa
+
+
+def normalized(rows, dimension=8, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((rows, dimension)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_index_built_after_a_miss_is_loaded(tmp_path, monkeypatch):
+    monkeypatch.setattr(qa, "INDEX_DIR", str(tmp_path))
+    key = qa.index_key("https://example.com/policy.txt")
+    assert qa.load_index(key) is None
+
+    embeddings = normalized(5)
+    qa.save_index(key, [f"chunk {i}" for i in range(5)], qa.make_index(embeddings), embeddings)
+    chunks, index, stored = qa.load_index(key)
+    assert chunks[0] == "chunk 0"
+    assert qa.load_index(key)[1] is index  # served from memory afterwards
+    assert index.search(embeddings[3:4], 1)[1][0][0] == 3
+
+
+def test_loaded_indexes_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(qa, "INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(qa, "INDEX_MEMORY_ENTRIES", 2)
+    embeddings = normalized(3)
+    for name in ("a", "b", "c"):
+        qa.save_index(name, ["x", "y", "z"], qa.make_index(embeddings), embeddings)
+        qa.load_index(name)
+    assert list(qa._loaded_indexes)[-2:] == ["b", "c"]
+    assert len(qa._loaded_indexes) <= 2
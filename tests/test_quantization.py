@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from src.common.quantization import QuantizedEmbeddings, as_scorable, quantize_int8
+
+
+def normalized(rows, dimension=384, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((rows, dimension)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_int8_round_trip_is_close():
+    vectors = normalized(50)
+    codes, scales = quantize_int8(vectors)
+    assert codes.dtype == np.int8 and scales.dtype == np.float32
+    np.testing.assert_allclose(codes * scales[:, None], vectors, atol=scales.max())
+
+
+@pytest.mark.parametrize("storage, tolerance", [("float32", 1e-6), ("float16", 1e-3), ("int8", 1e-2)])
+def test_scores_match_float32(storage, tolerance, monkeypatch):
+    monkeypatch.setattr("src.common.quantization.BLOCK_ROWS", 64)  # several blocks
+    embeddings, queries = normalized(300), normalized(4, seed=1)
+    store = QuantizedEmbeddings.from_float32(embeddings, storage)
+    assert store.storage == storage and len(store) == 300
+    np.testing.assert_allclose(store.scores(queries), queries @ embeddings.T, atol=tolerance)
+    if storage == "int8":
+        np.testing.assert_allclose(store.scores(queries, quantize_queries=True), queries @ embeddings.T, atol=2 * tolerance)
+
+
+def test_reduced_storage_is_smaller():
+    embeddings = normalized(100)
+    sizes = {storage: QuantizedEmbeddings.from_float32(embeddings, storage).nbytes for storage in ("float32", "float16", "int8")}
+    assert sizes["float16"] == sizes["float32"] // 2
+    assert sizes["int8"] < sizes["float32"] // 3
+
+
+def test_save_and_memory_mapped_load(tmp_path):
+    store = QuantizedEmbeddings.from_float32(normalized(20), "int8")
+    store.save(str(tmp_path))
+    loaded = QuantizedEmbeddings.load(str(tmp_path))
+    assert isinstance(loaded.data, np.memmap)
+    np.testing.assert_array_equal(loaded.to_float32(), store.to_float32())
+
+
+def test_as_scorable_and_unknown_storage():
+    assert as_scorable(np.ones((2, 3), dtype="float64")).storage == "float32"
+    with pytest.raises(ValueError):
+        QuantizedEmbeddings.from_float32(normalized(2), "int4")
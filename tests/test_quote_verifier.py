@@ -0,0 +1,60 @@
+import pytest
+
+from src.common.quote_verifier import QuoteIndex, text_fragment, verify_quotes
+
+POLICY = (
+    "Privacy Policy. We don’t sell personal data to third parties. We may share your e-mail address "
+    "with service providers who help us operate the service. You can delete your account at any time "
+    "from the settings page, and we will remove your data within 30 days. We do not use cookies for "
+    "advertising."
+)
+
+
+@pytest.fixture(scope="module")
+def index():
+    return QuoteIndex(POLICY)
+
+
+def test_verbatim_quote_is_exact_with_offsets(index):
+    match = index.locate("You can delete your account at any time")
+    assert match["status"] == "exact" and match["score"] == 1.0
+    assert POLICY[match["start"]:match["end"]] == "You can delete your account at any time"
+
+
+def test_hyphen_and_apostrophe_variants_match_exactly(index):
+    assert index.locate("We may share your email address")["status"] == "exact"
+    assert index.locate("We don't sell personal data to third parties")["status"] == "exact"
+
+
+@pytest.mark.parametrize("quote", [
+    "We sell personal data to third parties",
+    "sell personal data to third parties",
+    "We use cookies for advertising.",
+    "We may not share your e-mail address with service providers",
+])
+def test_quotes_that_change_negation_are_unverified(index, quote):
+    assert index.locate(quote)["status"] == "unverified"
+
+
+def test_negation_paraphrase_is_a_fuzzy_match(index):
+    match = index.locate("We do not sell personal data to third parties")
+    assert match["status"] == "fuzzy"
+    assert 0.8 <= match["score"] < 1.0
+    assert "sell personal data to third parties" in POLICY[match["start"]:match["end"]]
+
+
+def test_small_wording_change_is_fuzzy_on_the_right_span(index):
+    match = index.locate("we will delete your data within 30 days")
+    assert match["status"] == "fuzzy"
+    assert POLICY[match["start"]:match["end"]].endswith("within 30 days")
+
+
+def test_fabricated_and_empty_quotes(index):
+    assert index.locate("We collect biometric identifiers from your camera roll")["status"] == "unverified"
+    assert index.locate("...")["status"] == "empty"
+
+
+def test_text_fragment_and_verify_quotes():
+    assert text_fragment("a b-c") == "#:~:text=a%20b%2Dc"
+    assert text_fragment("one two three four five six seven eight nine") == "#:~:text=one%20two%20three%20four,six%20seven%20eight%20nine"
+    assert [m["status"] for m in verify_quotes(POLICY, ["Privacy Policy", "nothing like this at all"])] == ["exact", "unverified"]
@@ -0,0 +1,55 @@
+import time
+
+import numpy as np
+
+from src.common.reranker import CrossEncoderReranker
+
+
+class StubCrossEncoder:
+    """
+    Scores a pair by the number of query words in the text; sleeps `delays[i]` on the i-th batch.
+    """
+
+    def __init__(self, delays=()):
+        self.delays = list(delays)
+        self.batches = 0
+
+    def predict(self, pairs, batch_size=None, show_progress_bar=False):
+        if self.batches < len(self.delays):
+            time.sleep(self.delays[self.batches])
+        self.batches += 1
+        return np.array([sum(word in text.split() for word in query.split()) for query, text in pairs], dtype="float32")
+
+
+def make_reranker(model, batch_size=2, budget_ms=1000):
+    reranker = CrossEncoderReranker("stub", batch_size=batch_size, budget_ms=budget_ms)
+    reranker._model = model
+    return reranker
+
+
+def test_reorders_scored_candidates():
+    reranker = make_reranker(StubCrossEncoder())
+    result = reranker.rerank("cookies tracking", ["email", "cookies", "cookies tracking", "name"], top_k=2)
+    assert result["scored"] == 4
+    assert result["order"] == [2, 1]
+
+
+def test_slow_batch_does_not_disable_reranking():
+    reranker = make_reranker(StubCrossEncoder(delays=[0.3]), batch_size=2, budget_ms=100)
+    candidates = ["a", "b", "c", "d", "e", "f"]
+    first = reranker.rerank("c", candidates)
+    assert first["scored"] == 2  # the slow first batch used up the budget
+
+    # The estimate is now far over budget, but every call still scores its first batch,
+    # and fast batches bring the average back down until full reranking resumes.
+    scored = [reranker.rerank("c", candidates)["scored"] for _ in range(30)]
+    assert min(scored) >= 2
+    assert scored[-1] == len(candidates)
+    assert reranker.rerank("c", candidates)["order"][0] == 2
+
+
+def test_unscored_tail_keeps_first_stage_order():
+    reranker = make_reranker(StubCrossEncoder(delays=[0.05]), batch_size=2, budget_ms=10)
+    result = reranker.rerank("d", ["a", "b", "c", "d"])
+    assert result["scored"] == 2
+    assert result["order"][2:] == [2, 3]
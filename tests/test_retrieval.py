@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+
+import src.common.bm25 as bm25
+from src.common.bm25 import BM25Index, get_bm25_index, tokenize
+from src.common.hybrid_retriever import HybridRetriever, fuse_scores
+
+TEXTS = [
+    "We collect your name and email address when you register.",
+    "We share data with advertisers and data brokers.",
+    "Children under 13 are protected under COPPA.",
+    "You may request deletion of your data under the GDPR.",
+]
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("What is the GDPR, and how do we comply?") == ["gdpr", "comply"]
+
+
+def test_bm25_ranks_exact_terms_first():
+    scores = BM25Index.build(TEXTS).scores(["COPPA children", "GDPR deletion"])
+    assert scores.shape == (2, len(TEXTS))
+    assert scores[0].argmax() == 2
+    assert scores[1].argmax() == 3
+
+
+def test_bm25_save_and_load_round_trip(tmp_path):
+    index = BM25Index.build(TEXTS)
+    index.save(str(tmp_path))
+    loaded = BM25Index.load(str(tmp_path))
+    np.testing.assert_allclose(loaded.scores(["data brokers"]), index.scores(["data brokers"]))
+
+
+def test_disk_cache_keeps_most_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(bm25, "BM25_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(bm25, "DISK_ITEMS", 2)
+    monkeypatch.setattr(bm25, "_memory", bm25.OrderedDict())
+    chunk_sets = [[f"policy {i} text"] for i in range(3)]
+    keys = [bm25.texts_key(texts) for texts in chunk_sets]
+    get_bm25_index(chunk_sets[0])
+    get_bm25_index(chunk_sets[1])
+    os.utime(tmp_path / keys[0], (1, 1))
+    os.utime(tmp_path / keys[1], (2, 2))
+
+    bm25._memory.clear()
+    get_bm25_index(chunk_sets[0])  # loaded from disk: now the most recently used
+    get_bm25_index(chunk_sets[2])
+    assert sorted(os.listdir(tmp_path)) == sorted([keys[0], keys[2]])
+
+
+def test_hybrid_finds_terms_the_dense_scores_miss():
+    embeddings = np.eye(len(TEXTS), dtype="float32")
+    query_embedding = embeddings[[1]]  # dense scores point at the data-broker chunk
+    dense = HybridRetriever(TEXTS, embeddings, mode="dense")
+    hybrid = HybridRetriever(TEXTS, embeddings, mode="hybrid", dense_weight=0.3)
+    assert dense.bm25 is None
+    assert dense.search(["COPPA"], 1, query_embedding)[0][0]["index"] == 1
+    hit = hybrid.search(["COPPA"], 1, query_embedding)[0][0]
+    assert hit["index"] == 2 and hit["dense"] == 0.0
+
+
+def test_rrf_fusion_rewards_agreement():
+    dense = np.array([[0.9, 0.8, 0.1]], dtype="float32")
+    lexical = np.array([[0.0, 5.0, 1.0]], dtype="float32")
+    assert fuse_scores(dense, lexical, 0.5, "rrf")[0].argmax() == 1
+    assert fuse_scores(dense, lexical, 0.5, "linear")[0].argmax() == 1
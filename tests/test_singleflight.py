@@ -0,0 +1,99 @@
+import time
+import threading
+
+import pytest
+
+from src.common.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_run():
+    flight = SingleFlight("test")
+    release = threading.Event()
+    runs = []
+
+    def produce():
+        runs.append(1)
+        yield "stage", "start"
+        release.wait(5)
+        yield "result", 42
+
+    first = flight.stream("key", produce)
+    second = flight.stream("key", produce)
+    assert flight.stats() == {"started": 1, "shared": 1, "cancelled": 0, "in_flight": 1}
+    release.set()
+    assert list(first) == list(second) == [("stage", "start"), ("result", 42)]
+    assert len(runs) == 1
+
+
+def test_late_joiner_replays_from_the_start_and_finished_flights_restart():
+    flight = SingleFlight("test")
+    started = threading.Event()
+    release = threading.Event()
+
+    def produce():
+        yield "a"
+        started.set()
+        release.wait(5)
+        yield "b"
+
+    first = flight.stream("key", produce)
+    assert next(first) == "a"
+    started.wait(5)
+    late = flight.stream("key", produce)
+    release.set()
+    assert list(late) == ["a", "b"]
+    assert list(first) == ["b"]
+    assert list(flight.stream("key", lambda: iter(["c"]))) == ["c"]
+    assert flight.stats()["started"] == 2
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def produce():
+        yield "partial"
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    callers = [flight.stream("key", produce) for _ in range(2)]
+    release.set()
+    for caller in callers:
+        assert next(caller) == "partial"
+        with pytest.raises(RuntimeError, match="boom"):
+            list(caller)
+
+
+def stoppable_producer(stopped, produced):
+    def produce():
+        try:
+            for piece in range(1000):
+                produced.append(piece)
+                yield piece
+                time.sleep(0.01)
+        finally:
+            stopped.set()
+    return produce
+
+
+def test_producer_stops_when_its_last_caller_leaves():
+    flight = SingleFlight("test")
+    stopped, produced = threading.Event(), []
+    first = flight.stream("key", stoppable_producer(stopped, produced))
+    second = flight.stream("key", stoppable_producer(stopped, produced))
+    assert next(first) == 0 and next(second) == 0
+    first.close()
+    time.sleep(0.05)
+    assert not stopped.is_set()  # the second caller is still reading
+    assert next(second) == 1
+    second.close()
+    assert stopped.wait(5)
+    assert len(produced) < 1000
+    assert flight.stats()["cancelled"] == 1 and flight.stats()["in_flight"] == 0
+    assert list(flight.stream("key", lambda: iter(["fresh"]))) == ["fresh"]
+
+
+def test_callers_that_read_to_the_end_do_not_cancel():
+    flight = SingleFlight("test")
+    assert list(flight.stream("key", lambda: iter(["a", "b"]))) == ["a", "b"]
+    assert flight.stats()["cancelled"] == 0
@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+import src.summary.summary as summary
+from src.summary.summary_store import SummaryStore
+
+ROW = {"Platform": "Example", "Privacy Policy Txt": "https://example.com/policy.txt", "Privacy Policy URL": "https://example.com/policy"}
+
+
+class StubPolicyStore:
+    def get_with_version(self, url):
+        return "We collect your email address.", "hash"
+
+
+def produce(monkeypatch, tmp_path, events=None, rag_sections=None):
+    store = SummaryStore(str(tmp_path / "summaries.sqlite"))
+    monkeypatch.setattr(summary, "get_summary_store", lambda: store)
+    monkeypatch.setattr(summary, "get_policy_store", lambda: StubPolicyStore())
+    if rag_sections is not None:
+        monkeypatch.setattr(summary, "TOKEN_LIMIT", 0)
+        monkeypatch.setattr(summary, "chunk_text_by_paragraph", lambda text: [text])
+        monkeypatch.setattr(summary, "iter_rag_sections", lambda chunks, company: iter(rag_sections))
+    else:
+        monkeypatch.setattr(summary, "iter_summary_with_references", lambda text, company: iter(events))
+    result = [payload for kind, payload in summary.produce_policy_summary(ROW) if kind == "result"][0]
+    return result, store.get("Example", "hash")
+
+
+def test_complete_summary_is_stored(monkeypatch, tmp_path):
+    result, stored = produce(monkeypatch, tmp_path, [("summary", "a. Type of data collected\n1: Email"), ("references", "refs")])
+    assert result[0] == "a. Type of data collected\n1: Email"
+    assert stored["refs"] == "refs"
+
+
+def test_summary_with_failed_references_is_not_stored(monkeypatch, tmp_path):
+    events = [("summary", "a. Type of data collected\n1: Email"), ("degraded", ["a. Type of data collected"]), ("references", "refs")]
+    result, stored = produce(monkeypatch, tmp_path, events)
+    assert result[1] == "refs"
+    assert stored is None
+
+
+def test_rag_summary_with_fallback_section_is_not_stored(monkeypatch, tmp_path):
+    sections = [
+        ("a. Type of data collected\nEmail.", "References for a:\n...", True),
+        ("b. Purpose of data collection\nCould not be generated in time.", "References for b:\n...", False),
+    ]
+    result, stored = produce(monkeypatch, tmp_path, rag_sections=sections)
+    assert "Could not be generated" in result[0]
+    assert stored is None
+
+
+def test_section_references_records_failed_sections(monkeypatch):
+    def references_for(self, label, section_text, deadline):
+        if label.startswith("c."):
+            raise TimeoutError()
+        return f"{label}:\n    Reference 1: \"quote\""
+
+    monkeypatch.setattr(summary.SectionReferences, "_build_index", lambda self, text: ([], None))
+    monkeypatch.setattr(summary.SectionReferences, "_references_for", references_for)
+    references = summary.SectionReferences("policy", mode="local")
+    references.submit_completed("a. Type of data collected\n1: Email\nc. Data sharing and disclosure\n1: Partners", final=True)
+    text = references.result()
+    assert references.failed == ["c. Data sharing and disclosure"]
+    assert 'Reference 1: "quote"' in text
+    assert "c. Data sharing and disclosure:\n    Missing." in text
+
+
+def test_section_deadlines_run_from_submission(monkeypatch):
+    def references_for(self, label, section_text, deadline):
+        time.sleep(0.5)
+        return f"{label}:\n    Reference 1: \"quote\""
+
+    monkeypatch.setattr(summary.SectionReferences, "_build_index", lambda self, text: ([], None))
+    monkeypatch.setattr(summary.SectionReferences, "_references_for", references_for)
+    references = summary.SectionReferences("policy", mode="local", max_concurrency=2, section_timeout=0.2)
+    start = time.monotonic()
+    references.submit_completed("a. Type of data collected\n1: Email\nc. Data sharing and disclosure\n1: Partners", final=True)
+    references.result()
+    assert time.monotonic() - start < 0.4  # not 0.2s per section, one after the other
+    assert len(references.failed) == 2
+
+
+def test_llm_calls_past_their_deadline_release_the_slot():
+    from src.common.llm_client import FakeLLMClient, LLMError
+
+    client = FakeLLMClient(latency=0.5, max_concurrency=1)
+    start = time.monotonic()
+    with pytest.raises(LLMError):
+        client.generate("a prompt that is too slow", deadline=time.monotonic() + 0.1)
+    assert time.monotonic() - start < 0.4
+    client.latency = 0.0
+    assert client.generate("the next prompt", deadline=time.monotonic() + 0.1)